@@ -0,0 +1,74 @@
+"""Benchmark of the aggregation of a large history with and without chunks
+
+Builds the aggregate cube once from the fully loaded account and once from
+the database streamed in batches, and reports time and peak memory.
+
+    python benchmarks/bench_aggregate.py --rows 1000000 --chunk 100000
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from econicer.aggregate import AGGREGATE_COLUMNS
+from econicer.aggregate import AggregateCube
+from econicer.fileIO import FileIO
+from econicer.settings import DatabaseSettings
+from econicer.settings import GroupSettings
+
+from bench_storage import GROUPING
+from bench_storage import syntheticAccount
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    duration = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return duration, peak, result
+
+
+def benchmark(noRows, chunkRows, groupSettings, storageFormats):
+    account = syntheticAccount(noRows, groupSettings)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for storageFormat in storageFormats:
+            fileIO = FileIO(Path(tmp) / f"history.{storageFormat}", DatabaseSettings())
+            fileIO.writeDB(account)
+
+            full, fullPeak, cube = measure(
+                lambda: AggregateCube.fromTransactions(
+                    fileIO.readDB(groupSettings).transactions
+                )
+            )
+            chunked, chunkedPeak, chunkedCube = measure(
+                lambda: AggregateCube.fromChunks(
+                    fileIO.iterTransactions(AGGREGATE_COLUMNS, chunkRows)
+                )
+            )
+            assert chunkedCube.sums.equals(cube.sums)
+
+            print(
+                f"{noRows:>9} rows  {storageFormat:<8} in memory {full:7.3f} s "
+                f"{fullPeak:8.1f} MiB  chunked {chunked:7.3f} s {chunkedPeak:8.1f} MiB"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark chunked aggregation")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--chunk", type=int, default=100_000)
+    parser.add_argument("--formats", nargs="+", default=["csv", "feather", "sqlite"])
+    args = parser.parse_args()
+
+    groupSettings = GroupSettings(GROUPING)
+    for noRows in args.rows:
+        benchmark(noRows, args.chunk, groupSettings, args.formats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark of the amount parsing of bank files
+
+Compares str2num applied to every cell with the vectorized str2numColumn on
+German formatted amounts like "-1.234,56".
+
+    python benchmarks/bench_amounts.py --rows 100000 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from econicer.auxiliary import str2num
+from econicer.auxiliary import str2numColumn
+
+
+def syntheticAmounts(noRows, seed=0):
+    rng = np.random.default_rng(seed)
+    cents = rng.integers(-500000, 500000, noRows)
+    amounts = [f"{abs(c) // 100:,},{abs(c) % 100:02d}" for c in cents.tolist()]
+    amounts = [a.replace(",", "X").replace("X", ".", a.count(",") - 1) for a in amounts]
+    amounts = [
+        ("-" if c < 0 else "") + a.replace("X", ",") for a, c in zip(amounts, cents)
+    ]
+    return pd.Series(amounts, name="value"), cents
+
+
+def timeit(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def benchmark(noRows):
+    amounts, cents = syntheticAmounts(noRows)
+
+    legacy, expected = timeit(lambda: amounts.apply(str2num))
+    vectorized, parsed = timeit(lambda: str2numColumn(amounts))
+    assert parsed.tolist() == expected.tolist() == cents.tolist()
+
+    print(
+        f"{noRows:>9} rows  apply {legacy:7.3f} s  vectorized {vectorized:7.3f} s"
+        f"  speedup {legacy / vectorized:5.1f}x"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark amount parsing")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for noRows in args.rows:
+        benchmark(noRows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark of compressed CSV databases
+
+Writes a synthetic history as plain CSV file and with every available
+compression, and reports the file size, the write and read time and the
+throughput in rows per second.
+
+    python benchmarks/bench_compression.py --rows 100000 1000000
+"""
+
+import argparse
+import importlib.util
+import tempfile
+from pathlib import Path
+
+from econicer.accountManager import databaseFilename
+from econicer.fileIO import COMPRESSION_SUFFIXES
+from econicer.fileIO import FileIO
+from econicer.settings import DatabaseSettings
+from econicer.settings import GroupSettings
+
+from bench_storage import GROUPING
+from bench_storage import syntheticAccount
+from bench_storage import timeit
+
+
+def availableCompressions():
+    compressions = [""]
+    for compression in COMPRESSION_SUFFIXES.values():
+        if compression == "zstd" and importlib.util.find_spec("zstandard") is None:
+            continue
+        compressions.append(compression)
+    return compressions
+
+
+def benchmark(noRows, groupSettings, compressions):
+    account = syntheticAccount(noRows, groupSettings)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for compression in compressions:
+            filepath = Path(tmp) / databaseFilename("csv", compression)
+            fileIO = FileIO(filepath, DatabaseSettings())
+
+            write = timeit(lambda: fileIO.writeDB(account), repeat=1)
+            read = timeit(lambda: fileIO.readDB(groupSettings), repeat=1)
+            size = filepath.stat().st_size / 2**20
+
+            print(
+                f"{noRows:>9} rows  {compression or 'plain':<6} {size:8.1f} MiB  "
+                f"write {write:7.3f} s {noRows / write:>10,.0f} rows/s  "
+                f"read {read:7.3f} s {noRows / read:>10,.0f} rows/s"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark compressed databases")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--compressions", nargs="+", default=availableCompressions())
+    args = parser.parse_args()
+
+    groupSettings = GroupSettings(GROUPING)
+    compressions = ["" if c == "plain" else c for c in args.compressions]
+    for noRows in args.rows:
+        benchmark(noRows, groupSettings, compressions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark of transaction grouping for a growing number of groups and keywords
+
+Classifies synthetic transaction texts with an increasing number of groups and
+reports the time to compile the keyword matcher and to match the texts.
+
+    python benchmarks/bench_grouping.py --rows 100000 --groups 10 100 500
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from econicer.grouping import GroupMatcher
+
+
+def syntheticGroups(noGroups, keywordsPerGroup=10, seed=0):
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    return {
+        f"group{g}": [
+            "".join(rng.choice(letters, size=rng.integers(4, 10)))
+            for _ in range(keywordsPerGroup)
+        ]
+        for g in range(noGroups)
+    }
+
+
+def syntheticTexts(noRows, groups, seed=0):
+    rng = np.random.default_rng(seed)
+    keywords = [kw for kws in groups.values() for kw in kws]
+    uniqueTexts = [
+        (
+            f"payment {i} to {rng.choice(keywords)} ref {rng.integers(1e6)}"
+            if i % 3
+            else f"payment {i} unknown receiver"
+        )
+        for i in range(20000)
+    ]
+    return pd.DataFrame({"usage": rng.choice(uniqueTexts, size=noRows)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark transaction grouping")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--groups", type=int, nargs="+", default=[10, 100, 500])
+    args = parser.parse_args()
+
+    for noGroups in args.groups:
+        groups = syntheticGroups(noGroups)
+        transactions = syntheticTexts(args.rows, groups)
+
+        start = time.perf_counter()
+        matcher = GroupMatcher(groups)
+        compileTime = time.perf_counter() - start
+
+        start = time.perf_counter()
+        priorities = matcher.classify(transactions, ["usage"])
+        matchTime = time.perf_counter() - start
+
+        print(
+            f"{noGroups:>5} groups {noGroups * 10:>6} keywords  "
+            f"compile {compileTime:7.3f} s  match {matchTime:7.3f} s  "
+            f"grouped {np.count_nonzero(priorities >= 0)} of {len(priorities)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark of the import time of the command line interface
+
+Imports econicer.cli in a fresh interpreter with -X importtime and reports
+the cumulative import time of the modules of the commands which don't plot,
+next to the plotting and report modules which are only imported on demand.
+Fails if the cli imports a plotting module or exceeds the time budget.
+
+    python benchmarks/bench_import.py --repeat 5 --budget 1.0
+"""
+
+import argparse
+import subprocess
+import sys
+
+# modules which are only imported by the plots and the report
+PLOT_MODULES = ["matplotlib", "plotly", "pylatex"]
+
+MEASURED_MODULES = [
+    "econicer.cli",
+    "pandas",
+    "econicer.accountManager",
+    "econicer.ecoplot",
+    "econicer.report",
+]
+
+
+def importTimes(statement):
+    """cumulative import time in seconds of every module imported by the
+    statement in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        times[module.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark the cli import time")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=1.0, help="seconds")
+    args = parser.parse_args()
+
+    cliTimes = [importTimes("import econicer.cli") for _ in range(args.repeat)]
+    plotTimes = importTimes("import econicer.cli, econicer.report")
+
+    for module in MEASURED_MODULES:
+        measured = [times[module] for times in cliTimes if module in times]
+        if measured:
+            print(f"{module:<24} {min(measured):7.3f} s")
+        else:
+            print(f"{module:<24} {plotTimes[module]:7.3f} s  on demand")
+
+    loaded = [m for m in PLOT_MODULES if any(m in times for times in cliTimes)]
+    if loaded:
+        sys.exit(f"econicer.cli imports {', '.join(loaded)}")
+
+    best = min(times["econicer.cli"] for times in cliTimes)
+    if best > args.budget:
+        sys.exit(f"econicer.cli takes {best:.3f} s, budget {args.budget:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
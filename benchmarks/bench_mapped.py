@@ -0,0 +1,58 @@
+"""Benchmark of the memory mapped read path of the binary database
+
+Builds the aggregate cube once from the projected account and once from the
+columns mapped from the file, and reports time and peak memory.
+
+    python benchmarks/bench_mapped.py --rows 1000000
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from econicer.aggregate import AGGREGATE_COLUMNS
+from econicer.aggregate import AggregateCube
+from econicer.fileIO import FileIO
+from econicer.settings import DatabaseSettings
+from econicer.settings import GroupSettings
+
+from bench_aggregate import measure
+from bench_storage import GROUPING
+from bench_storage import syntheticAccount
+
+
+def benchmark(noRows, groupSettings):
+    account = syntheticAccount(noRows, groupSettings)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fileIO = FileIO(Path(tmp) / "history.feather", DatabaseSettings())
+        fileIO.writeDB(account)
+
+        loaded, loadedPeak, cube = measure(
+            lambda: AggregateCube.fromTransactions(
+                fileIO.readDB(groupSettings, columns=AGGREGATE_COLUMNS).transactions
+            )
+        )
+        mapped, mappedPeak, mappedCube = measure(
+            lambda: AggregateCube.fromTransactions(fileIO.mapBinary(AGGREGATE_COLUMNS))
+        )
+        assert mappedCube.sums.equals(cube.sums)
+
+        print(
+            f"{noRows:>9} rows  loaded {loaded:7.3f} s {loadedPeak:8.1f} MiB  "
+            f"mapped {mapped:7.3f} s {mappedPeak:8.1f} MiB"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark memory mapped reads")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    args = parser.parse_args()
+
+    groupSettings = GroupSettings(GROUPING)
+    for noRows in args.rows:
+        benchmark(noRows, groupSettings)
+
+
+if __name__ == "__main__":
+    main()
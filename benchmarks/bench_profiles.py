@@ -0,0 +1,78 @@
+"""Benchmark of the render profiles of the plots
+
+Aggregates a synthetic history once and renders all plots with every render
+profile of the settings, and with the pdf files only which the report
+includes. Reports the time, the size of the written files and the speedup
+compared to the print profile.
+
+    python benchmarks/bench_profiles.py --rows 10000 --workers 1
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from econicer.aggregate import AggregateCube
+from econicer.ecoplot import EcoPlot
+from econicer.ecoplot import PlotOptions
+from econicer.settings import EconicerSettings
+from econicer.settings import GroupSettings
+
+from bench_storage import GROUPING
+from bench_storage import syntheticAccount
+
+
+def renderPlots(cube, plotDir, plotOptions, workers):
+    ep = EcoPlot(plotDir, plotOptions, force=True)
+    ep.plotCategoriesFlow(cube)
+    ep.plotHbarSplit(cube)
+    ep.plotTimeline(cube)
+    ep.plotPieSplit(cube)
+    ep.plotBars(cube)
+    ep.plotCategories(cube)
+    ep.plotCategoriesYearly(cube)
+
+    start = time.perf_counter()
+    failed = ep.render(workers)
+    return time.perf_counter() - start, len(ep.reg) + len(failed)
+
+
+def benchmark(noRows, groupSettings, workers):
+    account = syntheticAccount(noRows, groupSettings)
+    cube = AggregateCube.fromTransactions(account.transactions)
+
+    profiles = dict(EconicerSettings.renderProfiles)
+    profiles["report"] = {**profiles["print"], "formats": ["pdf"]}
+
+    results = {}
+    for name, profile in profiles.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            duration, noPlots = renderPlots(
+                cube, Path(tmp), PlotOptions(**profile), workers
+            )
+            size = sum(p.stat().st_size for p in Path(tmp).glob("*.*")) / 2**20
+        results[name] = (duration, noPlots, size)
+
+    # savings compared to the print profile
+    reference = results["print"][0]
+    for name, (duration, noPlots, size) in results.items():
+        profile = profiles[name]
+        print(
+            f"{name:<7} {', '.join(profile['formats']):<9} {profile['dpi']:>4} dpi  "
+            f"{noPlots:>3} plots {duration:7.2f} s {size:7.1f} MiB  "
+            f"{reference / duration:5.1f}x faster than print"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark render profiles")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    benchmark(args.rows, GroupSettings(GROUPING), args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark of loading the account database from CSV, Feather and SQLite files
+
+Writes a synthetic history in every storage format and measures readDB for
+the full table, for a projection on the columns needed by the plots and for
+an account stored with the compact schema. The query column lists one group
+within the newest tenth of the history, like `-l GROUP --since DATE`.
+
+    python benchmarks/bench_storage.py --rows 100000 1000000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from econicer.account import BankAccount
+from econicer.fileIO import FileIO
+from econicer.settings import DatabaseSettings
+from econicer.settings import GroupSettings
+
+from bench_uid import syntheticTransactions
+
+GROUPING = Path(__file__).parents[1] / "tutorial" / "config" / "grouping.json"
+
+
+def syntheticAccount(noRows, groupSettings):
+    transactions = syntheticTransactions(noRows)
+    transactions.insert(1, "valuta", transactions["date"])
+    transactions.insert(6, "saldoCurrency", "EUR")
+    transactions["valueCurrency"] = "EUR"
+    groups = np.array(list(groupSettings.groups) + ["None"], dtype=object)
+    transactions["groupID"] = groups[np.arange(noRows) % len(groups)]
+    return BankAccount("Owner", "DE00 1234", "Bank", transactions, groupSettings)
+
+
+def timeit(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark(noRows, groupSettings):
+    account = syntheticAccount(noRows, groupSettings)
+    projection = ["date", "value", "groupID"]
+    groupID = account.transactions["groupID"].iloc[0]
+    since = account.transactions["date"].iloc[noRows // 10]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{noRows:>9} rows", end="")
+        for storageFormat in ["csv", "feather", "sqlite"]:
+            fileIO = FileIO(Path(tmp) / f"history.{storageFormat}", DatabaseSettings())
+            fileIO.writeDB(account)
+
+            full = timeit(lambda: fileIO.readDB(groupSettings))
+            projected = timeit(lambda: fileIO.readDB(groupSettings, columns=projection))
+            query = timeit(
+                lambda: fileIO.readTransactions(
+                    projection, groupID=groupID, since=since
+                )
+            )
+            size = Path(fileIO.filepath).stat().st_size / 2**20
+
+            compactAccount = fileIO.readDB(groupSettings, compact=True)
+            fileIO.writeDB(compactAccount)
+            compact = timeit(lambda: fileIO.readDB(groupSettings, compact=True))
+            print(
+                f"\n  {storageFormat:<8} {size:6.1f} MiB  full {full:7.3f} s"
+                f"  projected {projected:7.3f} s  compact {compact:7.3f} s"
+                f"  query {query:7.3f} s",
+                end="",
+            )
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark database loading")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    groupSettings = GroupSettings(GROUPING)
+    for noRows in args.rows:
+        benchmark(noRows, groupSettings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark of the uid computation for large transaction histories
+
+Compares the former row wise implementation with the columnar UidEngine for a
+cold run, a warm run where every row is already known and an update run where
+one month of new transactions is added on top of the history.
+
+    python benchmarks/bench_uid.py --rows 100000 1000000
+"""
+
+import argparse
+import base64
+import hashlib
+import time
+
+import numpy as np
+import pandas as pd
+
+from econicer.account import UID_COMPONENTS
+from econicer.account import UidEngine
+
+
+def legacyIdentifier(transactions):
+    idColumns = pd.concat([transactions[col] for col in UID_COMPONENTS], axis=1)
+    idColumns["date"] = idColumns["date"].dt.strftime("%Y-%m-%d")
+
+    tuples = idColumns.apply(lambda row: tuple(row), axis=1)
+    tuples = tuples.astype(str).str.encode("UTF-8")
+
+    return tuples.apply(lambda x: base64.b64encode(hashlib.sha1(x).digest()).decode())
+
+
+def syntheticTransactions(noRows, seed=0):
+    rng = np.random.default_rng(seed)
+    customers = np.array([f"customer {i}" for i in range(500)], dtype=object)
+    usages = np.array([f"usage text number {i}" for i in range(5000)], dtype=object)
+    types = np.array(["direct debit", "transfer", "salary", "card"], dtype=object)
+
+    value = rng.integers(-50000, 50000, noRows)
+    return pd.DataFrame(
+        {
+            "date": pd.Timestamp("2030-01-01")
+            - pd.to_timedelta(np.arange(noRows) // 20, unit="D"),
+            "customer": customers[rng.integers(0, len(customers), noRows)],
+            "usage": usages[rng.integers(0, len(usages), noRows)],
+            "type": types[rng.integers(0, len(types), noRows)],
+            "saldo": np.cumsum(value[::-1])[::-1],
+            "value": value,
+        }
+    )
+
+
+def timeit(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def benchmark(noRows, legacy=True):
+    transactions = syntheticTransactions(noRows)
+    engine = UidEngine()
+
+    cold, _ = timeit(lambda: engine(transactions))
+    warm, _ = timeit(lambda: engine(transactions))
+
+    update = pd.concat([syntheticTransactions(600, seed=1), transactions])
+    update.reset_index(drop=True, inplace=True)
+    incremental, _ = timeit(lambda: engine(update))
+
+    print(
+        f"{noRows:>9} rows  cold {cold:8.3f} s  warm {warm:8.3f} s  "
+        f"update {incremental:8.3f} s",
+        end="",
+    )
+
+    if legacy:
+        legacyTime, uids = timeit(lambda: legacyIdentifier(transactions))
+        assert uids.tolist() == transactions["uid"].tolist()
+        print(f"  legacy {legacyTime:8.3f} s  speedup {legacyTime / cold:6.1f}x")
+    else:
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark uid computation")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    for noRows in args.rows:
+        benchmark(noRows, legacy=not args.skip_legacy)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,23 +4,320 @@ import re
 import hashlib
 import pandas as pd
 import numpy as np
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import List
 
+from econicer.grouping import GroupMatcher
+from econicer.grouping import NO_GROUP
+from econicer.schema import compactTransactions
+from econicer.schema import uidToInt64
 from econicer.settings import EconicerSettings
 
+UID_COMPONENTS = ["date", "customer", "usage", "type", "saldo", "value"]
 
-def addIdentifier(transactions):
-    idComponents = ["date", "customer", "usage", "type", "saldo", "value"]
 
-    idColumns = pd.concat([transactions[col] for col in idComponents], axis=1)
-    idColumns["date"] = idColumns["date"].dt.strftime("%Y-%m-%d")
+def reprColumn(values, prefix="", suffix=""):
+    """repr of every value, evaluated only once per distinct value"""
+    codes, uniques = pd.factorize(values)
+    if values.dtype.kind == "M":
+        uniques = uniques.strftime("%Y-%m-%d")
+    reprs = [prefix + repr(v) + suffix for v in uniques.astype(object)]
+    column = np.array(reprs, dtype=object)[codes]
 
-    tuples = idColumns.apply(lambda row: tuple(row), axis=1)
-    tuples = tuples.astype(str).str.encode("UTF-8")
+    # missing values are not unique, None and nan have different reprs
+    missing = codes < 0
+    if missing.any():
+        if values.dtype.kind == "M":
+            column[missing] = prefix + repr(np.nan) + suffix
+        else:
+            column[missing] = [
+                prefix + repr(v) + suffix for v in values[missing].astype(object)
+            ]
+    return column.tolist()
+
+
+def uidKeys(transactions):
+    """build the canonical byte key of every row column by column
+
+    The key is the string representation of the tuple of all identifying
+    values, which is what the uid has always been derived from.
+    """
+    first, *middle, last = UID_COMPONENTS
+    columns = [reprColumn(transactions[first], prefix="(")]
+    columns += [reprColumn(transactions[col]) for col in middle]
+    columns += [reprColumn(transactions[last], suffix=")")]
+
+    keys = map(", ".join, zip(*columns))
+    return list(map(str.encode, keys))
+
+
+def hashKeys(keys):
+    """sha1 digest of every key encoded as base64 string"""
+    if not len(keys):
+        return np.array([], dtype=object)
+
+    # a digest has 20 bytes, one zero byte completes the last base64 quantum
+    # so all digests can be encoded in a single call
+    digests = b"\0".join([hashlib.sha1(k).digest() for k in keys]) + b"\0"
+    encoded = np.frombuffer(base64.b64encode(digests), dtype=np.uint8)
+    encoded = encoded.reshape(-1, 28).copy()
+    encoded[:, -1] = ord("=")
+
+    return encoded.view("S28").ravel().astype(str).astype(object)
+
+
+class UidEngine:
+    """Compute uids columnwise and remember rows which were already hashed
+
+    Rows are recognized by a 128 bit fingerprint of their identifying columns,
+    so only rows with new or changed values have to be hashed again.
+    """
+
+    fingerprintKeys = ("econicer-uid-one", "econicer-uid-two")
+
+    def __init__(self):
+        self._index = pd.Index([], dtype=np.uint64)
+        self._check = np.array([], dtype=np.uint64)
+        self._uids = np.array([], dtype=object)
+
+    def fingerprints(self, transactions):
+        idColumns = transactions[UID_COMPONENTS]
+        return [
+            pd.util.hash_pandas_object(idColumns, index=False, hash_key=k).to_numpy()
+            for k in self.fingerprintKeys
+        ]
+
+    def __call__(self, transactions):
+        if not len(transactions):
+            transactions["uid"] = pd.Series(dtype=object)
+            return
+
+        first, second = self.fingerprints(transactions)
+
+        position = self._index.get_indexer(first)
+        known = position >= 0
+        known[known] = self._check[position[known]] == second[known]
+
+        uids = np.empty(len(transactions), dtype=object)
+        uids[known] = self._uids[position[known]]
+
+        missing = ~known
+        if missing.any():
+            keys = uidKeys(transactions.loc[missing])
+            uids[missing] = hashKeys(keys)
+            self._remember(first[missing], second[missing], uids[missing])
+
+        transactions["uid"] = uids
+
+    def _remember(self, first, second, uids):
+        _, unique = np.unique(first, return_index=True)
+        new = ~pd.Index(first[unique]).isin(self._index)
+        unique = unique[new]
+
+        self._index = self._index.append(pd.Index(first[unique]))
+        self._check = np.concatenate([self._check, second[unique]])
+        self._uids = np.concatenate([self._uids, uids[unique]])
+
+
+def addIdentifier(transactions, engine=None):
+    """add a sha1 based uid column to the transactions"""
+    if engine is None:
+        engine = UidEngine()
+    engine(transactions)
+
+
+@dataclass
+class TraceSegment:
+    """Run of neighbouring transactions with an inconsistent saldo trace
+
+    first and last are the row positions of the newest and oldest
+    transaction whose saldo does not follow from its older neighbour.
+    """
+
+    first: int
+    last: int
+    newerDate: pd.Timestamp
+    olderDate: pd.Timestamp
+    difference: int
+
+    def __str__(self):
+        return (
+            f"between {self.olderDate:%Y-%m-%d} and {self.newerDate:%Y-%m-%d}: "
+            f"saldo difference {self.difference / 100:.2f}"
+        )
+
+
+def inconsistentRows(transactions, rows):
+    """rows whose saldo does not equal the saldo of the older neighbour plus
+    their value, together with the difference"""
+    rows = np.unique(rows)
+    rows = rows[(rows >= 0) & (rows < len(transactions) - 1)]
+    saldo = transactions["saldo"].to_numpy()
+    value = transactions["value"].to_numpy()
+
+    difference = saldo[rows] - value[rows] - saldo[rows + 1]
+    inconsistent = difference != 0
+    return rows[inconsistent], difference[inconsistent]
+
+
+def traceSegments(transactions, rows, difference):
+    """combine consecutive inconsistent rows to segments"""
+    dates = transactions["date"].to_numpy()
+    runs = np.split(np.arange(len(rows)), np.flatnonzero(np.diff(rows) != 1) + 1)
+
+    segments = []
+    for run in runs:
+        if not len(run):
+            continue
+        first = int(rows[run[0]])
+        last = int(rows[run[-1]])
+        segments.append(
+            TraceSegment(
+                first,
+                last,
+                pd.Timestamp(dates[first]),
+                pd.Timestamp(dates[last + 1]),
+                int(difference[run].sum()),
+            )
+        )
+    return segments
+
+
+@dataclass
+class TraceCheckpoint:
+    """Verified state of the saldo trace
+
+    Stores the known inconsistencies by the uids of both neighbours, so
+    they stay valid while new transactions are merged into the history.
+    """
+
+    rows: int = 0
+    newestUid: str = ""
+    oldestUid: str = ""
+    inconsistent: List[list] = field(default_factory=list)
 
-    transactions["uid"] = tuples.apply(
-        lambda x: base64.b64encode(hashlib.sha1(x).digest()).decode()
+    @classmethod
+    def fromTransactions(cls, transactions, rows, difference):
+        uids = transactions["uid"].to_numpy()
+        if not len(uids):
+            return cls()
+
+        # plain python values, uids of the compact schema are numpy integers
+        rows = np.asarray(rows, dtype=int)
+        newest, oldest = uids[[0, -1]].tolist()
+        pairs = zip(uids[rows].tolist(), uids[rows + 1].tolist(), difference)
+        return cls(
+            len(uids),
+            newest,
+            oldest,
+            [[newer, older, int(d)] for newer, older, d in pairs],
+        )
+
+    def matches(self, uids):
+        return (
+            len(uids) == self.rows
+            and len(uids) > 0
+            and uids[0] == self.newestUid
+            and uids[-1] == self.oldestUid
+        )
+
+
+@dataclass
+class MergeResult:
+    """Outcome of merging a transaction file into the history"""
+
+    added: int = 0
+    duplicates: int = 0
+    firstDate: pd.Timestamp = None
+    lastDate: pd.Timestamp = None
+    gaps: List[TraceSegment] = field(default_factory=list)
+    rows: np.ndarray = field(default_factory=lambda: np.array([], dtype=int))
+
+
+def chronological(transactions):
+    """transactions ordered from newest to oldest, keeping the order of
+    transactions at the same day"""
+    dates = transactions["date"]
+    if dates.is_monotonic_decreasing:
+        return transactions
+    if dates.is_monotonic_increasing:
+        return transactions.iloc[::-1]
+    return transactions.sort_values("date", ascending=False, kind="stable")
+
+
+def mergeTransactions(history, newTransactions):
+    """merge new transactions with a uid hash lookup into the history
+
+    The files can be older, newer, overlapping or interleaved with the
+    history. Known transactions are dropped, the others are inserted by date.
+    Returns the merged transactions, a mask of the inserted rows and a
+    MergeResult.
+    """
+    noTransactions = len(newTransactions)
+    newTransactions = newTransactions.drop_duplicates("uid")
+    if len(history):
+        known = newTransactions["uid"].isin(history["uid"]).to_numpy()
+        newTransactions = newTransactions[~known]
+    newTransactions = chronological(newTransactions)
+
+    result = MergeResult(
+        added=len(newTransactions), duplicates=noTransactions - len(newTransactions)
+    )
+    if not result.added:
+        return history, np.zeros(len(history), dtype=bool), result
+
+    result.firstDate = newTransactions["date"].iloc[-1]
+    result.lastDate = newTransactions["date"].iloc[0]
+
+    if not len(history):
+        merged = newTransactions.reset_index(drop=True)
+        result.rows = np.arange(len(merged))
+        return merged, np.ones(len(merged), dtype=bool), result
+
+    # new transactions at the same day as known ones are placed before them,
+    # unless the file adds older data
+    historyDates = -history["date"].to_numpy().astype(np.int64)
+    newDates = -newTransactions["date"].to_numpy().astype(np.int64)
+    side = "left" if newDates[0] <= historyDates[0] else "right"
+    positions = np.searchsorted(historyDates, newDates, side=side)
+
+    noHistory = len(history)
+    order = np.insert(
+        np.arange(noHistory), positions, noHistory + np.arange(result.added)
     )
+    merged = pd.concat([history, newTransactions]).iloc[order]
+    merged.reset_index(drop=True, inplace=True)
+
+    newRows = order >= noHistory
+    result.rows = np.flatnonzero(newRows)
+    if {"saldo", "value"}.issubset(merged.columns):
+        sourceChange = np.flatnonzero(newRows[:-1] != newRows[1:])
+        result.gaps = traceSegments(merged, *inconsistentRows(merged, sourceChange))
+
+    return merged, newRows, result
+
+
+def searchTransactions(transactions, search, categories, index=None):
+    """transactions matching the search pattern in any of the categories,
+    indexed categories are looked up in the search index"""
+    keyword = rf"(?:{search})"
+
+    if index is not None:
+        indexed = [cat for cat in categories if cat in index.columns]
+        categories = [cat for cat in categories if cat not in index.columns]
+        found = index.search(search, transactions, indexed)
+    else:
+        found = np.zeros(len(transactions), dtype=bool)
+
+    for cat in categories:
+        column = transactions[cat]
+        matches = column.str.contains(keyword, flags=re.IGNORECASE, na=False)
+        found |= matches.to_numpy()
+
+    if found.any():
+        return transactions[found]
+    else:
+        return None
 
 
 @dataclass
@@ -30,6 +327,8 @@ class BankAccount:
     bank: str
     transactions: pd.DataFrame
     groupSettings: EconicerSettings
+    compact: bool = False
+    uidEngine: UidEngine = field(default_factory=UidEngine, init=False, repr=False)
 
     dataframeCols = [
         "date",
@@ -46,88 +345,125 @@ class BankAccount:
     def __post_init__(self):
         if not len(self.transactions):
             return
-        addIdentifier(self.transactions)
+        if "uid" not in self.transactions.columns:
+            addIdentifier(self.transactions, self.uidEngine)
+        self.applySchema()
 
-    def checkSaldoTrace(self):
-        saldo = self.transactions["saldo"]
-        values = self.transactions["value"]
+    def applySchema(self):
+        """use the compact representation of the transactions if enabled"""
+        if self.compact:
+            self.transactions = compactTransactions(self.transactions)
 
-        calcSaldo = values.iloc[::-1].cumsum().iloc[::-1]
+    def checkSaldoTrace(self, rows=None):
+        """check that the saldo of each transaction follows from its older
+        neighbour, returns every inconsistent segment
 
-        if not saldo.equals(calcSaldo):
-            diff = calcSaldo - saldo
-            start = diff[diff != 0].index
+        Only the given rows are checked against their older neighbour, by
+        default the complete history. The oldest transaction anchors the trace.
+        """
+        if rows is None:
+            rows = np.arange(len(self.transactions))
+        rows, difference = inconsistentRows(self.transactions, rows)
+        return traceSegments(self.transactions, rows, difference)
 
-            t = self.transactions.iloc[start[-1]]
-            t2 = self.transactions.iloc[start[-1] + 1]
-            print(
-                f"Warning! Saldo trace is inconsistent. First inconsistent transaction from {t['date']}"
-            )
-            print(f"Saldo difference: {diff[start[-1]] / 100}")
-            print(t)
-            print(t2)
-            exit()
-
-    def update(self, transactionDataframe):
-        addIdentifier(transactionDataframe)
-        if not self.transactions.empty:
-            overlapUid = transactionDataframe.iloc[-1]["uid"]
-            overlapIndex = self.transactions[
-                self.transactions["uid"] == overlapUid
-            ].index
-            base = self.transactions.drop(range(overlapIndex[0] + 1))
+    def verifyTrace(self, checkpoint=None, newRows=None):
+        """check the saldo trace, incrementally if possible
+
+        If the checkpoint matches the history without the newly merged rows,
+        only the seams around the new rows are checked and the known
+        inconsistencies are taken from the checkpoint. Returns the inconsistent
+        segments and the checkpoint of the current history.
+        """
+        uids = self.transactions["uid"].to_numpy()
+
+        incremental = checkpoint is not None and newRows is not None
+        if incremental:
+            oldRows = np.ones(len(uids), dtype=bool)
+            oldRows[newRows] = False
+            incremental = checkpoint.matches(uids[oldRows])
+
+        if not incremental:
+            rows, difference = inconsistentRows(self.transactions, np.arange(len(uids)))
         else:
-            base = self.transactions
-        mergedDf = pd.concat([transactionDataframe, base])
-        mergedDf.reset_index(drop=True, inplace=True)
+            rows, difference = inconsistentRows(
+                self.transactions, np.concatenate([newRows - 1, newRows])
+            )
+
+            # known inconsistencies whose transactions are still neighbours
+            known = np.array(checkpoint.inconsistent, dtype=object).reshape(-1, 3)
+            position = pd.Index(uids).get_indexer(known[:, 0])
+            valid = (position >= 0) & (position < len(uids) - 1)
+            valid[valid] = uids[position[valid] + 1] == known[valid, 1]
+
+            rows = np.concatenate([rows, position[valid]])
+            difference = np.concatenate([difference, known[valid, 2].astype(int)])
+            order = np.argsort(rows, kind="stable")
+            rows, difference = rows[order], difference[order]
+
+        segments = traceSegments(self.transactions, rows, difference)
+        checkpoint = TraceCheckpoint.fromTransactions(
+            self.transactions, rows, difference
+        )
+        return segments, checkpoint
+
+    def update(self, transactionDataframe, fullGrouping=True):
+        """merge new transactions into the history
+
+        Without fullGrouping only the merged rows of the new file are grouped
+        and all other transactions keep their group.
+        """
+        addIdentifier(transactionDataframe, self.uidEngine)
+        if self.compact:
+            transactionDataframe["uid"] = uidToInt64(transactionDataframe["uid"])
+        mergedDf, newRows, result = mergeTransactions(
+            self.transactions, transactionDataframe
+        )
 
         self.transactions = mergedDf
-        self.checkSaldoTrace()
+        if not result.added:
+            return result
 
-        self.groupTransactions()
+        if fullGrouping:
+            self.groupTransactions()
+        else:
+            self.groupTransactions(newRows)
         self.transactions.reset_index(drop=True, inplace=True)
 
-    def groupTransactions(self):
+        return result
+
+    def groupTransactions(self, rows=None):
+        """assign groups to all transactions or only to the selected rows"""
         logger = logging.getLogger()
-        # reset groups
-        self.transactions.loc[:, "groupID"] = "None"
-
-        groups = self.groupSettings.groups
-
-        for key in self.groupSettings.dbIdentifier:
-            for grpName, grpList in groups.items():
-                searchPat = r"(" + r"|".join(grpList) + ")".lower()
-                matches = self.transactions[key].str.extractall(
-                    searchPat, re.IGNORECASE
-                )
-
-                if matches.empty:
-                    logger.info(f"Found no match for {grpList}")
-                    continue
-
-                ids = list(matches.index.droplevel(1).values)
-                freeIds = list(self.transactions.loc[ids, "groupID"] == "None")
-                ids = [i for i, b in zip(ids, freeIds) if b]
-                self.transactions.loc[ids, "groupID"] = grpName
-                for id in ids:
-                    data = self.transactions.loc[id]
-                    trans = f'{data["customer"]} \'{data["usage"]}\' {data["value"]} ({data["valuta"]})'
-                    logger.info(f"Match '{trans}' to group: '{grpName}'")
-
-        addIdentifier(self.transactions)
-
-    def search(self, search, categories):
-        keyword = rf"({search})"
-
-        ids = []
-        for cat in categories:
-            subDF = self.transactions[cat]
-            matches = subDF.str.extractall(keyword, re.IGNORECASE)
-            if not matches.empty:
-                tmp = list(matches.index.droplevel(1).values)
-                ids = ids + tmp
-
-        if ids:
-            return self.transactions.loc[np.unique(ids), :]
+
+        matcher = GroupMatcher.fromSettings(self.groupSettings)
+        if rows is None:
+            priorities = matcher.classify(
+                self.transactions, self.groupSettings.dbIdentifier
+            )
+            self.transactions["groupID"] = matcher.groupNamesOf(priorities)
         else:
-            return None
+            priorities = matcher.classify(
+                self.transactions[rows], self.groupSettings.dbIdentifier
+            )
+            if "groupID" not in self.transactions.columns:
+                self.transactions["groupID"] = NO_GROUP
+            self.transactions["groupID"] = self.transactions["groupID"].astype(object)
+            self.transactions.loc[rows, "groupID"] = matcher.groupNamesOf(priorities)
+
+        counts = np.bincount(priorities + 1, minlength=len(matcher.groupNames) + 1)
+        for grpName, count in zip(matcher.groupNames, counts[1:]):
+            if count:
+                logger.info(f"Matched {count} transactions to group: '{grpName}'")
+            else:
+                logger.info(f"Found no match for group: '{grpName}'")
+
+        self.applySchema()
+
+    def regroupTransactions(self, diff):
+        """group only the transactions affected by changed grouping rules"""
+        affected = diff.affectedRows(self.transactions, self.groupSettings.dbIdentifier)
+        if affected.any():
+            self.groupTransactions(affected)
+
+    def search(self, search, categories, index=None):
+        return searchTransactions(self.transactions, search, categories, index)
@@ -1,25 +1,113 @@
-import shutil
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 from econicer.account import BankAccount
-from econicer.ecoplot import EcoPlot
+from econicer.account import addIdentifier
+from econicer.aggregate import AGGREGATE_COLUMNS
+from econicer.aggregate import AggregateCube
+from econicer.account import TraceCheckpoint
+from econicer.account import searchTransactions
+from econicer.fileIO import COMPRESSION_SUFFIXES
 from econicer.fileIO import FileIO
-from econicer.report import ReportDocument
+from econicer.fileIO import expandFilePatterns
+from econicer.fileIO import readBankFile
+from econicer.grouping import NO_GROUP
+from econicer.grouping import GroupingDiff
+from econicer.grouping import groupMoves
+from econicer.importRegistry import ImportRecord
+from econicer.importRegistry import ImportRegistry
+from econicer.importRegistry import fileDigest
+from econicer.journal import Journal
+from econicer.journal import JournalEntry
+from econicer.schema import compactTransactions
+from econicer.schema import expandTransactions
+from econicer.schema import memoryReport
+from econicer.searchIndex import INDEXED_COLUMNS
+from econicer.searchIndex import SearchIndex
+from econicer.settings import STORAGE_FORMATS
 from econicer.settings import BankFileSettings
 from econicer.settings import DatabaseSettings
 from econicer.settings import EconicerSettings
 from econicer.settings import GroupSettings
 
+# columns loaded by the read only commands
+PRINT_COLUMNS = ["date", "customer", "usage", "saldo", "value", "groupID"]
+TRACE_COLUMNS = ["date", "saldo", "value"]
+
 
 def printSum(transactionDataframe):
     print(f"\n Sum of expenses: {transactionDataframe.value.sum():.2f}")
 
 
+def printMergeResult(result):
+    if result.added:
+        print(
+            f"Added {result.added} transactions from "
+            f"{result.firstDate:%Y-%m-%d} to {result.lastDate:%Y-%m-%d}"
+        )
+    else:
+        print("All transactions are already included")
+
+    if result.duplicates:
+        print(f"Skipped {result.duplicates} known transactions")
+
+
+def printTraceSegments(segments):
+    for segment in segments:
+        print(f"Warning! Saldo trace is inconsistent {segment}")
+
+
+def printMoves(moves):
+    if moves.empty:
+        print("No transaction changed its group")
+        return
+
+    print(f"{moves.sum()} transactions changed their group:")
+    for (oldGroup, newGroup), count in moves.items():
+        print(f"  {oldGroup} -> {newGroup}: {count}")
+
+
+def describeFiles(filepaths):
+    names = [Path(filepath).name for filepath in filepaths]
+    if len(names) > 3:
+        return f"{names[0]} and {len(names) - 1} more files"
+    return ", ".join(names)
+
+
+def journalMoves(transactions, rows, oldGroupIDs):
+    """uid and former group of all moved rows"""
+    uids = transactions["uid"].to_numpy()[rows].tolist()
+    return [[uid, groupID] for uid, groupID in zip(uids, list(oldGroupIDs))]
+
+
+def databaseFilename(storageFormat, compression=""):
+    """name of the database file, only CSV databases are compressed"""
+    filename = f"{AccountManager.dbName}.{storageFormat}"
+    if compression and storageFormat == "csv":
+        suffixes = {name: suffix for suffix, name in COMPRESSION_SUFFIXES.items()}
+        filename += suffixes[compression]
+    return filename
+
+
+def findAccountFile(db, name):
+    """existing database file of an account in any storage format"""
+    for storageFormat in STORAGE_FORMATS:
+        for compression in [""] + list(COMPRESSION_SUFFIXES.values()):
+            filepath = Path(db) / name / databaseFilename(storageFormat, compression)
+            if filepath.is_file():
+                return filepath
+    return None
+
+
 # account manager should open the file only once
 class AccountManager:
-    dbFileName = "history.csv"
+    dbName = "history"
+    stateFiles = ["grouping.json", "trace.json", "imports.json"]
 
     def __init__(self, databasePath=".db", settingsPath=".db//settings.json"):
         self.db = Path(databasePath)
@@ -38,17 +126,76 @@ class AccountManager:
 
         self.fileIO = FileIO(self.settings.currentAccountFile, self.dbSettings)
 
-        if Path(self.settings.currentAccountFile).is_file():
-            self.account = self.fileIO.readDB(self.groupSettings)
-            self.account.checkSaldoTrace()
-
-        else:
-            self.account = None
+        # the account is loaded on first access, queries read only what they need
+        self._account = None
+        self._projected = False
 
         self.plotPaths = {}
 
-    def defineAccountFilepath(self, name):
-        return self.db / name / self.dbFileName
+    @property
+    def account(self):
+        if self._account is None and Path(self.fileIO.filepath).is_file():
+            self._account = self.fileIO.readDB(
+                self.groupSettings, self.settings.compactSchema
+            )
+        elif self._projected:
+            # a projected account gets the remaining columns
+            self.loadColumns(self.dbSettings.table)
+            self._projected = False
+            transactions = self._account.transactions
+            order = [col for col in self.dbSettings.table if col in transactions]
+            self._account.transactions = transactions[order]
+        return self._account
+
+    @account.setter
+    def account(self, account):
+        self._account = account
+        self._projected = False
+
+    def loadColumns(self, columns):
+        """account with at least the given columns, other columns are only
+        loaded if they are needed later"""
+        if self._account is None:
+            if not Path(self.fileIO.filepath).is_file():
+                return None
+            self._account = self.fileIO.readDB(
+                self.groupSettings, self.settings.compactSchema, columns=columns
+            )
+            self._projected = True
+            return self._account
+
+        transactions = self._account.transactions
+        missing = [col for col in columns if col not in transactions.columns]
+        if missing and self._projected:
+            loaded = self.fileIO.readDB(
+                None, self.settings.compactSchema, columns=missing
+            ).transactions
+            positions = pd.Index(loaded["uid"]).get_indexer(transactions["uid"])
+            for col in missing:
+                if col in loaded.columns:
+                    transactions[col] = loaded[col].iloc[positions].to_numpy()
+        return self._account
+
+    def mappedColumns(self, columns):
+        """transactions with the given columns, mapped from a binary database
+        without copying the numeric, date and group columns if possible"""
+        if self._account is None:
+            transactions = self.fileIO.mapBinary(columns)
+            if transactions is not None:
+                return transactions
+        return self.loadColumns(columns).transactions
+
+    def defineAccountFilepath(self, name, storageFormat=None):
+        """database file of an account, an existing file of any storage format
+        is preferred over a new file in the given format"""
+        if storageFormat is None:
+            existing = findAccountFile(self.db, name)
+            if existing is not None:
+                return existing
+            storageFormat = self.settings.storageFormat
+        return (
+            self.db / name / databaseFilename(storageFormat, self.settings.compression)
+        )
 
     def updateAccountPaths(self, name, filepath):
         self.fileIO.updateFilepath(filepath)
@@ -64,127 +211,485 @@ class AccountManager:
         print(f"Initialize empty account for {name}")
         emptyTransactions = pd.DataFrame(columns=BankAccount.dataframeCols)
         self.account = BankAccount(
-            name, None, None, emptyTransactions, self.groupSettings
+            name,
+            None,
+            None,
+            emptyTransactions,
+            self.groupSettings,
+            self.settings.compactSchema,
         )
 
         self.updateAccountPaths(name, filepath)
 
         self.fileIO.writeDB(self.account)
+        self.fileIO.writeGroupingState(self.groupSettings)
+        self.fileIO.writeTraceCheckpoint(TraceCheckpoint())
         self.settings.write()
 
         return True
 
-    def update(self, filepath):
-        self.makeBackup()
+    def readBankFiles(self, filepaths):
+        """parse the bank files, several files are parsed concurrently"""
+        if len(filepaths) == 1:
+            return [readBankFile(filepaths[0], self.bankSettings)]
 
-        updateFile = FileIO(filepath, self.bankSettings)
-        updateAcc = updateFile.readDB(self.groupSettings)
+        workers = min(len(filepaths), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(
+                executor.map(
+                    readBankFile, filepaths, [self.bankSettings] * len(filepaths)
+                )
+            )
+
+    def update(self, filepaths):
+        """merge one or more bank files, directories or glob patterns into
+        the account, the database is grouped, verified and written once
 
-        if not len(self.account.accountNumber):
-            self.account.accountNumber = updateAcc.accountNumber
+        Only the write is proportional to the new transactions. The complete
+        history is still read to merge and group them, and the uids of a CSV
+        database are computed again while reading.
+        """
+        if isinstance(filepaths, (str, Path)):
+            filepaths = [filepaths]
+
+        filepaths = expandFilePatterns(filepaths)
+        if not filepaths:
+            print("No bank files found")
+            return
+
+        # files with known content are skipped before they are parsed
+        registry = self.importRegistry()
+        newFiles = {}
+        for filepath in filepaths:
+            digest = fileDigest(filepath)
+            if digest in registry or digest in newFiles.values():
+                print(f"{filepath} is already imported")
+            else:
+                newFiles[filepath] = digest
+        if not newFiles:
+            return
+        filepaths = list(newFiles)
+
+        stateFiles = self.readStateFiles()
+
+        # a changed header is only stored by a full write of the database
+        header = (self.account.accountNumber or None, self.account.bank or None)
+        frames = []
+        for filepath, ((_, accountNumber, bank), transactions) in zip(
+            filepaths, self.readBankFiles(filepaths)
+        ):
+            if not self.account.accountNumber:
+                self.account.accountNumber = accountNumber
+
+            if not self.account.bank:
+                self.account.bank = bank
+
+            # compare accounts
+            if self.account.accountNumber != accountNumber:
+                print(f"WARNING! Bank account number is mismatching in {filepath}")
+
+            if self.account.bank != bank:
+                print(f"WARNING! Bank institute is mismatching in {filepath}")
+
+            # rows of an imported file within a newer export are not merged
+            addIdentifier(transactions, self.account.uidEngine)
+            known = registry.knownRows(transactions["uid"])
+            registry.add(
+                ImportRecord.fromTransactions(
+                    newFiles[filepath], filepath, transactions
+                )
+            )
+            if known.any():
+                print(f"Skipped {known.sum()} imported rows in {filepath}")
+                transactions = transactions[~known]
+
+            if len(transactions):
+                frames.append(transactions)
+
+        if not frames:
+            print("All transactions are already included")
+            registry.write()
+            return
+
+        # newest files first keeps the order of transactions at the same day
+        frames.sort(key=lambda df: df["date"].max(), reverse=True)
+        updateTransactions = pd.concat(frames, ignore_index=True)
+        if len(frames) > 1:
+            print(
+                f"Read {len(updateTransactions)} transactions from {len(frames)} files"
+            )
+
+        # a full regroup is only needed if the grouping rules changed
+        groupingState = self.fileIO.readGroupingState() or {}
+        fingerprint = self.groupSettings.fingerprint()
+        fullGrouping = groupingState.get("fingerprint") != fingerprint
+        oldGroupIDs = []
+        if fullGrouping and "groupID" in self.account.transactions.columns:
+            oldGroupIDs = self.account.transactions["groupID"].to_numpy(dtype=object)
+        result = self.account.update(updateTransactions, fullGrouping=fullGrouping)
+        printMergeResult(result)
+
+        if not result.added:
+            registry.write()
+            return
+
+        # only the new rows and their neighbours need to be verified
+        segments, checkpoint = self.account.verifyTrace(
+            self.fileIO.readTraceCheckpoint(), result.rows
+        )
+        printTraceSegments(segments)
+
+        # without new grouping rules only the merged rows changed
+        moved, movedFrom = [], []
+        if fullGrouping and len(oldGroupIDs):
+            history = np.ones(len(self.account.transactions), dtype=bool)
+            history[result.rows] = False
+            groupIDs = self.account.transactions["groupID"].to_numpy(dtype=object)
+            changed = groupIDs[history] != oldGroupIDs
+            moved, movedFrom = np.flatnonzero(history)[changed], oldGroupIDs[changed]
+
+        if header != (self.account.accountNumber or None, self.account.bank or None):
+            self.fileIO.writeDB(self.account)
+        else:
+            self.fileIO.writeChanges(self.account, result.rows, moved)
+        self.fileIO.writeGroupingState(self.groupSettings)
+        self.fileIO.writeTraceCheckpoint(checkpoint)
+        registry.write()
+
+        transactions = self.account.transactions
+        self.journal().append(
+            JournalEntry(
+                "update",
+                describeFiles(filepaths),
+                added=transactions["uid"].to_numpy()[result.rows].tolist(),
+                moved=journalMoves(transactions, moved, movedFrom),
+                header=list(header),
+                stateFiles=stateFiles,
+            )
+        )
 
-        if not len(self.account.bank):
-            self.account.bank = updateAcc.bank
+        if self.searchIndexPath().is_file():
+            self.loadSearchIndex()
 
-        # compare accounts
-        if self.account.accountNumber != updateAcc.accountNumber:
-            print("WARNING! Bank account number is mismatching")
+    def verify(self):
+        """check the saldo trace of the complete history"""
+        segments, checkpoint = self.loadColumns(TRACE_COLUMNS).verifyTrace()
+        if segments:
+            printTraceSegments(segments)
+        else:
+            print("Saldo trace is consistent")
+        self.fileIO.writeTraceCheckpoint(checkpoint)
+        return segments
+
+    def convertDB(self, storageFormat):
+        """store the current account in another storage format"""
+        oldPath = Path(self.settings.currentAccountFile)
+        newPath = self.defineAccountFilepath(
+            self.settings.currentAccount, storageFormat
+        )
+        if newPath == oldPath:
+            print(f"Account is already stored as {storageFormat}")
+            return
+
+        account = self.account
+        if account is None:
+            print("No account to convert")
+            return
+
+        self.fileIO.updateFilepath(newPath)
+        try:
+            self.fileIO.writeDB(account)
+        except ValueError as error:
+            self.fileIO.updateFilepath(oldPath)
+            print(f"Conversion to {storageFormat} failed, keeping {oldPath}: {error}")
+            return
+
+        converted = self.fileIO.readDB(self.groupSettings, self.settings.compactSchema)
+        # each format adds the uid and group columns at its own position
+        columns = account.transactions.columns
+        if not expandTransactions(
+            converted.transactions.reindex(columns=columns)
+        ).equals(expandTransactions(account.transactions)):
+            newPath.unlink()
+            self.fileIO.updateFilepath(oldPath)
+            # writeDB merged the delta segments of the old database
+            self.fileIO.writeDB(account)
+            print(f"Conversion to {storageFormat} failed, keeping {oldPath}")
+            return
+
+        oldPath.unlink()
+        self.settings.currentAccountFile = str(newPath)
+        self.settings.write()
+        print(f"Converted {oldPath} to {newPath}")
 
-        if self.account.bank != updateAcc.bank:
-            print("WARNING! Bank institute is mismatching")
+    def memoryReport(self):
+        """memory per transaction with and without the compact schema"""
+        account = self.fileIO.readDB(self.groupSettings)
+        report = memoryReport(
+            account.transactions, compactTransactions(account.transactions)
+        )
+        noRows = len(account.transactions)
 
-        startDate = updateAcc.transactions["date"].iloc[-1]
-        endDate = updateAcc.transactions["date"].iloc[0]
-        print(f"adding transaction data from {startDate} to {endDate}")
+        print(f"Memory per transaction in bytes for {noRows} transactions")
+        print(report.round({"before": 1, "after": 1, "ratio": 2}))
+        print(
+            f"Total: {report.loc['total', 'before'] * noRows / 2**20:.2f} MiB "
+            f"before, {report.loc['total', 'after'] * noRows / 2**20:.2f} MiB after"
+        )
+        return report
 
-        if not self.account.transactions.empty:
-            startDateHistory = self.account.transactions["date"].iloc[-1]
-            endDateHistory = self.account.transactions["date"].iloc[0]
-            if startDate > endDateHistory:
-                print(
-                    "Warning! New dataset does not start in the known date range. There might be a gap in the datasets"
-                )
-            if endDateHistory > endDate:
-                print(
-                    "The date timestamps indicate that the dataset is already included. The program will stop now"
-                )
-                exit()
-        self.account.update(updateAcc.transactions)
+    def searchIndexPath(self):
+        return self.fileIO.sidecarPath("search.npz")
 
-        self.fileIO.writeDB(self.account)
+    def loadSearchIndex(self, transactions=None):
+        """load the search index and add all transactions missing in it"""
+        if transactions is None:
+            transactions = self.account.transactions
 
-    def makeBackup(self):
-        undoFile = f"{self.settings.currentAccountFile}.old"
-        shutil.copy2(self.settings.currentAccountFile, undoFile)
+        indexPath = self.searchIndexPath()
+        if indexPath.is_file():
+            index = SearchIndex.load(indexPath)
+            if not index.compatible(transactions):
+                index = SearchIndex()
+        else:
+            index = SearchIndex()
 
-    def undo(self):
-        undoFile = f"{self.settings.currentAccountFile}.old"
-        shutil.copy2(undoFile, self.settings.currentAccountFile)
+        if index.sync(transactions):
+            index.save(indexPath)
+        return index
 
-    def regroup(self):
-        self.makeBackup()
+    def compactDB(self):
+        """merge all delta segments into the database file"""
+        noSegments = len(self.fileIO.deltaSegments())
+        if not noSegments:
+            print("Database has no delta segments")
+            return
 
-        self.account.groupTransactions()
         self.fileIO.writeDB(self.account)
+        print(f"Merged {noSegments} delta segments into the database")
+
+    def journal(self):
+        return Journal(self.fileIO.sidecarPath("journal.jsonl"))
+
+    def importRegistry(self):
+        return ImportRegistry(self.fileIO.sidecarPath("imports.json"))
+
+    def readStateFiles(self):
+        """content of the state files to restore them on undo"""
+        stateFiles = {}
+        for extension in self.stateFiles:
+            statePath = self.fileIO.sidecarPath(extension)
+            if statePath.is_file():
+                stateFiles[extension] = statePath.read_text(encoding="utf-8")
+        return stateFiles
+
+    def writeStateFiles(self, stateFiles):
+        for extension in self.stateFiles:
+            statePath = self.fileIO.sidecarPath(extension)
+            if extension in stateFiles:
+                statePath.write_text(stateFiles[extension], encoding="utf-8")
+            elif statePath.is_file():
+                statePath.unlink()
+
+    def listHistory(self):
+        """print the journal of changes, the newest first"""
+        entries = self.journal().entries()
+        if not entries:
+            print("No changes recorded")
+        for number, entry in enumerate(entries[::-1], start=1):
+            print(f"{number:>3}  {entry.summary()}")
+
+    def undo(self, number=1):
+        """revert the last changes recorded in the journal"""
+        entries = self.journal().pop(number)
+        if not entries:
+            print("Nothing to undo")
+            return
+
+        account = self.account
+        for entry in entries:
+            entry.revert(account)
+            print(f"Undo {entry.summary()}")
+        account.applySchema()
+
+        self.fileIO.writeDB(account)
+        self.writeStateFiles(entries[-1].stateFiles)
+
+    def regroup(self, full=False):
+        """apply changed grouping rules, only affected transactions are
+        evaluated again unless a full regroup is requested"""
+        groupingState = self.fileIO.readGroupingState() or {}
+        full = full or "groups" not in groupingState
+        if not full:
+            diff = GroupingDiff.fromRules(
+                groupingState["groups"],
+                groupingState["dbIdentifier"],
+                self.groupSettings.groups,
+                self.groupSettings.dbIdentifier,
+            )
+            if diff.empty:
+                # nothing is written, so the journal keeps its undo entries
+                print("Grouping rules are unchanged")
+                return
+
+        stateFiles = self.readStateFiles()
+        oldGroupIDs = self.account.transactions["groupID"].copy()
+
+        if full:
+            self.account.groupTransactions()
+        else:
+            for line in diff.describe():
+                print(line)
+            self.account.regroupTransactions(diff)
+
+        newGroupIDs = self.account.transactions["groupID"]
+        moves = groupMoves(oldGroupIDs, newGroupIDs)
+        printMoves(moves)
+
+        oldGroupIDs = np.asarray(oldGroupIDs, dtype=object)
+        moved = np.flatnonzero(oldGroupIDs != np.asarray(newGroupIDs, dtype=object))
+        if len(moved):
+            self.fileIO.writeChanges(self.account, movedRows=moved)
+        self.fileIO.writeGroupingState(self.groupSettings)
+
+        self.journal().append(
+            JournalEntry(
+                "regroup",
+                "all transactions" if full else "changed rules",
+                moved=journalMoves(
+                    self.account.transactions, moved, oldGroupIDs[moved]
+                ),
+                stateFiles=stateFiles,
+            )
+        )
 
-    def printTransactions(self, transactions):
+    def printTransactions(self, transactions, columns=PRINT_COLUMNS):
         pd.set_option("display.max_rows", None)
         pd.set_option("display.max_colwidth", None)
-        print(transactions[["date", "customer", "usage", "saldo", "value", "groupID"]])
+        print(transactions[columns])
         printSum(transactions)
 
-    def listNoGroups(self, category=None):
+    def listNoGroups(self, category=None, since=None, until=None):
+        columns = PRINT_COLUMNS
         if category:
-            trans = self.account.transactions[category[0]]
-        else:
-            trans = self.account.transactions
-        noGrp = trans[self.account.transactions["groupID"] == "None"]
+            columns = list(dict.fromkeys(["date", category[0], "value"]))
+        noGrp = self.fileIO.readTransactions(
+            columns, groupID=NO_GROUP, since=since, until=until
+        )
         if noGrp.empty:
             print("All transactions are grouped.")
         else:
-            self.printTransactions(noGrp)
+            self.printTransactions(noGrp, columns)
 
-    def listGroup(self, group):
-        transFiltered = self.account.transactions[
-            self.account.transactions["groupID"] == group
-        ]
+    def listGroup(self, group, since=None, until=None):
+        transFiltered = self.fileIO.readTransactions(
+            PRINT_COLUMNS, groupID=group, since=since, until=until
+        )
         self.printTransactions(transFiltered)
 
-    def search(self, search, categories):
+    def search(self, search, categories, since=None, until=None):
         if categories is None:
             categories = ["usage"]
 
         print(f"Searching for {search} in {categories}")
-        result = self.account.search(search, categories)
+        # the index is synced with the indexed columns of new transactions
+        columns = list(dict.fromkeys(PRINT_COLUMNS + INDEXED_COLUMNS + categories))
+        if since is None and until is None:
+            transactions = self.loadColumns(columns).transactions
+        else:
+            transactions = self.fileIO.readTransactions(
+                columns + ["uid"], since=since, until=until
+            )
+
+        index = self.loadSearchIndex(transactions)
+        result = searchTransactions(transactions, search, categories, index)
 
         if result is not None:
             self.printTransactions(result)
         else:
             print("Could not find any matches")
 
-    def createPlots(self):
+    def aggregate(self):
+        """sums per year, month, group and sign of the account, the database
+        is streamed in batches if chunkRows is set"""
+        if self.settings.chunkRows:
+            chunks = self.fileIO.iterTransactions(
+                AGGREGATE_COLUMNS, self.settings.chunkRows
+            )
+            return AggregateCube.fromChunks(chunks)
+        return AggregateCube.fromTransactions(self.mappedColumns(AGGREGATE_COLUMNS))
+
+    def summary(self):
+        """print the yearly income, expenses and sums per group"""
+        cube = self.aggregate()
+        groups = cube.yearlyGroupSums().fillna(0)
+        totals = pd.DataFrame(
+            {
+                "income": [cube.groupSums(1, year).sum() for year in groups.index],
+                "expenses": [cube.groupSums(-1, year).sum() for year in groups.index],
+            },
+            index=groups.index,
+        )
+        summary = pd.concat({"total": totals, "group": groups}, axis=1)
+
+        with pd.option_context("display.max_columns", None, "display.width", 200):
+            print(summary.round(2).T)
+        return summary
+
+    def renderOptions(self, formats=None):
+        """plot options of the render profile in the settings"""
+        # matplotlib is only imported when plotting
+        from econicer.ecoplot import PlotOptions
+
+        profiles = {**EconicerSettings.renderProfiles, **self.settings.renderProfiles}
+        profile = self.settings.renderProfile
+        if profile not in profiles:
+            print(f"Unknown render profile {profile}, using print")
+            profile = "print"
+        options = PlotOptions(**profiles[profile])
+        if formats is not None:
+            options.formats = list(formats)
+        return profile, options
+
+    def createPlots(self, cube=None, force=False, formats=None):
         plotDir = Path(self.settings.plotDir)
         if not plotDir.exists():
             plotDir.mkdir(parents=True)
 
-        transactions = self.account.transactions.copy()
-        transactions["value"] = transactions["value"] / 100
-        transactions["saldo"] = transactions["saldo"] / 100
+        # all plots read the sums of one aggregation of the history
+        if cube is None:
+            cube = self.aggregate()
 
-        ep = EcoPlot(plotDir)
+        from econicer.ecoplot import EcoPlot
+
+        profile, plotOptions = self.renderOptions(formats)
+        ep = EcoPlot(plotDir, plotOptions, force=force)
         """
-        ep.plotCategoriesRatioMonthly(transactions)
-        ep.plotCategoriesMonthly(transactions)
+        ep.plotCategoriesRatioMonthly(cube)
+        ep.plotCategoriesMonthly(cube)
         """
-        ep.plotCategoriesFlow(transactions)
-        ep.sankeyPlot(transactions)
-        ep.plotHbarSplit(transactions)
-        ep.plotTimeline(transactions)
-        ep.plotPieSplit(transactions)
-        ep.plotBars(transactions)
-        ep.plotCategories(transactions)
-        ep.plotBarsYearly(transactions, self.groupSettings.groupTypes)
-        ep.plotCategoriesYearly(transactions)
+        ep.plotCategoriesFlow(cube)
+        ep.sankeyPlot(cube)
+        ep.plotHbarSplit(cube)
+        ep.plotTimeline(cube)
+        ep.plotPieSplit(cube)
+        ep.plotBars(cube)
+        ep.plotCategories(cube)
+        ep.plotBarsYearly(cube, self.groupSettings.groupTypes)
+        ep.plotCategoriesYearly(cube)
+
+        start = time.perf_counter()
+        failed = ep.render(self.settings.plotWorkers or os.cpu_count() or 1)
+        duration = time.perf_counter() - start
+        for ref, error in failed:
+            print(f"Plot {ref.name} failed: {error}")
+        formats = ", ".join(plotOptions.formats)
+        print(
+            f"Rendered {ep.rendered} plots as {formats} with the {profile} profile "
+            f"in {duration:.2f} s"
+        )
+        if ep.skipped:
+            print(f"Skipped {ep.skipped} unchanged plots")
 
         # self.plotPaths = ep.plotPaths
         return ep.reg
@@ -195,7 +700,12 @@ class AccountManager:
         # yearly average value for each category
 
     def createReport(self):
-        reg = self.createPlots()
+        # pylatex is only imported for the report
+        from econicer.report import ReportDocument
+
+        cube = self.aggregate()
+        # the report only includes the pdf files of the plots
+        reg = self.createPlots(cube, formats=["pdf"])
         self.calculateStatistics()
 
         rp = ReportDocument(
@@ -204,10 +714,7 @@ class AccountManager:
         rp.addOverallSection()
         rp.addStatisticsSection(self.statistics)
 
-        transactions = self.account.transactions.copy()
-        transactions["value"] = transactions["value"] / 100
-        transactions["saldo"] = transactions["saldo"] / 100
-        rp.addYearlyReports(transactions)
+        rp.addYearlyReports(cube)
         rp.addFlowSection()
 
         rp.generatePDF()
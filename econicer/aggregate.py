@@ -0,0 +1,195 @@
+from dataclasses import dataclass
+from dataclasses import field
+
+import numpy as np
+import pandas as pd
+
+# columns needed to aggregate the transactions
+AGGREGATE_COLUMNS = ["date", "saldo", "value", "groupID"]
+CUBE_LEVELS = ["year", "month", "groupID", "sign"]
+# partial results are combined after this many chunks
+COMBINE_CHUNKS = 16
+
+
+def aggregateChunk(transactions):
+    """sums and counts of one chunk per year, month, group and sign of the
+    value, the sums per day and group and the saldo at the end of each day"""
+    # the empty database of a new account has no typed date column
+    dates = pd.to_datetime(transactions["date"])
+    values = transactions["value"].to_numpy(dtype=np.int64)
+    groupIDs = transactions["groupID"].to_numpy(dtype=object)
+
+    keys = pd.DataFrame(
+        {
+            "year": dates.dt.year.to_numpy(),
+            "month": dates.dt.month.to_numpy(),
+            "groupID": groupIDs,
+            "sign": np.sign(values),
+            "value": values,
+            "count": np.ones(len(values), dtype=np.int64),
+        }
+    )
+    sums = keys.groupby(CUBE_LEVELS, sort=False)[["value", "count"]].sum()
+
+    daily = pd.DataFrame(
+        {"date": dates.dt.normalize().to_numpy(), "groupID": groupIDs, "value": values}
+    )
+    daily = daily.groupby(["date", "groupID"], sort=False)["value"].sum()
+
+    # the transactions are ordered from newest to oldest
+    saldo = pd.Series(dtype=np.int64)
+    if "saldo" in transactions.columns:
+        saldo = pd.Series(
+            transactions["saldo"].to_numpy(dtype=np.int64),
+            index=dates.dt.normalize().to_numpy(),
+        )
+        saldo = saldo.groupby(level=0, sort=False).first()
+    return sums, daily, saldo
+
+
+def newestSaldo(partials):
+    """saldo at the end of each day from partial results with the rank of
+    their chunk, the lowest rank holds the newest transaction of a day"""
+    saldo = pd.concat(partials).sort_values("rank", kind="stable")
+    return saldo.groupby(level=0, sort=False).first()
+
+
+def combine(partials):
+    if len(partials) == 1:
+        return partials[0]
+    levels = list(range(partials[0].index.nlevels))
+    return pd.concat(partials).groupby(level=levels, sort=False).sum()
+
+
+@dataclass
+class AggregateCube:
+    """Sums and counts of the transactions per year, month, group and sign
+
+    Values are in cents. The sums of the chunks of a database are added up,
+    so the cube can be built without loading the whole history at once.
+    """
+
+    sums: pd.DataFrame
+    daily: pd.Series
+    saldo: pd.Series = field(default_factory=lambda: pd.Series(dtype=np.int64))
+
+    @classmethod
+    def fromTransactions(cls, transactions):
+        return cls.fromChunks([transactions])
+
+    @classmethod
+    def fromChunks(cls, chunks):
+        partialSums = []
+        partialDaily = []
+        partialSaldo = []
+        # rank of the chunks at the same day, like FileIO.overlayDeltas merges
+        # a delta segment before the known transactions of a day if it adds
+        # newer data and after them otherwise
+        newest, lowest, highest = None, 0, -1
+        for chunk in chunks:
+            sums, daily, saldo = aggregateChunk(chunk)
+            partialSums.append(sums)
+            partialDaily.append(daily)
+
+            if len(saldo):
+                chunkNewest = saldo.index.max()
+                if chunk.attrs.get("segment") and newest is not None:
+                    newer = chunkNewest >= newest
+                else:
+                    # chunks of the database are ordered from newest to oldest
+                    newer = False
+                if newer:
+                    lowest = rank = lowest - 1
+                else:
+                    highest = rank = highest + 1
+                newest = chunkNewest if newest is None else max(newest, chunkNewest)
+                partialSaldo.append(saldo.to_frame("saldo").assign(rank=rank))
+
+            if len(partialSums) >= COMBINE_CHUNKS:
+                partialSums = [combine(partialSums)]
+                partialDaily = [combine(partialDaily)]
+                partialSaldo = [newestSaldo(partialSaldo)] if partialSaldo else []
+
+        if not partialSums:
+            return cls.fromTransactions(
+                pd.DataFrame(
+                    {
+                        "date": pd.Series(dtype="datetime64[ns]"),
+                        "saldo": pd.Series(dtype=np.int64),
+                        "value": pd.Series(dtype=np.int64),
+                        "groupID": pd.Series(dtype=object),
+                    }
+                )
+            )
+
+        sums = combine(partialSums).sort_index()
+        daily = combine(partialDaily).sort_index()
+        saldo = pd.Series(dtype=np.int64)
+        if partialSaldo:
+            saldo = newestSaldo(partialSaldo)["saldo"].sort_index()
+        return cls(sums, daily, saldo)
+
+    def select(self, groupIDs=None, sign=None, year=None):
+        sums = self.sums
+        if groupIDs is not None:
+            sums = sums[sums.index.get_level_values("groupID").isin(groupIDs)]
+        if sign is not None:
+            sums = sums[sums.index.get_level_values("sign") == sign]
+        if year is not None:
+            sums = sums[sums.index.get_level_values("year") == year]
+        return sums
+
+    def years(self):
+        return sorted(int(y) for y in self.sums.index.get_level_values("year").unique())
+
+    def groups(self):
+        return sorted(self.sums.index.get_level_values("groupID").unique())
+
+    def posNegSums(self, groupIDs=None):
+        """monthly income and expenses in EUR with months as index and years
+        as columns, months without transactions are missing"""
+        sums = self.select(groupIDs)
+        months = sums.groupby(level=["month", "year"])["value"].sum()
+
+        result = []
+        for sign in [1, -1]:
+            signed = sums[sums.index.get_level_values("sign") == sign]
+            signed = signed.groupby(level=["month", "year"])["value"].sum()
+            signed = signed.reindex(months.index, fill_value=0)
+            result.append((signed.abs() / 100).unstack("year"))
+        return tuple(result)
+
+    def groupSums(self, sign=None, year=None):
+        """sum per group in EUR"""
+        sums = self.select(sign=sign, year=year)
+        return sums.groupby(level="groupID")["value"].sum() / 100
+
+    def yearlyGroupSums(self):
+        """sum in EUR with years as index and groups as columns"""
+        sums = self.sums.groupby(level=["year", "groupID"])["value"].sum()
+        return sums.unstack("groupID") / 100
+
+    def monthlyGroupSums(self, fillValue=None):
+        """sum in EUR with the first day of every month as index and groups
+        as columns"""
+        sums = self.sums.groupby(level=["year", "month", "groupID"])["value"].sum()
+        sums = sums.unstack("groupID", fill_value=fillValue) / 100
+        sums.index = pd.to_datetime(
+            pd.DataFrame(
+                {
+                    "year": sums.index.get_level_values("year"),
+                    "month": sums.index.get_level_values("month"),
+                    "day": 1,
+                }
+            )
+        )
+        return sums
+
+    def groupFlow(self, groupID):
+        """cumulative sum in EUR of one group at the end of every day"""
+        daily = self.daily[self.daily.index.get_level_values("groupID") == groupID]
+        return daily.droplevel("groupID").cumsum() / 100
+
+    def timeline(self):
+        """saldo in EUR at the end of every day with transactions"""
+        return self.saldo / 100
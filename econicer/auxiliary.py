@@ -1,6 +1,10 @@
 import json
 import datetime
 import numpy as np
+import pandas as pd
+
+# amounts with more digits are left to str2num, the cents fit into int64
+MAX_AMOUNT_DIGITS = 16
 
 
 def nextMonth(date):
@@ -65,6 +69,148 @@ def str2num(stringInput):
         return mult * v
 
 
+class AmountError(ValueError):
+    """malformed amounts of a column, raised after all cells are checked"""
+
+
+def parseAsciiAmounts(strings):
+    """str2num for plain ASCII amounts on a byte matrix with one row per cell
+
+    Returns the cents and a mask of the converted cells. Cells with other
+    characters than digits, '.', ',' and '-' are not converted.
+    """
+    cents = np.zeros(len(strings), dtype=np.int64)
+    converted = np.zeros(len(strings), dtype=bool)
+
+    try:
+        encoded = strings.astype(bytes)
+        ascii = np.ones(len(strings), dtype=bool)
+    except UnicodeEncodeError:
+        ascii = np.fromiter((s.isascii() for s in strings), bool, len(strings))
+        encoded = strings[ascii].astype(bytes)
+    if not encoded.dtype.itemsize:
+        return cents, converted
+
+    # one contiguous array per character position
+    chars = encoded.view(np.uint8).reshape(len(encoded), encoded.dtype.itemsize)
+    euros = np.zeros(len(chars), dtype=np.int64)
+    cent = np.zeros(len(chars), dtype=np.int64)
+    noEuroDigits = np.zeros(len(chars), dtype=np.int64)
+    noCentDigits = np.zeros(len(chars), dtype=np.int64)
+    noCommas = np.zeros(len(chars), dtype=np.int64)
+    negative = np.zeros(len(chars), dtype=bool)
+    hasDot = np.zeros(len(chars), dtype=bool)
+    unknown = np.zeros(len(chars), dtype=bool)
+
+    # str2num removes all '-' and '.', the text is split at the only ','
+    for char in np.ascontiguousarray(chars.T):
+        isDigit = (char >= ord("0")) & (char <= ord("9"))
+        isComma = char == ord(",")
+        isDot = char == ord(".")
+        isMinus = char == ord("-")
+        unknown |= ~(isDigit | isComma | isDot | isMinus | (char == 0))
+
+        digit = char.astype(np.int64) - ord("0")
+        euroDigit = isDigit & (noCommas == 0)
+        centDigit = isDigit & (noCommas > 0)
+        euros = np.where(euroDigit, 10 * euros + digit, euros)
+        cent = np.where(centDigit, 10 * cent + digit, cent)
+        noEuroDigits += euroDigit
+        noCentDigits += centDigit
+
+        noCommas += isComma
+        negative |= isMinus
+        hasDot |= isDot
+
+    hasComma = noCommas > 0
+    plain = ~unknown & (noEuroDigits > 0) & (noEuroDigits <= MAX_AMOUNT_DIGITS)
+    plain &= np.where(
+        hasComma,
+        (noCommas == 1) & (noCentDigits > 0) & (noCentDigits <= MAX_AMOUNT_DIGITS),
+        ~hasDot,
+    )
+
+    value = np.where(hasComma, 100 * euros + cent, euros)
+    value[negative] *= -1
+
+    rows = np.flatnonzero(ascii)
+    cents[rows] = np.where(plain, value, 0)
+    converted[rows] = plain
+    return cents, converted
+
+
+def parseAmounts(amounts):
+    """vectorized str2num for a column, returns the amounts in cents and the
+    malformed cells which could not be converted
+
+    Plain amounts with German or English separators are converted on the
+    whole column, all other cells are passed to str2num itself, so the
+    result equals str2num for every cell.
+    """
+    invalid = pd.Series(index=amounts.index[:0], dtype=object)
+    if not len(amounts):
+        return amounts.copy(), invalid
+
+    if pd.api.types.is_integer_dtype(amounts.dtype):
+        return amounts.astype(np.int64), invalid
+
+    if pd.api.types.is_float_dtype(amounts.dtype):
+        finite = np.isfinite(amounts.to_numpy())
+        cents = np.trunc(
+            amounts.to_numpy() * 100, where=finite, out=np.zeros(len(amounts))
+        )
+        return (
+            pd.Series(cents.astype(np.int64), index=amounts.index, name=amounts.name),
+            amounts[~finite],
+        )
+
+    values = amounts.to_numpy(dtype=object)
+    if pd.api.types.infer_dtype(values, skipna=False) == "string":
+        isString = np.ones(len(values), dtype=bool)
+    else:
+        isString = np.fromiter((isinstance(v, str) for v in values), bool, len(values))
+
+    cents, converted = parseAsciiAmounts(values[isString])
+
+    if isString.all() and converted.all():
+        return pd.Series(cents, index=amounts.index, name=amounts.name), invalid
+
+    # everything else gets the exact behaviour of str2num
+    result = np.empty(len(values), dtype=object)
+    stringRows = np.flatnonzero(isString)
+    result[stringRows[converted]] = cents[converted].tolist()
+
+    malformed = []
+    for row in np.setdiff1d(np.arange(len(values)), stringRows[converted]):
+        try:
+            result[row] = str2num(values[row])
+        except (ValueError, TypeError, OverflowError):
+            malformed.append(row)
+
+    if malformed:
+        invalid = amounts.iloc[malformed]
+    return (
+        pd.Series(result, index=amounts.index, name=amounts.name).infer_objects(),
+        invalid,
+    )
+
+
+def str2numColumn(amounts):
+    """str2num for a whole column, raises an AmountError listing all
+    malformed cells"""
+    cents, invalid = parseAmounts(amounts)
+    if len(invalid):
+        cells = ", ".join(
+            f"{row}: {value!r}" for row, value in invalid.head(10).items()
+        )
+        more = f" and {len(invalid) - 10} more" if len(invalid) > 10 else ""
+        raise AmountError(
+            f"{len(invalid)} malformed amounts in column {amounts.name} "
+            f"(row: value) {cells}{more}"
+        )
+    return cents
+
+
 def json2Dict(filepath):
     with open(str(filepath), "r", encoding="utf-8") as jsonFile:
         jsonContent = jsonFile.read()
@@ -4,6 +4,9 @@ from pathlib import Path
 import logging
 
 from econicer.accountManager import AccountManager
+from econicer.accountManager import databaseFilename
+from econicer.accountManager import findAccountFile
+from econicer.settings import STORAGE_FORMATS
 from econicer.settings import EconicerSettings
 
 
@@ -36,7 +39,13 @@ def main():
         help="change account or create new",
         default="",
     )
-    parser.add_argument("-a", "--add", metavar="FILE", help="add to current account")
+    parser.add_argument(
+        "-a",
+        "--add",
+        metavar="FILE",
+        help="add files, directories or glob patterns to current account",
+        nargs="+",
+    )
     parser.add_argument(
         "-s",
         "--search",
@@ -54,6 +63,16 @@ def main():
     parser.add_argument(
         "-l", "--listGroup", metavar="GROUP", help="display current settings"
     )
+    parser.add_argument(
+        "--since",
+        metavar="DATE",
+        help="only list or search transactions on or after the date",
+    )
+    parser.add_argument(
+        "--until",
+        metavar="DATE",
+        help="only list or search transactions on or before the date",
+    )
     parser.add_argument(
         "-ls", "--listSettings", help="display current settings", action="store_true"
     )
@@ -64,10 +83,57 @@ def main():
         action="store_true",
     )
     parser.add_argument(
-        "-u", "--undo", help="Undo last change on database", action="store_true"
+        "-u",
+        "--undo",
+        metavar="N",
+        help="Undo the last N changes on database, by default the last one",
+        nargs="?",
+        const=1,
+        type=int,
+    )
+    parser.add_argument(
+        "--history",
+        help="list the recorded changes on database, the newest first",
+        action="store_true",
     )
     parser.add_argument("-g", "--group", help="regroup database", action="store_true")
+    parser.add_argument(
+        "--fullGroup",
+        help="regroup every transaction, not only the ones affected by changed rules",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--verify",
+        help="check the saldo trace of the complete history",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--convert",
+        metavar="FORMAT",
+        help="store the current account in another format",
+        choices=STORAGE_FORMATS,
+    )
+    parser.add_argument(
+        "--compactDB",
+        help="merge the appended delta segments into the database file",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--memory",
+        help="report the memory per transaction with the compact schema",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--summary",
+        help="print the yearly income, expenses and sums per group",
+        action="store_true",
+    )
     parser.add_argument("-p", "--plot", help="make plots", action="store_true")
+    parser.add_argument(
+        "--rebuildPlots",
+        help="render all plots, also the ones whose data did not change",
+        action="store_true",
+    )
     parser.add_argument("-r", "--report", help="automated report", action="store_true")
 
     args = parser.parse_args()
@@ -103,14 +169,24 @@ def main():
 
     # change settings
     if args.change:
-        accPath = db / "//".join([args.change, AccountManager.dbFileName])
+        accPath = findAccountFile(db, args.change)
+        if accPath is None:
+            accFile = databaseFilename(
+                ecoSettings.storageFormat, ecoSettings.compression
+            )
+            accPath = db / args.change / accFile
         ecoSettings.changeAccount(args.change, accPath)
         ecoSettings.write()
         exit()
 
+    if args.history:
+        accountMan = AccountManager()
+        accountMan.listHistory()
+        exit()
+
     if args.undo:
         accountMan = AccountManager()
-        accountMan.undo()
+        accountMan.undo(args.undo)
         exit()
 
     # init new account
@@ -127,33 +203,56 @@ def main():
         accountMan.update(args.add)
 
     # regroup database
-    if args.group:
+    if args.group or args.fullGroup:
         accountMan = AccountManager()
-        accountMan.regroup()
+        accountMan.regroup(full=args.fullGroup)
+
+    # check the saldo trace of the complete history
+    if args.verify:
+        accountMan = AccountManager()
+        accountMan.verify()
+
+    # change the storage format of the current account
+    if args.convert:
+        accountMan = AccountManager()
+        accountMan.convertDB(args.convert)
+
+    # merge the delta segments of the current account
+    if args.compactDB:
+        accountMan = AccountManager()
+        accountMan.compactDB()
+
+    # memory usage of the current account
+    if args.memory:
+        accountMan = AccountManager()
+        accountMan.memoryReport()
 
     # list all transactions in current account without group
     if args.listNoGroup:
         accountMan = AccountManager()
-        accountMan.listNoGroups(args.category)
+        accountMan.listNoGroups(args.category, args.since, args.until)
 
     # list all transactions in current account without group
     if args.listGroup:
         accountMan = AccountManager()
-        accountMan.listGroup(args.listGroup)
+        accountMan.listGroup(args.listGroup, args.since, args.until)
 
     # search for keyword in specified categories
     if args.search:
         accountMan = AccountManager()
-        accountMan.search(args.search, args.category)
+        accountMan.search(args.search, args.category, args.since, args.until)
+
+    # yearly sums of the current account
+    if args.summary:
+        accountMan = AccountManager()
+        accountMan.summary()
 
     # Create plots from current history
-    if args.plot:
+    if args.plot or args.rebuildPlots:
         accountMan = AccountManager()
-        accountMan.createPlots()
+        accountMan.createPlots(force=args.rebuildPlots)
 
     # print report for all account data
     if args.report:
         accountMan = AccountManager()
-        if not len(accountMan.plotPaths):
-            accountMan.createPlots()
         accountMan.createReport()
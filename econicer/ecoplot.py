@@ -1,50 +1,30 @@
+import hashlib
+import json
+import types
 import matplotlib.pyplot as plt
 from cycler import cycler
 import pandas as pd
 import numpy as np
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from itertools import cycle
 from enum import Enum, auto
-from typing import List, Union
+from typing import Callable, List, Union
 
-plt.style.use(Path(__file__).parent / "glumt.mplrc")
+STYLE_FILE = Path(__file__).parent / "glumt.mplrc"
+plt.style.use(STYLE_FILE)
 
-
-def nestedSet(dic, keys, value):
-    for key in keys[:-1]:
-        dic = dic.setdefault(key, {})
-    dic[keys[-1]] = value
-
-
-def calcPosNegSums(df):
-    posSum = pd.pivot_table(
-        df,
-        index=df["date"].dt.month,
-        columns=df["date"].dt.year,
-        values="value",
-        aggfunc=lambda x: x[x > 0].sum(),
-    )
-    negSum = pd.pivot_table(
-        df,
-        index=df["date"].dt.month,
-        columns=df["date"].dt.year,
-        values="value",
-        aggfunc=lambda x: x[x < 0].sum(),
-    )
-    posSum = posSum.rename_axis("month")
-    posSum = posSum.rename_axis("year", axis="columns")
-    negSum = negSum.rename_axis("month")
-    negSum = negSum.rename_axis("year", axis="columns")
-    negSum = negSum.apply(np.abs)
-    return posSum, negSum
+# digests of the rendered plots in the plot directory
+CACHE_MANIFEST = "plotCache.json"
 
 
 @dataclass
 class PlotOptions:
     width: float
     height: float
-    formats = ["pdf", "png"]
+    formats: List[str] = field(default_factory=lambda: ["pdf", "png"])
+    dpi: int = 600
 
 
 OVERALL_TAG = "OVERALL"
@@ -83,6 +63,8 @@ class PlotRef:
     type: PlotType
     context: Union[str, int]
     format: str = "pdf"
+    # hash of everything the plot is drawn from
+    digest: str = field(default="", compare=False)
 
     @property
     def name(self):
@@ -93,430 +75,504 @@ class PlotRef:
         return self.dir / self.name
 
 
-@dataclass
-class EcoPlot:
-    plotDir: Path
-    plotOptions = PlotOptions(3.14, 2.355)
-    reg: List[PlotRef] = field(default_factory=list)
-    plotPaths = {"overall": {}, "years": {}}
+def saveFigure(
+    fig: plt.Figure,
+    filename: str,
+    plotOptions: PlotOptions,
+    width: float = None,
+    height: float = None,
+    skipTight: bool = False,
+):
+    if not width:
+        width = plotOptions.width
+
+    if not height:
+        height = plotOptions.height
+
+    fig.set_size_inches(width, height)
+    if not skipTight:
+        fig.tight_layout()
+
+    for filetype in plotOptions.formats:
+        fig.savefig(f"{filename}.{filetype}", dpi=plotOptions.dpi)
+
+
+def updateDigest(digest, obj):
+    if isinstance(obj, (pd.Series, pd.DataFrame)):
+        digest.update(pd.util.hash_pandas_object(obj).to_numpy().tobytes())
+        labels = obj.columns if isinstance(obj, pd.DataFrame) else [obj.name]
+        digest.update(repr((list(labels), obj.index.names, str(obj.dtypes))).encode())
+    elif isinstance(obj, (list, tuple)):
+        digest.update(f"{type(obj).__name__}{len(obj)}".encode())
+        for item in obj:
+            updateDigest(digest, item)
+    elif isinstance(obj, dict):
+        updateDigest(digest, sorted(obj.items()))
+    elif isinstance(obj, (set, frozenset)):
+        # the iteration order of a set of strings changes between runs
+        updateDigest(digest, sorted(obj, key=repr))
+    elif isinstance(obj, types.CodeType):
+        # constants like colors and labels are not part of the bytecode
+        digest.update(obj.co_code)
+        updateDigest(digest, obj.co_names)
+        updateDigest(digest, obj.co_consts)
+    else:
+        digest.update(repr(obj).encode())
+
+
+def plotDigest(draw, data, options):
+    """sha256 of the draw function, its data, the plot options and the style"""
+    digest = hashlib.sha256()
+    digest.update(draw.__qualname__.encode())
+    updateDigest(digest, draw.__code__)
+    updateDigest(digest, data)
+    updateDigest(digest, options)
+    digest.update(STYLE_FILE.read_bytes())
+    return digest.hexdigest()
+
+
+def drawTimeline(timeline):
+    fig = plt.figure()
+    fig.add_subplot(111)
+    plt.step(x=timeline["date"], y=timeline["saldo"])
+    plt.ylabel("Saldo / EUR")
+    plt.xticks(rotation=45)
+    return fig
+
+
+def drawPie(groupValues):
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    groupValues.plot.pie(y="value", figsize=(5, 5), ax=ax, legend=False)
+    plt.ylabel("")
+    return fig
+
+
+def drawHbar(groupValues):
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    groupValues.plot.barh(y="value", ax=ax, legend=False)
+    plt.xlabel("summation / EUR")
+    plt.ylabel("")
+    return fig
+
+
+def drawYearBars(yearDF):
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    yearDF.plot.bar(ax=ax)
+    plt.ylabel("summation / EUR")
+    plt.xticks(rotation=45)
+    # ax.set_ylim([minSaldo*1.1, maxSaldo*1.1])
+    return fig
+
+
+def drawMonthBars(incoming, outgoing, maxSaldo):
+    """stacked bars of the labeled monthly sums of a year"""
+    gap = 0.02
+    barWidth = 0.25
+    months = np.arange(1, 13)
+
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+
+    for offset, bars in [
+        (-barWidth / 2 - gap, incoming),
+        (barWidth / 2 + gap, outgoing),
+    ]:
+        bottom = np.zeros(12)
+        for label, data in bars:
+            ax.bar(months + offset, data, barWidth, label=label, bottom=bottom)
+            bottom += data
+
+    ax.set_ylim([0, maxSaldo * 1.1])
+    plt.ylabel("summation / EUR")
+    plt.legend()
+    return fig
+
+
+def drawCategoryYear(yearSelected):
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    yearSelected.plot.barh(y="value", ax=ax)
+    plt.xlabel("summation / EUR")
+    plt.ylabel("")
+    return fig
+
+
+def drawCategoryRatio(transInYear):
+    fig = plt.figure()
+    ax = fig.add_subplot(111)
+    colorcycle = cycler(color=plt.rcParams["axes.prop_cycle"].by_key()["color"])
+    linecycle = cycler("linestyle", ["-", "--", ":", "-."])
+    plt.gca().set_prop_cycle(linecycle * colorcycle)
+    transInYear.plot.line(ax=ax, legend=False, marker="o", ms=2, rot=45)
+    ax.set_yscale("symlog")
+    plt.ylabel("value / EUR")
+    plt.xlabel("")
+    return fig
+
+
+def drawCategoryRatioLegend(transInYear):
+    """legend of the ratio plots in a figure of the size of the legend"""
+    fig = drawCategoryRatio(transInYear)
+    handles, labels = fig.axes[0].get_legend_handles_labels()
+    plt.close(fig)
+
+    legFig = plt.figure()
+    leg = legFig.legend(handles=handles, labels=labels, loc="center")
+
+    leg.figure.canvas.draw()
+    bb = leg.get_window_extent()
+    width = (bb.x1 - bb.x0) / 100 + 2 * leg.borderaxespad * plt.rcParams[
+        "font.size"
+    ] / 72
+    height = (bb.y1 - bb.y0) / 100
+    legFig.set_size_inches(width, height)
+    return legFig
+
+
+def drawCategoryMonths(transInYear):
+    axes = transInYear.plot.bar(subplots=True, legend=False, rot=45)
+    fig = axes[0].get_figure()
+    # clearing axis tick labels
+    for x in axes:
+        x.set_xticklabels("")
+        x.set_title("")
+        x.set_xlabel("")
+    xlabels = [
+        pandas_datetime.strftime("%Y-%m") for pandas_datetime in transInYear.index
+    ]
+    axes[-1].set_xticklabels(xlabels)
+    lines = []
+    labels = []
+    for x in axes:
+        Line, Label = x.get_legend_handles_labels()
+        lines.extend(Line)
+        labels.extend(Label)
+
+    # rotating x-axis labels of last sub-plot
+    fig.legend(lines, labels, loc="upper center", ncol=5)
+
+    plt.subplots_adjust(top=0.90)
+    return fig
+
+
+def drawCategoryFlow(catData, cat):
+    fig = plt.figure()
+    fig.add_subplot(111)
+
+    plt.step(x=catData.index, y=catData)
+    plt.xlabel("")
+    plt.ylabel("value / EUR")
+    plt.xticks(rotation=45)
+    plt.title(cat)
+    return fig
+
+
+def drawSankey(labels, source, target, value):
+    import plotly.graph_objects as go
+
+    fig = go.Figure(
+        data=[
+            go.Sankey(
+                node=dict(
+                    pad=15,
+                    thickness=20,
+                    line=dict(color="black", width=0.5),
+                    label=labels,
+                    # color="blue",
+                ),
+                link=dict(source=source, target=target, value=value),
+            )
+        ]
+    )
 
-    def saveFig(
-        self,
-        fig: plt.Figure,
-        filename: str,
-        width: float = None,
-        height: float = None,
-        skipTight: bool = False,
-    ):
-        if not width:
-            width = self.plotOptions.width
+    fig.update_layout(title_text="", font_size=10)
+    return fig
 
-        if not height:
-            height = self.plotOptions.height
 
-        fig.set_size_inches(width, height)
-        if not skipTight:
-            fig.tight_layout()
+@dataclass
+class RenderJob:
+    """Independent plot which is drawn and saved by a worker process
+
+    The data is prepared by EcoPlot, draw is a module level function which
+    creates the figure from it.
+    """
+
+    ref: PlotRef
+    draw: Callable
+    data: tuple
+    plotOptions: PlotOptions
+    width: float = None
+    height: float = None
+    skipTight: bool = False
+    keepSize: bool = False
 
-        for filetype in self.plotOptions.formats:
-            fig.savefig(f"{filename}.{filetype}", dpi=600)
+    @property
+    def outputs(self):
+        if self.draw is drawSankey:
+            return [Path(self.ref.path)]
+        return [Path(f"{self.ref.path}.{ft}") for ft in self.plotOptions.formats]
+
+    def render(self):
+        fig = self.draw(*self.data)
+        if not isinstance(fig, plt.Figure):
+            # plotly figures are exported as they are
+            fig.write_image(self.ref.path)
+            return
+
+        width, height = self.width, self.height
+        if self.keepSize:
+            width, height = fig.get_size_inches()
+        saveFigure(fig, self.ref.path, self.plotOptions, width, height, self.skipTight)
+        plt.close(fig)
 
-    def plotTimeline(self, transactions):
-        ref = PlotRef(self.plotDir, PlotType.TIMELINE, OVERALL_TAG)
-        self.reg.append(ref)
-        filename = ref.path
 
-        timeline = transactions[["date", "saldo"]]
-        timeline = timeline.iloc[::-1]
+def renderJob(job):
+    """render a plot, returns the error message of a failed plot"""
+    try:
+        job.render()
+    except Exception as e:
+        plt.close("all")
+        return f"{type(e).__name__}: {e}"
+    return None
 
-        fig = plt.figure()
-        fig.add_subplot(111)
-        plt.step(x=timeline["date"], y=timeline["saldo"])
-        plt.ylabel("Saldo / EUR")
-        plt.xticks(rotation=45)
 
-        self.saveFig(fig, filename)
-        plt.close(fig)
+@dataclass
+class EcoPlot:
+    plotDir: Path
+    plotOptions: PlotOptions = field(default_factory=lambda: PlotOptions(3.14, 2.355))
+    reg: List[PlotRef] = field(default_factory=list)
+    jobs: List[RenderJob] = field(default_factory=list)
+    # render every plot, also the ones with unchanged input
+    force: bool = False
+    # number of plots skipped and rendered by the last render
+    skipped: int = 0
+    rendered: int = 0
+    plotPaths = {"overall": {}, "years": {}}
 
-    def plotPie(self, transactions, plotType):
-        ref = PlotRef(self.plotDir, plotType, OVERALL_TAG)
+    @property
+    def manifestPath(self):
+        return Path(self.plotDir) / CACHE_MANIFEST
+
+    def readManifest(self):
+        if not self.manifestPath.is_file():
+            return {}
+        with open(self.manifestPath, encoding="utf-8") as f:
+            return json.load(f)
+
+    def writeManifest(self, manifest):
+        with open(self.manifestPath, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=4, sort_keys=True)
+
+    def addJob(self, ref, draw, *data, **kwargs):
+        """register a plot and queue the job which renders it"""
+        job = RenderJob(ref, draw, data, self.plotOptions, **kwargs)
+        # the formats are left out, every output file is cached on its own
+        options = (self.plotOptions.width, self.plotOptions.height)
+        options += (self.plotOptions.dpi, kwargs)
+        ref.digest = plotDigest(draw, data, options)
         self.reg.append(ref)
-        filename = ref.path
-
-        fig = plt.figure()
-        ax = fig.add_subplot(111)
-        d = transactions["groupID"].value_counts()
-        # sum all neg and pos; subplot for both
-        d = transactions.pivot_table(
-            index=["groupID"], aggfunc={"value": lambda x: np.sum(np.abs(x))}
+        self.jobs.append(job)
+
+    def cached(self, job, manifest):
+        """the outputs of the job exist and were drawn from the same input"""
+        if self.force:
+            return False
+        return all(
+            manifest.get(path.name) == job.ref.digest and path.is_file()
+            for path in job.outputs
         )
-        d.plot.pie(y="value", figsize=(5, 5), ax=ax, legend=False)
-        plt.ylabel("")
-
-        self.saveFig(fig, filename)
-        plt.close(fig)
 
-    def plotPieSplit(self, transactions):
+    def render(self, workers=1):
+        """render the queued plots, with several workers in a process pool
+
+        Plots whose digest matches the cache manifest of the plot directory
+        and whose files exist are skipped. The registry keeps the order in
+        which the plots were added, failed plots are removed from it. Returns
+        the refs and error messages of the failed plots.
+        """
+        manifest = self.readManifest()
+        jobs = [job for job in self.jobs if not self.cached(job, manifest)]
+        self.skipped = len(self.jobs) - len(jobs)
+        self.jobs = []
+        if workers <= 1 or len(jobs) <= 1:
+            errors = [renderJob(job) for job in jobs]
+        else:
+            errors = []
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+                futures = [executor.submit(renderJob, job) for job in jobs]
+                for future in futures:
+                    try:
+                        errors.append(future.result())
+                    except Exception as e:
+                        errors.append(f"{type(e).__name__}: {e}")
+
+        failed = [(job.ref, error) for job, error in zip(jobs, errors) if error]
+        failedRefs = [ref for ref, _ in failed]
+        self.rendered = len(jobs) - len(failed)
+        self.reg = [ref for ref in self.reg if ref not in failedRefs]
+
+        for job, error in zip(jobs, errors):
+            for path in job.outputs:
+                if error:
+                    manifest.pop(path.name, None)
+                else:
+                    manifest[path.name] = job.ref.digest
+        if jobs:
+            self.writeManifest(manifest)
+        return failed
+
+    def plotTimeline(self, cube):
+        saldo = cube.timeline()
+        timeline = pd.DataFrame({"date": saldo.index, "saldo": saldo.to_numpy()})
 
-        ids = transactions["value"] > 0
-        incomingTransactions = transactions[ids]
-        self.plotPie(incomingTransactions, PlotType.PIE_IN)
+        ref = PlotRef(self.plotDir, PlotType.TIMELINE, OVERALL_TAG)
+        self.addJob(ref, drawTimeline, timeline)
 
-        ids = ~ids
-        outgoingTransactions = transactions[ids]
-        self.plotPie(outgoingTransactions, PlotType.PIE_OUT)
+    def plotPie(self, cube, plotType, sign):
+        d = cube.groupSums(sign=sign).abs().to_frame("value")
 
-    def plotCategories(self, transactions: pd.DataFrame):
-        ref = PlotRef(self.plotDir, PlotType.CATEGORY, OVERALL_TAG)
-        self.reg.append(ref)
-        filename = ref.path
+        ref = PlotRef(self.plotDir, plotType, OVERALL_TAG)
+        self.addJob(ref, drawPie, d)
 
-        absGroupVal = transactions.pivot_table(
-            values=["value"], index=["groupID"], aggfunc="sum"
-        )
+    def plotPieSplit(self, cube):
+        self.plotPie(cube, PlotType.PIE_IN, 1)
+        self.plotPie(cube, PlotType.PIE_OUT, -1)
 
-        fig = plt.figure()
-        ax = fig.add_subplot(111)
-        absGroupVal.plot.barh(y="value", ax=ax, legend=False)
-        plt.xlabel("summation / EUR")
-        plt.ylabel("")
-        self.saveFig(fig, filename)
-        plt.close(fig)
+    def plotCategories(self, cube):
+        absGroupVal = cube.groupSums().to_frame("value")
 
-    def plotBars(self, transactions):
-        ref = PlotRef(self.plotDir, PlotType.BAR, OVERALL_TAG)
-        self.reg.append(ref)
-        filename = ref.path
+        ref = PlotRef(self.plotDir, PlotType.CATEGORY, OVERALL_TAG)
+        self.addJob(ref, drawHbar, absGroupVal)
 
-        df = transactions
-        posSum, negSum = calcPosNegSums(df)
+    def plotBars(self, cube):
+        posSum, negSum = cube.posNegSums()
 
-        fig = plt.figure()
-        ax = fig.add_subplot(111)
         yearDF = pd.concat(
             [posSum.sum().rename("in"), negSum.sum().rename("out")], axis=1
         )
-        yearDF.plot.bar(ax=ax)
-        plt.ylabel("summation / EUR")
-        plt.xticks(rotation=45)
-        # ax.set_ylim([minSaldo*1.1, maxSaldo*1.1])
-        self.saveFig(fig, filename)
-        plt.close(fig)
+
+        ref = PlotRef(self.plotDir, PlotType.BAR, OVERALL_TAG)
+        self.addJob(ref, drawYearBars, yearDF)
 
         # self.plotPaths["overall"].update({"years": filename})
 
-    def splitTransactions(self, transactions):
-        ids = transactions["value"] > 0
-        incomingTransactions = transactions[ids]
-        outgoingTransactions = transactions[~ids]
-        return incomingTransactions, outgoingTransactions
+    def plotHbarSplit(self, cube):
+        self.plotHbar(cube, PlotType.HBAR_IN, 1)
+        self.plotHbar(cube, PlotType.HBAR_OUT, -1)
 
-    def plotHbarSplit(self, transactions):
-        incomingTransactions, outgoingTransactions = self.splitTransactions(
-            transactions
-        )
+    def plotHbar(self, cube, plotType, sign):
+        absGroupVal = cube.groupSums(sign=sign).sort_values().to_frame("value")
 
-        self.plotHbar(incomingTransactions, PlotType.HBAR_IN)
-        self.plotHbar(outgoingTransactions, PlotType.HBAR_OUT)
-
-    def plotHbar(self, transactions, plotType):
         ref = PlotRef(self.plotDir, plotType, OVERALL_TAG)
-        self.reg.append(ref)
-        filename = ref.path
-
-        absGroupVal = transactions.pivot_table(
-            values=["value"], index=["groupID"], aggfunc={"value": np.sum}
-        )
-        absGroupVal = absGroupVal.sort_values("value")
-
-        fig = plt.figure()
-        ax = fig.add_subplot(111)
-        absGroupVal.plot.barh(y="value", ax=ax, legend=False)
-        plt.xlabel("summation / EUR")
-        plt.ylabel("")
-        self.saveFig(fig, filename)
-        plt.close(fig)
+        self.addJob(ref, drawHbar, absGroupVal)
 
-    def plotBarsYearly(self, transactions: pd.DataFrame, groupTypes: dict):
+    def plotBarsYearly(self, cube, groupTypes: dict):
         """Show total in and out per month over a year"""
-        df = transactions
-        groups = list(set(df["groupID"].to_list()))
+        groups = cube.groups()
 
         fixedCostKeys = [k for k, v in groupTypes.items() if v == "fixed"]
         variableCostKeys = [k for k in groups if k not in fixedCostKeys]
 
-        fixedCostTransactions = df.loc[df["groupID"].isin(fixedCostKeys)]
-        variableCostTransactions = df.loc[df["groupID"].isin(variableCostKeys)]
-
-        posSumF, negSumF = calcPosNegSums(fixedCostTransactions)
-        posSumV, negSumV = calcPosNegSums(variableCostTransactions)
-        stackedData = {
-            "pos": [posSumF, posSumV],
-            "neg": [negSumF, negSumV],
-        }
+        # months without transactions are shown as empty bars
+        months = pd.Index(range(1, 13), name="month")
+        stackedData = {"pos": [], "neg": []}
+        for keys in [fixedCostKeys, variableCostKeys]:
+            posSum, negSum = cube.posNegSums(keys)
+            stackedData["pos"].append(posSum.reindex(months, fill_value=0))
+            stackedData["neg"].append(negSum.reindex(months, fill_value=0))
 
         maxSaldo = (
             max(
                 [
                     s.max().max()
-                    for s in [posSumF, posSumV, negSumF, negSumV]
-                    if not s.empty
+                    for s in stackedData["pos"] + stackedData["neg"]
+                    if not s.columns.empty
                 ]
             )
             * 2
         )
 
-        gap = 0.02
-        barWidth = 0.25
-        years = list({d.year for d in transactions["date"]})
-        years.sort()
-        months = np.arange(1, 13)
+        years = cube.years()
         subLabel = ["fixed", "variable"]
 
         for y in years:
+            bars = {}
+            for sign, prefix in [("pos", "in"), ("neg", "out")]:
+                bars[sign] = [
+                    (f"{prefix} - {sl}", weight_count.loc[:, y])
+                    for sl, weight_count in zip(cycle(subLabel), stackedData[sign])
+                    if y in weight_count.columns
+                ]
+
             ref = PlotRef(self.plotDir, PlotType.BAR, y)
-            self.reg.append(ref)
-            filename = ref.path
-
-            fig = plt.figure()
-            ax = fig.add_subplot(111)
-
-            bottom = np.zeros(12)
-            for sl, weight_count in zip(cycle(subLabel), stackedData["pos"]):
-                if y not in weight_count.columns:
-                    continue
-                if weight_count.empty:
-                    continue
-                data = weight_count.loc[:, y]
-                p = ax.bar(
-                    months - barWidth / 2 - gap,
-                    data,
-                    barWidth,
-                    label=f"in - {sl}",
-                    bottom=bottom,
-                )
-                bottom += data
-
-            bottom = np.zeros(12)
-            for sl, weight_count in zip(cycle(subLabel), stackedData["neg"]):
-                if y not in weight_count.columns:
-                    continue
-                if weight_count.empty:
-                    continue
-                data = weight_count.loc[:, y]
-                p = ax.bar(
-                    months + barWidth / 2 + gap,
-                    data,
-                    barWidth,
-                    label=f"out - {sl}",
-                    bottom=bottom,
-                )
-                bottom += data
-
-            ax.set_ylim([0, maxSaldo * 1.1])
-            plt.ylabel("summation / EUR")
-            plt.legend()
-            # filename = Path(self.plotDir) / f"ecoYearTest{y}"
-            self.saveFig(fig, filename)
-            plt.close(fig)
-
-            # nestedSet(self.plotPaths, ["years", f"{y}", "year"], filename)
-
-    def plotCategoriesYearly(self, transactions):
-        df = transactions
-        yearTrans = pd.pivot_table(
-            df,
-            index=df["date"].dt.year,
-            columns=df["groupID"],
-            values="value",
-            aggfunc="sum",
-        )
+            self.addJob(ref, drawMonthBars, bars["pos"], bars["neg"], maxSaldo)
+
+    def plotCategoriesYearly(self, cube):
+        yearTrans = cube.yearlyGroupSums()
 
         years = yearTrans.index
         for y in years:
-            ref = PlotRef(self.plotDir, PlotType.CATEGORY, y)
-            self.reg.append(ref)
-            filename = ref.path
-
-            fig = plt.figure()
-            ax = fig.add_subplot(111)
             yearSelected = yearTrans.loc[y, :]
             yearSelected = yearSelected.sort_values()
-            yearSelected.plot.barh(y="value", ax=ax)
-            plt.xlabel("summation / EUR")
-            plt.ylabel("")
-            self.saveFig(fig, filename)
-            plt.close(fig)
 
-    def plotCategoriesRatioMonthly(self, transactions):
-        """Calculate ratio of monthly expense and create line plot for each month"""
-        df = transactions
-        years = list(set(df["date"].dt.year))
-        monthTrans = pd.pivot_table(
-            df,
-            index=df["date"].dt.strftime("%Y-%m"),
-            columns=df["groupID"],
-            values="value",
-            aggfunc=np.sum,
-        )
+            ref = PlotRef(self.plotDir, PlotType.CATEGORY, int(y))
+            self.addJob(ref, drawCategoryYear, yearSelected)
 
-        monthTrans.index = pd.to_datetime(monthTrans.index)
+    def plotCategoriesRatioMonthly(self, cube):
+        """Calculate ratio of monthly expense and create line plot for each month"""
+        years = cube.years()
+        monthTrans = cube.monthlyGroupSums()
 
         legendCreated = False
         for year in years:
-            ref = PlotRef(self.plotDir, PlotType.CATEGORY_RATIO, year)
-            self.reg.append(ref)
-            filename = ref.path
-
             transInYear = monthTrans[f"{year}-01-01":f"{year}-12-31"]
             selector = (transInYear.columns != "income") & (
                 transInYear.columns != "saving"
             )
             transInYear = transInYear.loc[:, selector]
 
-            fig = plt.figure()
-            ax = fig.add_subplot(111)
-            colorcycle = cycler(color=plt.rcParams["axes.prop_cycle"].by_key()["color"])
-            linecycle = cycler("linestyle", ["-", "--", ":", "-."])
-            plt.gca().set_prop_cycle(linecycle * colorcycle)
-            transInYear.plot.line(ax=ax, legend=False, marker="o", ms=2, rot=45)
-            ax.set_yscale("symlog")
-            plt.ylabel("value / EUR")
-            plt.xlabel("")
-
-            self.saveFig(fig, filename)
-            plt.close(fig)
+            ref = PlotRef(self.plotDir, PlotType.CATEGORY_RATIO, year)
+            self.addJob(ref, drawCategoryRatio, transInYear)
 
             if not legendCreated:
                 ref = PlotRef(self.plotDir, PlotType.CATEGORY_RATIO_LEGEND, "LEGEND")
-                self.reg.append(ref)
-                filename = ref.path
-
-                handles, labels = ax.get_legend_handles_labels()
-
-                legFig = plt.figure()
-                leg = legFig.legend(handles=handles, labels=labels, loc="center")
-
-                leg.figure.canvas.draw()
-                bb = leg.get_window_extent()
-                width = (bb.x1 - bb.x0) / 100 + 2 * leg.borderaxespad * plt.rcParams[
-                    "font.size"
-                ] / 72
-                height = (bb.y1 - bb.y0) / 100
-
-                self.saveFig(legFig, filename, width=width, height=height)
-                plt.close(legFig)
+                self.addJob(ref, drawCategoryRatioLegend, transInYear, keepSize=True)
                 legendCreated = True
 
-    def plotCategoriesMonthly(self, transactions):
-        df = transactions
-        years = list(set(df["date"].dt.year))
-        monthTrans = pd.pivot_table(
-            df,
-            index=df["date"].dt.strftime("%Y-%m"),
-            columns=df["groupID"],
-            values="value",
-            aggfunc=np.sum,
-        )
-
-        monthTrans.index = pd.to_datetime(monthTrans.index)
+    def plotCategoriesMonthly(self, cube):
+        years = cube.years()
+        monthTrans = cube.monthlyGroupSums()
 
         for year in years:
-            ref = PlotRef(self.plotDir, PlotType.CATEGORY_MONTHS, year)
-            self.reg.append(ref)
-            filename = ref.path
-
             transInYear = monthTrans[f"{year}-01-01":f"{year}-12-31"]
 
-            axes = transInYear.plot.bar(subplots=True, legend=False, rot=45)
-            fig = axes[0].get_figure()
-            # clearing axis tick labels
-            for x in axes:
-                x.set_xticklabels("")
-                x.set_title("")
-                x.set_xlabel("")
-            xlabels = [
-                pandas_datetime.strftime("%Y-%m")
-                for pandas_datetime in transInYear.index
-            ]
-            axes[-1].set_xticklabels(xlabels)
-            lines = []
-            labels = []
-            for x in axes:
-                Line, Label = x.get_legend_handles_labels()
-                lines.extend(Line)
-                labels.extend(Label)
-
-            # rotating x-axis labels of last sub-plot
-            fig.legend(lines, labels, loc="upper center", ncol=5)
-
-            plt.subplots_adjust(top=0.90)
-
-            self.saveFig(fig, filename, 8, 11, True)
-            plt.close(fig)
-
-    def plotCategoriesFlow(self, transactions: pd.DataFrame):
-        df = transactions
-
-        categories = set(df["groupID"])
-        catDatas = {}
-        for cat in categories:
-            catData = df[df["groupID"] == cat]
-            catData = catData.set_index("date")
-            catData = catData.iloc[::-1]
-            catData = catData["value"].cumsum()
-            catDatas[cat] = catData
-        # print(catDatas)
-
-        # catDatas = {
-        #     k: v for k, v in sorted(catDatas.items(), key=lambda item: item.iloc[-1])
-        # }
+            ref = PlotRef(self.plotDir, PlotType.CATEGORY_MONTHS, year)
+            self.addJob(
+                ref, drawCategoryMonths, transInYear, width=8, height=11, skipTight=True
+            )
 
-        for cat, catData in catDatas.items():
+    def plotCategoriesFlow(self, cube):
+        for cat in cube.groups():
             ref = PlotRef(self.plotDir, PlotType.CATEGORY_FLOW, cat)
-            self.reg.append(ref)
-            filename = ref.path
-
-            fig = plt.figure()
-            ax = fig.add_subplot(111)
+            self.addJob(ref, drawCategoryFlow, cube.groupFlow(cat), cat)
 
-            plt.step(x=catData.index, y=catData)
-            plt.xlabel("")
-            plt.ylabel("value / EUR")
-            plt.xticks(rotation=45)
-            plt.title(cat)
-            self.saveFig(fig, filename)
-            plt.close(fig)
-
-    def plotCategoriesPerMonth(self, transactions):
+    def plotCategoriesPerMonth(self, cube):
         pass
 
-    def sankeyPlot(self, transactions: pd.DataFrame):
-        import plotly.graph_objects as go
-
-        years = list(set(transactions["date"].dt.year))
-
-        for year in years:
-            ref = PlotRef(self.plotDir, PlotType.SANKEY, year)
-            self.reg.append(ref)
-            filename = ref.path
-
-            check = year == transactions["date"].dt.year
-            yearSlice = transactions[check]
-
-            income = yearSlice[transactions["value"] > 0]
-            out = yearSlice[transactions["value"] < 0]
+    def sankeyPlot(self, cube):
+        for year in cube.years():
+            income = cube.groupSums(sign=1, year=year)
+            out = cube.groupSums(sign=-1, year=year)
 
             source = []
             target = []
             value = []
             labels = []
-            incomeGroups = set(income["groupID"])
-            sumId = len(incomeGroups)
-            for i, id in enumerate(incomeGroups):
-                sel = income[income["groupID"] == id]
-
-                groupValue = sel["value"].sum()
+            sumId = len(income)
+            for i, (id, groupValue) in enumerate(income.items()):
                 labels.append(f"{id}: {groupValue:.2f}")
                 source.append(i)
                 target.append(sumId)
@@ -524,30 +580,11 @@ class EcoPlot:
             totalBudget = sum(value)
             labels.append(f"total: {totalBudget:.2f}")
 
-            outGroups = set(out["groupID"])
-            for i, id in enumerate(outGroups):
-                sel = out[out["groupID"] == id]
-
-                groupValue = abs(sel["value"].sum())
+            for i, (id, groupValue) in enumerate(out.abs().items()):
                 labels.append(f"{id}: {groupValue:.2f}")
                 source.append(sumId)
                 target.append(sumId + 1 + i)
                 value.append(groupValue)
 
-            fig = go.Figure(
-                data=[
-                    go.Sankey(
-                        node=dict(
-                            pad=15,
-                            thickness=20,
-                            line=dict(color="black", width=0.5),
-                            label=labels,
-                            # color="blue",
-                        ),
-                        link=dict(source=source, target=target, value=value),
-                    )
-                ]
-            )
-
-            fig.update_layout(title_text="", font_size=10)
-            fig.write_image(filename)
+            ref = PlotRef(self.plotDir, PlotType.SANKEY, year)
+            self.addJob(ref, drawSankey, labels, source, target, value)
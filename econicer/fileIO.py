@@ -1,12 +1,63 @@
 import csv
 import datetime
+import glob
+import gzip
+import itertools
+import json
+import shutil
+import sqlite3
+from contextlib import closing
+from dataclasses import asdict
 from pathlib import Path
 from typing import List
 
+import numpy as np
 import pandas as pd
 
-from econicer.auxiliary import str2num
+from econicer.auxiliary import json2Dict
+from econicer.auxiliary import str2numColumn
 from econicer.account import BankAccount
+from econicer.account import TraceCheckpoint
+from econicer.account import mergeTransactions
+from econicer.grouping import NO_GROUP
+from econicer.schema import commonUids
+from econicer.schema import expandTransactions
+from econicer.schema import uidToInt64
+
+# the table header is searched in the first lines of a CSV file
+PREAMBLE_LINES = 20
+# rows of a CSV file which are parsed at once
+CHUNK_ROWS = 100_000
+# the database is rewritten once it has more delta segments
+MAX_DELTA_SEGMENTS = 32
+BINARY_SUFFIXES = {".feather", ".arrow"}
+BINARY_HEADER_KEY = b"econicer.header"
+# columns of a binary database which are read as views of the mapped file
+MAPPED_COLUMNS = ["date", "valuta", "saldo", "value", "groupID"]
+SQLITE_SUFFIXES = {".sqlite", ".sqlite3"}
+# compressed files are recognized by their first bytes
+COMPRESSION_MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zst": "zstd"}
+SQLITE_HEADER = ["owner", "accountNumber", "bank"]
+# uids are stored without type affinity, they are integers in the compact schema
+SQLITE_COLUMNS = {
+    "date": "INTEGER",
+    "valuta": "INTEGER",
+    "customer": "TEXT",
+    "type": "TEXT",
+    "usage": "TEXT",
+    "saldo": "INTEGER",
+    "saldoCurrency": "TEXT",
+    "value": "INTEGER",
+    "valueCurrency": "TEXT",
+    "groupID": "TEXT",
+    "uid": "",
+}
 
 
 def countKeys(inDict, key):
@@ -41,6 +92,160 @@ def getKeywordValue(lines: List[str], keyword: str, sep: str):
     return None
 
 
+def missingAsNaN(transactionDF, columns=None):
+    """binary formats store missing strings as None, CSV files as NaN"""
+    if columns is None:
+        columns = transactionDF.columns
+    for col in columns:
+        if transactionDF[col].dtype == object:
+            missing = transactionDF[col].isna()
+            if missing.any():
+                transactionDF[col] = transactionDF[col].where(~missing, np.nan)
+
+
+def addMissingColumns(transactionDF, columns):
+    """missing values for the requested columns which the file does not have,
+    like the uid and group columns of an empty account"""
+    for col in columns:
+        if col not in transactionDF.columns:
+            transactionDF[col] = pd.Series(np.nan, transactionDF.index, dtype=object)
+    return transactionDF
+
+
+def matchingUids(uids, transactions):
+    """uids in the representation used by the transactions, either text or
+    the 64 bit integers of the compact schema"""
+    if not len(transactions) or not len(uids):
+        return uids
+    if isinstance(uids.iloc[0], str) and not isinstance(
+        transactions["uid"].iloc[0], str
+    ):
+        return pd.Series(uidToInt64(uids), index=uids.index)
+    return uids
+
+
+def indexType(size):
+    """smallest integer type for the codes of a dictionary column, which is
+    the type of the codes of a pandas categorical"""
+    import pyarrow as pa
+
+    for intType, maxSize in [(pa.int8(), 2**7), (pa.int16(), 2**15)]:
+        if size < maxSize:
+            return intType
+    return pa.int32()
+
+
+def mappedColumn(column):
+    """numpy or categorical view of an Arrow column without a copy of the
+    data, None if the column can only be copied"""
+    import pyarrow as pa
+
+    if column.num_chunks != 1 or column.null_count:
+        return None
+
+    array = column.chunk(0)
+    if pa.types.is_dictionary(array.type):
+        codes = array.indices.to_numpy(zero_copy_only=True)
+        return pd.Categorical.from_codes(
+            codes, array.dictionary.to_pylist(), validate=False
+        )
+    if (
+        pa.types.is_integer(array.type)
+        or pa.types.is_floating(array.type)
+        or pa.types.is_timestamp(array.type)
+    ):
+        return array.to_numpy(zero_copy_only=True)
+    return None
+
+
+def convertSQLite(transactionDF):
+    for col in ["date", "valuta"]:
+        if col in transactionDF.columns:
+            transactionDF[col] = pd.to_datetime(transactionDF[col], unit="ns")
+    missingAsNaN(transactionDF)
+    return transactionDF
+
+
+def detectCompression(filepath):
+    """compression of a file from its first bytes, None for plain files"""
+    with open(filepath, "rb") as f:
+        start = f.read(6)
+    for magic, compression in COMPRESSION_MAGIC.items():
+        if start.startswith(magic):
+            return compression
+    return None
+
+
+def openText(filepath, mode, compression=None, **kwargs):
+    """text stream of a plain or compressed file, the content is compressed
+    while it is written and decompressed while it is read"""
+    if compression == "gzip":
+        return gzip.open(filepath, mode + "t", **kwargs)
+    if compression == "bz2":
+        import bz2
+
+        return bz2.open(filepath, mode + "t", **kwargs)
+    if compression == "xz":
+        import lzma
+
+        return lzma.open(filepath, mode + "t", **kwargs)
+    if compression == "zstd":
+        import zstandard
+
+        return zstandard.open(filepath, mode + "t", **kwargs)
+    return open(filepath, mode, **kwargs)
+
+
+class ReadAhead:
+    """Text stream which returns the lines read ahead before the rest of the
+    file, so streams which can not seek are parsed in a single pass"""
+
+    def __init__(self, lines, textFile):
+        self.lines = list(lines)
+        self.textFile = textFile
+
+    def readline(self):
+        if self.lines:
+            return self.lines.pop(0)
+        return self.textFile.readline()
+
+    def read(self, size=-1):
+        text = "".join(self.lines)
+        self.lines = []
+        if size is None or size < 0:
+            return text + self.textFile.read()
+        if not text:
+            return self.textFile.read(size)
+        if len(text) > size:
+            self.lines = [text[size:]]
+        return text[:size]
+
+    def __iter__(self):
+        return iter(self.readline, "")
+
+
+def readBankFile(filepath, settings):
+    """header information and transactions of a bank file, module level so it
+    can be called by a process pool"""
+    return FileIO(filepath, settings).readFile()
+
+
+def expandFilePatterns(patterns, suffix=".csv"):
+    """files given by paths, directories or glob patterns"""
+    files = []
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            files.extend(sorted(path.glob(f"*{suffix}")))
+        elif path.is_file():
+            files.append(path)
+        else:
+            files.extend(sorted(Path(f) for f in glob.glob(pattern)))
+
+    # keep the first occurrence of every file
+    return list(dict.fromkeys(files))
+
+
 class FileIO:
     def __init__(self, filepath, settings, str2numConversion=True):
         self.filepath = filepath
@@ -50,66 +255,647 @@ class FileIO:
     def updateFilepath(self, filepath):
         self.filepath = filepath
 
-    def readHeader(self):
-        """extract header account information from database"""
-        with open(self.filepath) as csvFile:
-            header = [next(csvFile) for x in range(20)]
+    def sidecarPath(self, extension):
+        """path of an auxiliary file stored next to the database file"""
+        filepath = Path(self.filepath)
+        return filepath.parent / f"{filepath.name.split('.')[0]}.{extension}"
+
+    def readGroupingState(self):
+        """grouping rules the database was grouped with"""
+        statePath = self.sidecarPath("grouping.json")
+        if not statePath.is_file():
+            return None
+        return json2Dict(statePath)
+
+    def writeGroupingState(self, groupSettings):
+        state = {
+            "fingerprint": groupSettings.fingerprint(),
+            "dbIdentifier": groupSettings.dbIdentifier,
+            "groups": groupSettings.groups,
+        }
+
+        statePath = self.sidecarPath("grouping.json")
+        statePath.parent.mkdir(parents=True, exist_ok=True)
+        with open(statePath, "w") as f:
+            json.dump(state, f, indent=4)
+
+    def readTraceCheckpoint(self):
+        """state of the last saldo trace verification"""
+        checkpointPath = self.sidecarPath("trace.json")
+        if not checkpointPath.is_file():
+            return None
+        return TraceCheckpoint(**json2Dict(checkpointPath))
+
+    def writeTraceCheckpoint(self, checkpoint):
+        checkpointPath = self.sidecarPath("trace.json")
+        checkpointPath.parent.mkdir(parents=True, exist_ok=True)
+        with open(checkpointPath, "w") as f:
+            json.dump(asdict(checkpoint), f, indent=4)
+
+    def compression(self):
+        """compression of the file by its suffix, used for new files"""
+        return COMPRESSION_SUFFIXES.get(Path(self.filepath).suffix)
+
+    def openFile(self):
+        return openText(
+            self.filepath,
+            "r",
+            detectCompression(self.filepath),
+            encoding=self.settings.encoding or None,
+            newline="",
+        )
+
+    def readPreamble(self, csvFile):
+        """lines in front of the table and the lines read ahead from the table
+        header on
+
+        The table header is the first line with the most delimiters among the
+        first lines of the file.
+        """
+        lines = []
+        for _ in range(PREAMBLE_LINES):
+            line = csvFile.readline()
+            if not line:
+                break
+            lines.append(line)
+
+        if not lines:
+            return [], []
 
+        noSeps = [line.count(self.settings.delimiter) for line in lines]
+        tableStart = noSeps.index(max(noSeps))
+        return lines[:tableStart], lines[tableStart:]
+
+    def headerValues(self, preamble):
         sep = self.settings.delimiter
 
-        owner = getKeywordValue(header, self.settings.owner, sep)
-        accountNumber = getKeywordValue(header, self.settings.accountNumber, sep)
-        bank = getKeywordValue(header, self.settings.bank, sep)
+        owner = getKeywordValue(preamble, self.settings.owner, sep)
+        accountNumber = getKeywordValue(preamble, self.settings.accountNumber, sep)
+        bank = getKeywordValue(preamble, self.settings.bank, sep)
 
         return owner, accountNumber, bank
 
-    def readBody(self):
-        with open(self.filepath, "r") as f:
-            noSeps = []
-            for _ in range(20):
-                linedata = f.readline()
-                noSeps.append(linedata.count(";"))
-        noHeaderLines = noSeps.index(max(noSeps))
+    def readHeader(self):
+        """extract header account information from database"""
+        with self.openFile() as csvFile:
+            preamble, _ = self.readPreamble(csvFile)
+        return self.headerValues(preamble)
+
+    def readFile(self, columns=None):
+        """header and transactions of a CSV file, which is opened once and
+        parsed in chunks
+
+        The chunks are concatenated, so the whole table is held in memory like
+        a single read_csv. Only iterBody bounds the memory by the chunk size.
+        """
+        with self.openFile() as csvFile:
+            preamble, tableLines = self.readPreamble(csvFile)
+            chunks = list(self.parseTable(ReadAhead(tableLines, csvFile), columns))
+
+        if len(chunks) == 1:
+            transactionDF = chunks[0]
+        else:
+            transactionDF = pd.concat(chunks)
+        return self.headerValues(preamble), transactionDF
+
+    def readBody(self, columns=None):
+        """transactions of a CSV file, optionally only the given columns"""
+        return self.readFile(columns)[1]
+
+    def iterBody(self, columns=None, chunksize=CHUNK_ROWS):
+        """transactions of a CSV file in chunks of converted rows, so large
+        files can be processed with bounded memory"""
+        with self.openFile() as csvFile:
+            _, tableLines = self.readPreamble(csvFile)
+            yield from self.parseTable(
+                ReadAhead(tableLines, csvFile), columns, chunksize
+            )
 
-        transactionDF = pd.read_csv(
-            self.filepath,
+    def parseTable(self, csvFile, columns=None, chunksize=CHUNK_ROWS):
+        usecols = None
+        if columns is not None:
+            if isinstance(self.settings.table, dict):
+                table = self.settings.table
+                names = {table[c] for c in columns if c in table}
+            else:
+                names = {c for c in columns if c in self.settings.table}
+            # columns missing in the header of the file are skipped
+            usecols = names.__contains__
+
+        reader = pd.read_csv(
+            csvFile,
             sep=self.settings.delimiter,
-            header=noHeaderLines,
+            header=0,
             skip_blank_lines=False,
-            encoding=self.settings.encoding,
+            usecols=usecols,
+            chunksize=chunksize,
         )
+        for chunk in reader:
+            yield self.convertTable(chunk)
 
+    def convertTable(self, transactionDF):
         if isinstance(self.settings.table, dict):
             renameTable = invertDict(self.settings.table)
             transactionDF = transactionDF.rename(columns=renameTable)
 
-        transactionDF["date"] = pd.to_datetime(
-            transactionDF["date"], format=self.settings.dateFormat
+        for col in ["date", "valuta"]:
+            if col in transactionDF.columns:
+                transactionDF[col] = pd.to_datetime(
+                    transactionDF[col], format=self.settings.dateFormat
+                )
+
+        if self.str2numConversion:
+            for col in ["value", "saldo"]:
+                if col in transactionDF.columns:
+                    transactionDF[col] = str2numColumn(transactionDF[col])
+
+        if "groupID" in transactionDF.columns:
+            # newer pandas versions parse the group name "None" as missing value
+            transactionDF["groupID"] = transactionDF["groupID"].fillna(NO_GROUP)
+
+        return transactionDF
+
+    def isBinary(self):
+        return Path(self.filepath).suffix in BINARY_SUFFIXES
+
+    def isSQLite(self):
+        return Path(self.filepath).suffix in SQLITE_SUFFIXES
+
+    def readDB(self, groupSettings, compact=False, columns=None):
+        """account from the database, optionally with only the given columns
+
+        The uids of a projected, binary or SQLite database are taken from the
+        file, otherwise they are computed from the transactions.
+        """
+        if columns is not None:
+            # delta segments are merged by date and uid
+            columns = list(dict.fromkeys(list(columns) + ["date", "uid"]))
+
+        if self.isBinary() or self.isSQLite():
+            if self.isBinary():
+                header, transactionDF = self.readBinary(columns)
+            else:
+                header, transactionDF = self.readSQLite(columns)
+            owner, accountNumber, bank = header
+
+            if not compact:
+                transactionDF = expandTransactions(transactionDF)
+            if (
+                columns is None
+                and not compact
+                and "uid" in transactionDF
+                and transactionDF["uid"].dtype != object
+            ):
+                # written with the compact schema, the text uids are computed again
+                transactionDF = transactionDF.drop(columns="uid")
+        else:
+            (owner, accountNumber, bank), transactionDF = self.readFile(columns)
+            if columns is None:
+                transactionDF = transactionDF.drop(columns="uid", errors="ignore")
+
+        if columns is not None:
+            addMissingColumns(transactionDF, columns)
+
+        account = BankAccount(
+            owner, accountNumber, bank, transactionDF, groupSettings, compact
+        )
+        if not self.isSQLite():
+            self.overlayDeltas(account, columns)
+        return account
+
+    def readTransactions(self, columns=None, groupID=None, since=None, until=None):
+        """transactions of the database filtered by group and date range
+
+        A SQLite database evaluates the filter with its indexes, other formats
+        load the columns and filter them afterwards.
+        """
+        if self.isSQLite():
+            _, transactionDF = self.readSQLite(columns, groupID, since, until)
+            return expandTransactions(transactionDF)
+
+        if columns is not None:
+            filterColumns = ["date"] + ([] if groupID is None else ["groupID"])
+            projection = list(dict.fromkeys(list(columns) + filterColumns))
+        else:
+            projection = None
+
+        transactionDF = self.readDB(None, columns=projection).transactions
+        transactionDF = expandTransactions(transactionDF)
+
+        selected = np.ones(len(transactionDF), dtype=bool)
+        if groupID is not None:
+            selected &= (transactionDF["groupID"] == groupID).to_numpy()
+        if since is not None:
+            selected &= (transactionDF["date"] >= pd.Timestamp(since)).to_numpy()
+        if until is not None:
+            selected &= (transactionDF["date"] <= pd.Timestamp(until)).to_numpy()
+
+        if columns is not None:
+            transactionDF = transactionDF[list(dict.fromkeys(columns))]
+        return transactionDF[selected]
+
+    def iterTransactions(self, columns=None, chunksize=CHUNK_ROWS):
+        """transactions of the database and its delta segments in chunks of at
+        most chunksize rows, for aggregations with bounded memory
+
+        The chunks follow the storage order, not the order of the history.
+        The "segment" entry of their attrs is 0 for the database file and the
+        number of the delta segment otherwise.
+        """
+        if columns is not None:
+            columns = list(dict.fromkeys(list(columns) + ["uid"]))
+
+        if self.isSQLite():
+            yield from self.iterSQLite(columns, chunksize)
+            return
+
+        if self.isBinary():
+            chunks = self.iterBinary(columns, chunksize)
+        else:
+            chunks = self.iterBody(columns, chunksize)
+        segments = (
+            self.readSegment(segmentPath, columns)
+            for segmentPath in self.deltaSegments()
+            if segmentPath.name.split(".")[1] == "rows"
+        )
+
+        patches = self.groupPatches()
+        numbered = itertools.chain(
+            zip(itertools.repeat(0), chunks), enumerate(segments, start=1)
         )
+        for segment, transactionDF in numbered:
+            transactionDF.attrs["segment"] = segment
+            if columns is not None:
+                addMissingColumns(transactionDF, columns)
+            if patches is not None and "groupID" in transactionDF.columns:
+                uids, patchUids = commonUids(transactionDF["uid"], patches.index)
+                positions = pd.Index(patchUids).get_indexer(uids)
+                known = positions >= 0
+
+                groupIDs = transactionDF["groupID"].to_numpy(dtype=object).copy()
+                groupIDs[known] = patches.to_numpy()[positions[known]]
+                transactionDF["groupID"] = groupIDs
+            yield transactionDF
+
+    def groupPatches(self):
+        """latest group of every transaction in the group delta segments"""
+        patches = [
+            self.readSegment(segmentPath)
+            for segmentPath in self.deltaSegments()
+            if segmentPath.name.split(".")[1] == "groups"
+        ]
+        if not patches:
+            return None
+
+        patches = pd.concat(patches).drop_duplicates("uid", keep="last")
+        return patches.set_index("uid")["groupID"]
+
+    def deltaDir(self):
+        return self.sidecarPath("deltas")
+
+    def deltaSegments(self):
+        """delta segments of the database in the order they were written"""
+        deltaDir = self.deltaDir()
+        if not deltaDir.is_dir():
+            return []
+        return sorted(deltaDir.glob("*.*"))
+
+    def clearDeltas(self):
+        shutil.rmtree(self.deltaDir(), ignore_errors=True)
+
+    def writeSegment(self, kind, transactionDF):
+        """append a delta segment with new rows or group changes"""
+        deltaDir = self.deltaDir()
+        deltaDir.mkdir(parents=True, exist_ok=True)
+
+        segments = self.deltaSegments()
+        number = int(segments[-1].name.split(".")[0]) + 1 if segments else 1
+        segmentPath = deltaDir / f"{number:06d}.{kind}{Path(self.filepath).suffix}"
+
+        if self.isBinary():
+            import pyarrow as pa
+            from pyarrow import feather
+
+            table = pa.Table.from_pandas(transactionDF, preserve_index=False)
+            feather.write_feather(table, segmentPath)
+        else:
+            transactionDF.to_csv(
+                segmentPath,
+                sep=self.settings.delimiter,
+                index=False,
+                date_format=self.settings.dateFormat,
+            )
+
+    def readSegment(self, segmentPath, columns=None):
+        if self.isBinary():
+            from pyarrow import feather
 
-        transactionDF["valuta"] = pd.to_datetime(
-            transactionDF["valuta"], format=self.settings.dateFormat
+            if columns is not None:
+                schema = feather.read_table(segmentPath, columns=[]).schema
+                columns = [col for col in columns if col in schema.names]
+            transactionDF = feather.read_table(segmentPath, columns=columns).to_pandas()
+            missingAsNaN(transactionDF)
+            return expandTransactions(transactionDF)
+
+        return FileIO(segmentPath, self.settings, self.str2numConversion).readBody(
+            columns
         )
 
-        if self.str2numConversion:
-            transactionDF["value"] = transactionDF["value"].apply(str2num)
-            transactionDF["saldo"] = transactionDF["saldo"].apply(str2num)
+    def overlayDeltas(self, account, columns=None):
+        """merge the new rows and group changes of all delta segments into the
+        account read from the database file"""
+        segments = self.deltaSegments()
+        for segmentPath in segments:
+            kind = segmentPath.name.split(".")[1]
+            if kind == "rows":
+                delta = self.readSegment(segmentPath, columns)
+                delta["uid"] = matchingUids(delta["uid"], account.transactions)
+                account.transactions, _, _ = mergeTransactions(
+                    account.transactions, delta
+                )
+            elif kind == "groups" and "groupID" in account.transactions.columns:
+                delta = self.readSegment(segmentPath)
+                uids = matchingUids(delta["uid"], account.transactions)
+                positions = pd.Index(account.transactions["uid"]).get_indexer(uids)
+                known = positions >= 0
+
+                groupIDs = account.transactions["groupID"].to_numpy(dtype=object)
+                groupIDs[positions[known]] = delta["groupID"].to_numpy()[known]
+                account.transactions["groupID"] = groupIDs
+
+        if segments:
+            account.transactions.reset_index(drop=True, inplace=True)
+            account.applySchema()
+
+    def writeChanges(self, account, newRows=(), movedRows=()):
+        """write only new transactions and transactions with a changed group
+
+        A SQLite database updates the rows in place, the other formats append
+        them as delta segments to the database. The database is rewritten
+        completely if it has too many segments.
+        """
+        newRows = np.asarray(newRows, dtype=int)
+        movedRows = np.setdiff1d(np.asarray(movedRows, dtype=int), newRows)
+
+        if self.isSQLite():
+            self.writeSQLite(account, np.union1d(newRows, movedRows))
+            return
+
+        if (
+            not Path(self.filepath).is_file()
+            or len(self.deltaSegments()) + 2 > MAX_DELTA_SEGMENTS
+        ):
+            self.writeDB(account)
+            return
+
+        if len(newRows):
+            self.writeSegment("rows", account.transactions.iloc[newRows])
+        if len(movedRows):
+            self.writeSegment(
+                "groups", account.transactions[["uid", "groupID"]].iloc[movedRows]
+            )
 
-        return transactionDF
+    def readBinary(self, columns=None):
+        """header information and transactions of an Arrow/Feather database"""
+        import pyarrow as pa
+        from pyarrow import feather
+
+        if columns is not None:
+            # an empty database written by initDB has no uid and group columns
+            with pa.memory_map(str(self.filepath)) as source:
+                names = pa.ipc.open_file(source).schema.names
+            columns = [c for c in columns if c in names]
+
+        table = feather.read_table(self.filepath, columns=columns)
+        header = json.loads(table.schema.metadata[BINARY_HEADER_KEY])
+        transactionDF = table.to_pandas()
+
+        nullColumns = [c for c in table.column_names if table.column(c).null_count]
+        missingAsNaN(transactionDF, nullColumns)
+
+        return (header["owner"], header["accountNumber"], header["bank"]), transactionDF
+
+    def iterBinary(self, columns=None, chunksize=CHUNK_ROWS):
+        """transactions of an Arrow/Feather database batch by batch"""
+        import pyarrow as pa
+
+        with pa.memory_map(str(self.filepath)) as source:
+            reader = pa.ipc.open_file(source)
+            for number in range(reader.num_record_batches):
+                batch = reader.get_batch(number)
+                if columns is not None:
+                    names = batch.schema.names
+                    batch = batch.select([c for c in columns if c in names])
+
+                for offset in range(0, batch.num_rows, chunksize):
+                    transactionDF = batch.slice(offset, chunksize).to_pandas()
+                    missingAsNaN(transactionDF)
+                    yield expandTransactions(transactionDF)
+
+    def mapBinary(self, columns=None):
+        """transactions of an Arrow/Feather database with the numeric, date and
+        group columns as views of the memory mapped file
+
+        The pages of the file are shared by all processes which map it, the
+        other columns are copied. Returns None if the database is not binary
+        or has delta segments.
+        """
+        import pyarrow as pa
+
+        if not self.isBinary() or not Path(self.filepath).is_file():
+            return None
+        if self.deltaSegments():
+            return None
+
+        if columns is None:
+            columns = MAPPED_COLUMNS
+
+        source = pa.memory_map(str(self.filepath))
+        table = pa.ipc.open_file(source).read_all()
+        table = table.select([c for c in columns if c in table.column_names])
+
+        views = {name: mappedColumn(table.column(name)) for name in table.column_names}
+        copied = [name for name, view in views.items() if view is None]
+        if copied:
+            copiedDF = table.select(copied).to_pandas()
+            missingAsNaN(copiedDF, copied)
+            for name in copied:
+                views[name] = copiedDF[name]
+
+        return addMissingColumns(pd.DataFrame(views, copy=False), columns)
+
+    def writeBinary(self, account):
+        """Write all account information to an Arrow/Feather database"""
+        import pyarrow as pa
+        from pyarrow import feather
+
+        filepath = Path(self.filepath)
+        filepath.parent.mkdir(parents=True, exist_ok=True)
 
-    def readDB(self, groupSettings):
-        owner, accountNumber, bank = self.readHeader()
-        transactionDF = self.readBody()
+        table = pa.Table.from_pandas(account.transactions, preserve_index=False)
+
+        # text columns are stored as dictionaries, which load as categoricals
+        # without creating a string object for every row
+        for i, field in enumerate(table.schema):
+            if pa.types.is_string(field.type) and field.name != "uid":
+                column = table.column(i).combine_chunks().dictionary_encode()
+                dictType = pa.dictionary(indexType(len(column.dictionary)), pa.string())
+                table = table.set_column(i, field.name, column.cast(dictType))
+
+        header = {
+            "owner": account.owner,
+            "accountNumber": account.accountNumber,
+            "bank": account.bank,
+            "created": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        metadata = dict(table.schema.metadata or {})
+        metadata[BINARY_HEADER_KEY] = json.dumps(header)
+        # uncompressed and in one record batch, so every column is a single
+        # buffer of the file which can be memory mapped
+        feather.write_feather(
+            table.replace_schema_metadata(metadata),
+            filepath,
+            compression="uncompressed",
+            chunksize=max(len(table), 1),
+        )
 
-        return BankAccount(owner, accountNumber, bank, transactionDF, groupSettings)
+    def connectSQLite(self):
+        """connection to the SQLite database, the tables are created if needed"""
+        Path(self.filepath).parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.filepath)
+
+        columns = ", ".join(f"{col} {kind}" for col, kind in SQLITE_COLUMNS.items())
+        connection.executescript(f"""
+            CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS transactions ({columns}, daySeq INTEGER);
+            CREATE UNIQUE INDEX IF NOT EXISTS transactionUid ON transactions (uid);
+            CREATE INDEX IF NOT EXISTS transactionDate
+                ON transactions (date DESC, daySeq);
+            CREATE INDEX IF NOT EXISTS transactionGroup ON transactions (groupID);
+            """)
+        return connection
+
+    def readSQLite(self, columns=None, groupID=None, since=None, until=None):
+        """header information and transactions of a SQLite database in the
+        order of the history, optionally filtered by group and date range"""
+        query, parameters = self.sqliteQuery(columns, groupID, since, until)
+
+        with closing(self.connectSQLite()) as connection:
+            header = dict(connection.execute("SELECT key, value FROM metadata"))
+            transactionDF = pd.read_sql_query(query, connection, params=parameters)
+
+        header = [json.loads(header.get(key, "null")) for key in SQLITE_HEADER]
+        return header, convertSQLite(transactionDF)
+
+    def iterSQLite(self, columns=None, chunksize=CHUNK_ROWS):
+        query, parameters = self.sqliteQuery(columns)
+        with closing(self.connectSQLite()) as connection:
+            for chunk in pd.read_sql_query(
+                query, connection, params=parameters, chunksize=chunksize
+            ):
+                yield convertSQLite(chunk)
+
+    def sqliteQuery(self, columns=None, groupID=None, since=None, until=None):
+        if columns is None:
+            columns = list(SQLITE_COLUMNS)
+        columns = [col for col in columns if col in SQLITE_COLUMNS]
+
+        conditions = []
+        parameters = []
+        if groupID is not None:
+            conditions.append("groupID = ?")
+            parameters.append(groupID)
+        if since is not None:
+            conditions.append("date >= ?")
+            parameters.append(pd.Timestamp(since).value)
+        if until is not None:
+            conditions.append("date <= ?")
+            parameters.append(pd.Timestamp(until).value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        query = (
+            f"SELECT {', '.join(columns)} FROM transactions {where} "
+            "ORDER BY date DESC, daySeq"
+        )
+        return query, parameters
+
+    def writeSQLite(self, account, rows=None):
+        """Write account information to a SQLite database
+
+        Without rows the transactions are replaced completely. Otherwise only
+        the given rows and the rows at the same days, whose position within
+        the day might have changed, are inserted or updated by their uid.
+        Columns which the table doesn't have raise an error instead of being
+        dropped.
+        """
+        transactions = account.transactions
+        unknown = [col for col in transactions.columns if col not in SQLITE_COLUMNS]
+        if unknown:
+            raise ValueError(
+                f"SQLite databases can't store the columns {', '.join(unknown)}"
+            )
+
+        daySeq = transactions.groupby("date", sort=False, dropna=False).cumcount()
+
+        if rows is not None:
+            rows = np.asarray(rows)
+            if rows.dtype == bool:
+                rows = np.flatnonzero(rows)
+            days = transactions["date"].iloc[rows]
+            touched = transactions["date"].isin(days).to_numpy()
+            touched[rows] = True
+            transactions = transactions[touched]
+            daySeq = daySeq[touched]
+
+        records = pd.DataFrame(
+            {col: transactions[col] for col in SQLITE_COLUMNS if col in transactions}
+        )
+        for col in ["date", "valuta"]:
+            if col in records.columns:
+                dates = records[col].to_numpy(dtype="datetime64[ns]").view(np.int64)
+                dates = dates.astype(object)
+                dates[records[col].isna().to_numpy()] = None
+                records[col] = dates
+        records = records.astype(object).where(records.notna(), None)
+        records["daySeq"] = daySeq.to_numpy()
+
+        names = ", ".join(records.columns)
+        placeholders = ", ".join("?" * len(records.columns))
+        updates = ", ".join(f"{col} = excluded.{col}" for col in records.columns)
+
+        with closing(self.connectSQLite()) as connection, connection:
+            if rows is None:
+                connection.execute("DELETE FROM transactions")
+            connection.executemany(
+                f"INSERT INTO transactions ({names}) VALUES ({placeholders}) "
+                f"ON CONFLICT (uid) DO UPDATE SET {updates}",
+                records.itertuples(index=False, name=None),
+            )
+            header = [account.owner, account.accountNumber, account.bank]
+            connection.executemany(
+                "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in zip(SQLITE_HEADER, header)],
+            )
 
     def writeDB(self, account):
         """Write all account inforrmation to database"""
+        # the complete account replaces the database and all delta segments
+        self.clearDeltas()
+
+        if self.isBinary():
+            self.writeBinary(account)
+            return
+
+        if self.isSQLite():
+            self.writeSQLite(account)
+            return
 
         filepath = Path(self.filepath)
         filepath.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(filepath, "w", newline="") as csvfile:
+        # the table is written in chunks, a compressed file is compressed
+        # while it is written
+        with openText(filepath, "w", self.compression(), newline="") as csvfile:
             csvwriter = csv.writer(
                 csvfile,
                 delimiter=self.settings.delimiter,
@@ -132,11 +918,10 @@ class FileIO:
             csvwriter.writerow(["expenseGroupValues", "..."])
             csvwriter.writerow(["#TRANSACTIONS"])
 
-        # write table
-        account.transactions.to_csv(
-            filepath,
-            mode="a",
-            sep=self.settings.delimiter,
-            index=False,
-            date_format=self.settings.dateFormat,
-        )
+            # write table
+            account.transactions.to_csv(
+                csvfile,
+                sep=self.settings.delimiter,
+                index=False,
+                date_format=self.settings.dateFormat,
+            )
@@ -0,0 +1,286 @@
+import difflib
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+NO_GROUP = "None"
+NO_MATCH = -1
+
+REGEX_METACHARACTERS = set(".^$*+?{}[]\\|()")
+
+
+def isLiteral(keyword):
+    """True if the keyword matches only its own text"""
+    return not REGEX_METACHARACTERS.intersection(keyword)
+
+
+def buildTrie(keywords):
+    """nested dict of characters, the key None marks the priority of a keyword"""
+    trie = {}
+    for keyword, priority in keywords.items():
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[None] = min(priority, node.get(None, priority))
+    return trie
+
+
+def trieRegex(node):
+    """regex matching any keyword of the trie, stopping at the shortest one"""
+    if None in node:
+        return ""
+
+    branches = [re.escape(char) + trieRegex(child) for char, child in node.items()]
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+
+class GroupMatcher:
+    """Compiled matcher for all groups of the grouping settings
+
+    A text belongs to the first group in the settings with a keyword found in
+    the text. Plain keywords are searched with a single trie shaped regex on
+    the lower case text. At every position where a keyword starts, the trie is
+    walked to find the group with the highest priority. Keywords using regex
+    syntax are combined in one regex with a named group per transaction group,
+    keywords with their own groups or backreferences are searched one by one.
+    """
+
+    def __init__(self, groups: dict):
+        self.groupNames = list(groups.keys())
+
+        literals = {}
+        patterns = {}
+        self.separatePatterns = []
+        self.matchAll = NO_MATCH
+        for priority, keywords in enumerate(groups.values()):
+            if not keywords:
+                # an empty keyword list results in an empty regex group
+                self.setMatchAll(priority)
+                continue
+
+            for keyword in keywords:
+                if not keyword:
+                    self.setMatchAll(priority)
+                elif isLiteral(keyword):
+                    keyword = keyword.lower()
+                    literals[keyword] = min(priority, literals.get(keyword, priority))
+                elif re.compile(keyword).groups:
+                    # groups would shift the numbering of the combined regex
+                    pattern = re.compile(keyword, re.IGNORECASE)
+                    self.separatePatterns.append((priority, pattern))
+                else:
+                    patterns.setdefault(priority, []).append(keyword)
+
+        self.separatePatterns.sort(key=lambda item: item[0])
+        self.trie = buildTrie(literals)
+        if literals:
+            self.literalFinder = re.compile(f"(?={trieRegex(self.trie)})")
+        else:
+            self.literalFinder = None
+
+        if patterns:
+            searchPat = "|".join(
+                f"(?P<g{priority}>" + "|".join(keywords) + ")"
+                for priority, keywords in sorted(patterns.items())
+            )
+            self.patternFinder = re.compile(f"(?=(?:{searchPat}))", re.IGNORECASE)
+        else:
+            self.patternFinder = None
+
+    @classmethod
+    def fromSettings(cls, groupSettings):
+        return cls(groupSettings.groups)
+
+    def setMatchAll(self, priority):
+        if self.matchAll == NO_MATCH or priority < self.matchAll:
+            self.matchAll = priority
+
+    def matchText(self, text):
+        """priority of the first group matching the text"""
+        if not isinstance(text, str):
+            return NO_MATCH
+
+        best = self.matchAll
+        if best == 0:
+            return best
+
+        if self.literalFinder is not None:
+            lowerText = text.lower()
+            for match in self.literalFinder.finditer(lowerText):
+                node = self.trie
+                for char in lowerText[match.start() :]:
+                    node = node.get(char)
+                    if node is None:
+                        break
+                    priority = node.get(None, NO_MATCH)
+                    if priority != NO_MATCH and (best == NO_MATCH or priority < best):
+                        best = priority
+                if best == 0:
+                    return best
+
+        if self.patternFinder is not None:
+            for match in self.patternFinder.finditer(text):
+                priority = int(match.lastgroup[1:])
+                if best == NO_MATCH or priority < best:
+                    best = priority
+                if best == 0:
+                    return best
+
+        for priority, pattern in self.separatePatterns:
+            if best != NO_MATCH and priority >= best:
+                break
+            if pattern.search(text):
+                return priority
+
+        return best
+
+    def match(self, texts: pd.Series):
+        """priority of the first matching group for each text, each distinct
+        text is only matched once"""
+        codes, uniques = pd.factorize(texts)
+        uniquePriorities = np.fromiter(
+            (self.matchText(text) for text in uniques), dtype=int, count=len(uniques)
+        )
+
+        priorities = np.full(len(texts), NO_MATCH)
+        valid = codes >= 0
+        priorities[valid] = uniquePriorities[codes[valid]]
+        return priorities
+
+    def classify(self, transactions: pd.DataFrame, columns):
+        """group priority for each transaction, first matching column wins"""
+        priorities = np.full(len(transactions), NO_MATCH)
+        for col in columns:
+            free = priorities == NO_MATCH
+            if not free.any():
+                break
+            priorities[free] = self.match(transactions[col][free])
+        return priorities
+
+    def groupNamesOf(self, priorities):
+        names = np.array(self.groupNames + [NO_GROUP], dtype=object)
+        return names[priorities]
+
+
+def orderedCommon(sequence, common):
+    return [item for item in sequence if item in common]
+
+
+def keywordList(keywords):
+    """keywords of a group, an empty group behaves like an empty keyword"""
+    return list(keywords) if keywords else [""]
+
+
+@dataclass
+class GroupingDiff:
+    """Difference between two versions of the grouping rules"""
+
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    moved: List[str] = field(default_factory=list)
+    addedKeywords: Dict[str, List[str]] = field(default_factory=dict)
+    removedKeywords: Dict[str, List[str]] = field(default_factory=dict)
+    newGroups: dict = field(default_factory=dict)
+    identifierChanged: bool = False
+
+    @classmethod
+    def fromRules(cls, oldGroups, oldIdentifier, newGroups, newIdentifier):
+        diff = cls(newGroups=newGroups)
+        diff.identifierChanged = list(oldIdentifier) != list(newIdentifier)
+
+        diff.added = [g for g in newGroups if g not in oldGroups]
+        diff.removed = [g for g in oldGroups if g not in newGroups]
+
+        # groups outside of the longest common ordering changed their priority
+        common = set(oldGroups).intersection(newGroups)
+        oldOrder = orderedCommon(oldGroups, common)
+        newOrder = orderedCommon(newGroups, common)
+        matcher = difflib.SequenceMatcher(None, oldOrder, newOrder, autojunk=False)
+        kept = set()
+        for block in matcher.get_matching_blocks():
+            kept.update(oldOrder[block.a : block.a + block.size])
+        diff.moved = [g for g in newOrder if g not in kept]
+
+        for grpName in newOrder:
+            oldKeywords = keywordList(oldGroups[grpName])
+            newKeywords = keywordList(newGroups[grpName])
+            added = [kw for kw in newKeywords if kw not in oldKeywords]
+            removed = [kw for kw in oldKeywords if kw not in newKeywords]
+            if added:
+                diff.addedKeywords[grpName] = added
+            if removed:
+                diff.removedKeywords[grpName] = removed
+
+        return diff
+
+    @property
+    def empty(self):
+        return not (
+            self.added
+            or self.removed
+            or self.moved
+            or self.addedKeywords
+            or self.removedKeywords
+            or self.identifierChanged
+        )
+
+    def describe(self):
+        lines = []
+        for label, groups in [
+            ("added groups", self.added),
+            ("removed groups", self.removed),
+            ("reordered groups", self.moved),
+        ]:
+            if groups:
+                lines.append(f"{label}: {', '.join(groups)}")
+        for label, keywords in [
+            ("added keywords", self.addedKeywords),
+            ("removed keywords", self.removedKeywords),
+        ]:
+            for grpName, kws in keywords.items():
+                lines.append(f"{label} in {grpName}: {', '.join(kws)}")
+        if self.identifierChanged:
+            lines.append("changed identifier columns")
+        return lines
+
+    def affectedRows(self, transactions, columns):
+        """rows whose group might change with the new rules
+
+        Rows of removed, reordered or reduced groups are evaluated again, as
+        well as every row matching a keyword which can now take precedence.
+        """
+        if self.identifierChanged:
+            return np.ones(len(transactions), dtype=bool)
+
+        memberGroups = set(self.removed + self.moved).union(self.removedKeywords)
+        affected = transactions["groupID"].isin(memberGroups).to_numpy()
+
+        scanGroups = {}
+        for grpName, keywords in self.newGroups.items():
+            if grpName in self.added or grpName in self.moved:
+                scanGroups[grpName] = keywords
+            elif grpName in self.addedKeywords:
+                scanGroups[grpName] = self.addedKeywords[grpName]
+
+        if scanGroups:
+            scanMatcher = GroupMatcher(scanGroups)
+            remaining = ~affected
+            affected[remaining] = (
+                scanMatcher.classify(transactions[remaining], columns) != NO_MATCH
+            )
+
+        return affected
+
+
+def groupMoves(oldGroupIDs, newGroupIDs):
+    """number of transactions moved between two groups"""
+    moves = pd.DataFrame(
+        {"from": np.asarray(oldGroupIDs), "to": np.asarray(newGroupIDs)}
+    )
+    moves = moves[moves["from"] != moves["to"]]
+    return moves.groupby(["from", "to"]).size().sort_values(ascending=False)
@@ -0,0 +1,93 @@
+import datetime
+import hashlib
+import json
+from dataclasses import asdict
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from econicer.auxiliary import json2Dict
+
+# bank files are hashed in blocks of this many bytes
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def fileDigest(filepath):
+    """sha256 of the content of a file"""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class ImportRecord:
+    """Imported bank file identified by the hash of its content
+
+    The uids of the first and last row and the number of rows describe the
+    range of transactions of the file, so a later export which contains the
+    same rows can be recognized after parsing.
+    """
+
+    digest: str
+    filename: str = ""
+    rows: int = 0
+    firstUid: str = ""
+    lastUid: str = ""
+    time: str = ""
+
+    @classmethod
+    def fromTransactions(cls, digest, filepath, transactions):
+        uids = transactions["uid"].to_numpy()
+        if not len(uids):
+            return cls(digest, Path(filepath).name)
+        firstUid, lastUid = uids[[0, -1]].tolist()
+        return cls(digest, Path(filepath).name, len(uids), firstUid, lastUid)
+
+
+class ImportRegistry:
+    """JSON file with one ImportRecord per imported bank file"""
+
+    def __init__(self, filepath):
+        self.filepath = Path(filepath)
+        self.records = {}
+        if self.filepath.is_file():
+            for record in json2Dict(self.filepath)["files"]:
+                self.records[record["digest"]] = ImportRecord(**record)
+
+    def __contains__(self, digest):
+        return digest in self.records
+
+    def add(self, record):
+        if not record.time:
+            record.time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.records[record.digest] = record
+
+    def write(self):
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        files = [asdict(record) for record in self.records.values()]
+        with open(self.filepath, "w", encoding="utf-8") as f:
+            json.dump({"files": files}, f, indent=4)
+
+    def knownRows(self, uids):
+        """mask of the rows which form the complete uid range of an imported
+        file, the other rows are new or only known by the history"""
+        uids = np.asarray(uids, dtype=object)
+        known = np.zeros(len(uids), dtype=bool)
+        records = [r for r in self.records.values() if r.rows]
+        if not len(uids) or not records:
+            return known
+
+        # position of the first occurrence of every uid
+        unique, first = np.unique(uids.astype(str), return_index=True)
+        starts = np.searchsorted(unique, [r.firstUid for r in records])
+        for record, start in zip(records, starts):
+            if start == len(unique) or unique[start] != record.firstUid:
+                continue
+            begin = first[start]
+            end = begin + record.rows
+            if end <= len(uids) and uids[end - 1] == record.lastUid:
+                known[begin:end] = True
+        return known
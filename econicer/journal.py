@@ -0,0 +1,110 @@
+import datetime
+import json
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import Dict
+from typing import List
+
+import numpy as np
+
+from econicer.schema import commonUids
+
+# older entries are dropped from the journal
+MAX_JOURNAL_ENTRIES = 100
+
+
+@dataclass
+class JournalEntry:
+    """Changes of one operation on the account database
+
+    Stores the uids of appended transactions, the former group of moved
+    transactions, the former header and the former state files. This is
+    enough to revert the operation without a copy of the database.
+    """
+
+    action: str
+    description: str = ""
+    time: str = ""
+    added: List = field(default_factory=list)
+    moved: List[list] = field(default_factory=list)
+    header: List = field(default_factory=list)
+    stateFiles: Dict[str, str] = field(default_factory=dict)
+
+    def summary(self):
+        changes = []
+        if self.added:
+            changes.append(f"{len(self.added)} added")
+        if self.moved:
+            changes.append(f"{len(self.moved)} regrouped")
+        text = f"{self.time}  {self.action:<8} {', '.join(changes) or 'no changes'}"
+        if self.description:
+            text += f"  ({self.description})"
+        return text
+
+    def revert(self, account):
+        """undo the changes on the transactions and header of the account"""
+        transactions = account.transactions
+
+        if self.moved:
+            uids, groupIDs = zip(*self.moved)
+            accountUids, movedUids = commonUids(transactions["uid"], uids)
+            positions = accountUids.get_indexer(movedUids)
+            known = positions >= 0
+
+            newGroupIDs = transactions["groupID"].to_numpy(dtype=object).copy()
+            newGroupIDs[positions[known]] = np.asarray(groupIDs, dtype=object)[known]
+            transactions["groupID"] = newGroupIDs
+
+        if self.added:
+            accountUids, addedUids = commonUids(transactions["uid"], self.added)
+            transactions = transactions[~accountUids.isin(addedUids)]
+            account.transactions = transactions.reset_index(drop=True)
+
+        if self.header:
+            account.accountNumber, account.bank = self.header
+
+
+class Journal:
+    """Append only file with one JournalEntry per line, newest last"""
+
+    def __init__(self, filepath, maxEntries=MAX_JOURNAL_ENTRIES):
+        self.filepath = Path(filepath)
+        self.maxEntries = maxEntries
+
+    def entries(self):
+        if not self.filepath.is_file():
+            return []
+        with open(self.filepath, "r", encoding="utf-8") as f:
+            return [JournalEntry(**json.loads(line)) for line in f if line.strip()]
+
+    def write(self, entries):
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.filepath, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(asdict(entry)) + "\n")
+
+    def append(self, entry):
+        if not entry.time:
+            entry.time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.filepath, "a+", encoding="utf-8") as f:
+            f.write(json.dumps(asdict(entry)) + "\n")
+            f.seek(0)
+            lines = f.readlines()
+
+        if len(lines) > self.maxEntries:
+            with open(self.filepath, "w", encoding="utf-8") as f:
+                f.writelines(lines[-self.maxEntries :])
+
+    def pop(self, number=1):
+        """remove the last entries from the journal, newest first"""
+        entries = self.entries()
+        number = min(number, len(entries))
+        if not number:
+            return []
+
+        self.write(entries[:-number])
+        return entries[::-1][:number]
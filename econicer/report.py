@@ -1,6 +1,5 @@
 import datetime
 import numpy as np
-import pandas as pd
 import pylatex as tex
 from pylatex import Tabularx, Package, Center, Table
 from pylatex.basic import Environment
@@ -150,17 +149,17 @@ class ReportDocument:
                     if (i + 1) % 2 == 0:
                         self.doc.append(tex.LineBreak())
 
-    def addYearlyReports(self, transactions):
+    def addYearlyReports(self, cube):
         years = {v.context for v in self.register if isinstance(v.context, int)}
         years = list(years)
         print(years)
         for i, year in enumerate(years):
-            self.addYearSection(year, transactions)
+            self.addYearSection(year, cube)
 
             if (i + 1) % 2 == 0:
                 self.doc.append(tex.Command("newpage"))
 
-    def addYearSection(self, year, transactions):
+    def addYearSection(self, year, cube):
         """Define plots for the yearly section"""
 
         title = f"Financial Report {year}"
@@ -178,20 +177,10 @@ class ReportDocument:
 
         self.addSection(title, plotContext=year, plotSelection=plots)
 
-        categories = list(set(transactions["groupID"]))
-        # somehow nan shows up?
-        categories.remove(np.nan)
+        categories = cube.groups()
 
         # add table
-        monthTrans = pd.pivot_table(
-            transactions,
-            index=transactions["date"].dt.strftime("%Y-%m"),
-            columns=transactions["groupID"],
-            values="value",
-            aggfunc=np.sum,
-            fill_value=0,
-        )
-        monthTrans.index = pd.to_datetime(monthTrans.index)
+        monthTrans = cube.monthlyGroupSums(fillValue=0)
         transInYear = monthTrans[f"{year}-01-01":f"{year}-12-31"]
 
         header = [""]
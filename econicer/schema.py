@@ -0,0 +1,92 @@
+import base64
+
+import numpy as np
+import pandas as pd
+
+CATEGORY_COLUMNS = ["customer", "type", "groupID", "saldoCurrency", "valueCurrency"]
+CENT_COLUMNS = ["saldo", "value"]
+
+# columns with more distinct values are kept as plain strings
+MAX_CATEGORY_RATIO = 0.5
+
+
+def uidToInt64(uids):
+    """first 64 bit of the sha1 digest of base64 encoded uids
+
+    Every uid starts with 12 base64 characters which encode 9 complete bytes,
+    so the prefixes of all uids are decoded at once.
+    """
+    uids = np.asarray(uids, dtype="U28")
+    if not len(uids):
+        return np.array([], dtype=np.int64)
+
+    prefixes = uids.astype("U12")
+    raw = base64.b64decode("".join(prefixes.tolist()))
+    digests = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 9)[:, :8]
+    return np.ascontiguousarray(digests).view(">i8").ravel().astype(np.int64)
+
+
+def commonUids(transactionUids, otherUids):
+    """uids of the transactions and other uids in the same representation,
+    text uids are converted to the 64 bit integers of the compact schema"""
+    transactionUids = pd.Index(transactionUids)
+    otherUids = np.asarray(otherUids, dtype=object)
+    if not len(transactionUids) or not len(otherUids):
+        return transactionUids, otherUids
+
+    otherText = isinstance(otherUids[0], str)
+    if otherText and not isinstance(transactionUids[0], str):
+        otherUids = uidToInt64(otherUids)
+    elif not otherText and isinstance(transactionUids[0], str):
+        transactionUids = pd.Index(uidToInt64(transactionUids))
+    return transactionUids, otherUids
+
+
+def compactColumn(column):
+    """categorical column if the column has few distinct strings"""
+    if isinstance(column.dtype, pd.CategoricalDtype) or column.dtype != object:
+        return column
+    if column.nunique(dropna=False) > MAX_CATEGORY_RATIO * len(column):
+        return column
+    return column.astype("category")
+
+
+def compactTransactions(transactions):
+    """transactions with categorical text columns, int64 cents and 64 bit uids"""
+    transactions = transactions.copy()
+
+    for col in CATEGORY_COLUMNS:
+        if col in transactions.columns:
+            transactions[col] = compactColumn(transactions[col])
+
+    for col in CENT_COLUMNS:
+        if col in transactions.columns:
+            transactions[col] = transactions[col].astype(np.int64)
+
+    if "uid" in transactions.columns and transactions["uid"].dtype == object:
+        transactions["uid"] = uidToInt64(transactions["uid"])
+
+    return transactions
+
+
+def expandTransactions(transactions):
+    """transactions with plain string columns instead of categoricals"""
+    transactions = transactions.copy()
+    for col in transactions.columns:
+        if isinstance(transactions[col].dtype, pd.CategoricalDtype):
+            transactions[col] = transactions[col].astype(object)
+    return transactions
+
+
+def memoryReport(transactions, compactTrans):
+    """bytes per row of every column before and after compaction"""
+    noRows = max(len(transactions), 1)
+    report = pd.DataFrame(
+        {
+            "before": transactions.memory_usage(index=False, deep=True) / noRows,
+            "after": compactTrans.memory_usage(index=False, deep=True) / noRows,
+        }
+    )
+    report.loc["total"] = report.sum()
+    report["ratio"] = report["after"] / report["before"]
+    return report
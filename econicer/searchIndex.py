@@ -0,0 +1,201 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from econicer.grouping import isLiteral
+
+INDEXED_COLUMNS = ["customer", "usage", "type"]
+NO_TEXT = -1
+
+
+def trigrams(text):
+    text = text.lower()
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def packStrings(strings):
+    """concatenate strings into one byte array with offsets for storage"""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.cumsum([0] + [len(e) for e in encoded], dtype=np.int64)
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def unpackStrings(data, offsets):
+    raw = data.tobytes()
+    return [raw[a:b].decode("utf-8") for a, b in zip(offsets[:-1], offsets[1:])]
+
+
+class TextColumnIndex:
+    """Distinct texts of a column and a trigram index pointing to them"""
+
+    def __init__(self, texts=None, postings=None):
+        self.texts = texts if texts is not None else []
+        self.lookup = {text: i for i, text in enumerate(self.texts)}
+        self.postings = postings if postings is not None else {}
+
+    def addTexts(self, values):
+        """text ids for all values, unknown texts are added to the index"""
+        codes, uniques = pd.factorize(values)
+
+        uniqueIds = np.empty(len(uniques), dtype=np.int64)
+        newPostings = {}
+        for i, text in enumerate(uniques):
+            if not isinstance(text, str):
+                uniqueIds[i] = NO_TEXT
+                continue
+
+            textId = self.lookup.get(text)
+            if textId is None:
+                textId = len(self.texts)
+                self.texts.append(text)
+                self.lookup[text] = textId
+                for gram in trigrams(text):
+                    newPostings.setdefault(gram, []).append(textId)
+            uniqueIds[i] = textId
+
+        for gram, textIds in newPostings.items():
+            known = self.postings.get(gram)
+            textIds = np.array(textIds, dtype=np.int64)
+            if known is not None:
+                textIds = np.concatenate([known, textIds])
+            self.postings[gram] = textIds
+
+        ids = np.full(len(values), NO_TEXT, dtype=np.int64)
+        valid = codes >= 0
+        ids[valid] = uniqueIds[codes[valid]]
+        return ids
+
+    def candidates(self, literal):
+        """ids of all texts containing every trigram of the literal"""
+        grams = trigrams(literal)
+        postings = [self.postings.get(gram) for gram in grams]
+        if any(p is None for p in postings):
+            return np.array([], dtype=np.int64)
+
+        postings.sort(key=len)
+        textIds = postings[0]
+        for p in postings[1:]:
+            textIds = np.intersect1d(textIds, p, assume_unique=True)
+        return textIds
+
+    def find(self, search):
+        """ids of all texts matching the search pattern"""
+        searchPat = re.compile(rf"(?:{search})", re.IGNORECASE)
+
+        if isLiteral(search) and len(search) >= 3:
+            textIds = self.candidates(search)
+        else:
+            textIds = range(len(self.texts))
+
+        return np.array(
+            [i for i in textIds if searchPat.search(self.texts[i])], dtype=np.int64
+        )
+
+    def toArrays(self, prefix):
+        grams = sorted(self.postings)
+        postingLengths = [len(self.postings[g]) for g in grams]
+        textData, textOffsets = packStrings(self.texts)
+        gramData, gramOffsets = packStrings(grams)
+
+        return {
+            f"{prefix}.texts": textData,
+            f"{prefix}.textOffsets": textOffsets,
+            f"{prefix}.grams": gramData,
+            f"{prefix}.gramOffsets": gramOffsets,
+            f"{prefix}.postingOffsets": np.cumsum([0] + postingLengths, dtype=np.int64),
+            f"{prefix}.postings": np.concatenate(
+                [self.postings[g] for g in grams] + [np.array([], dtype=np.int64)]
+            ),
+        }
+
+    @classmethod
+    def fromArrays(cls, arrays, prefix):
+        texts = unpackStrings(
+            arrays[f"{prefix}.texts"], arrays[f"{prefix}.textOffsets"]
+        )
+        grams = unpackStrings(
+            arrays[f"{prefix}.grams"], arrays[f"{prefix}.gramOffsets"]
+        )
+        offsets = arrays[f"{prefix}.postingOffsets"]
+        ids = arrays[f"{prefix}.postings"]
+
+        postings = {
+            gram: ids[start:end]
+            for gram, start, end in zip(grams, offsets[:-1], offsets[1:])
+        }
+        return cls(texts, postings)
+
+
+class SearchIndex:
+    """Persistent trigram index over the text columns of an account
+
+    Every indexed transaction is identified by its uid and refers to the
+    distinct texts of its columns. A literal search looks up the candidate
+    texts by their trigrams and only verifies those, other patterns are
+    matched against the distinct texts instead of every transaction.
+    """
+
+    def __init__(self, columns=INDEXED_COLUMNS):
+        self.columns = list(columns)
+        self.uids = np.array([], dtype=object)
+        self.rowTexts = {col: np.array([], dtype=np.int64) for col in self.columns}
+        self.textIndex = {col: TextColumnIndex() for col in self.columns}
+
+    @classmethod
+    def build(cls, transactions, columns=INDEXED_COLUMNS):
+        index = cls(columns)
+        index.sync(transactions)
+        return index
+
+    def sync(self, transactions):
+        """add all transactions missing in the index, returns True if the
+        index was changed"""
+        missing = ~transactions["uid"].isin(self.uids).to_numpy()
+        if not missing.any():
+            return False
+
+        newRows = transactions[missing].drop_duplicates("uid")
+        self.uids = np.concatenate([self.uids, newRows["uid"].to_numpy(dtype=object)])
+        for col in self.columns:
+            textIds = self.textIndex[col].addTexts(newRows[col])
+            self.rowTexts[col] = np.concatenate([self.rowTexts[col], textIds])
+        return True
+
+    def compatible(self, transactions):
+        """False if the uids of the index and the transactions are stored in
+        different representations"""
+        if not len(self.uids) or not len(transactions):
+            return True
+        return isinstance(self.uids[0], str) == isinstance(
+            transactions["uid"].iloc[0], str
+        )
+
+    def search(self, search, transactions, categories):
+        """boolean mask of all transactions matching the search"""
+        matches = np.zeros(len(self.uids), dtype=bool)
+        for col in categories:
+            textIds = self.textIndex[col].find(search)
+            matches |= np.isin(self.rowTexts[col], textIds)
+
+        return transactions["uid"].isin(self.uids[matches]).to_numpy()
+
+    def save(self, filepath):
+        arrays = {"uids": np.array(self.uids.tolist())}
+        for col in self.columns:
+            arrays[f"{col}.rows"] = self.rowTexts[col]
+            arrays.update(self.textIndex[col].toArrays(col))
+
+        with open(filepath, "wb") as f:
+            np.savez(f, columns=np.array(self.columns), **arrays)
+
+    @classmethod
+    def load(cls, filepath):
+        with np.load(filepath) as arrays:
+            index = cls(arrays["columns"].tolist())
+            uids = arrays["uids"]
+            index.uids = uids.astype(object) if uids.dtype.kind == "U" else uids
+            for col in index.columns:
+                index.rowTexts[col] = arrays[f"{col}.rows"]
+                index.textIndex[col] = TextColumnIndex.fromArrays(arrays, col)
+        return index
@@ -1,3 +1,4 @@
+import hashlib
 import json
 import pprint
 from abc import ABC
@@ -7,6 +8,8 @@ from econicer.auxiliary import json2Dict
 
 pp = pprint.PrettyPrinter()
 
+STORAGE_FORMATS = ["csv", "feather", "sqlite"]
+
 
 class Settings(ABC):
     _settingsName = ""
@@ -28,7 +31,7 @@ class Settings(ABC):
     def write(self):
         out = self.getSettingsDict()
 
-        outPath = Path(".db\\settings.json")
+        outPath = Path(getattr(self, "_filename", "") or Path(".db") / "settings.json")
         outPath.parent.mkdir(parents=True, exist_ok=True)
         with open(Path(str(outPath)), "w") as f:
             json.dump(out, f, indent=4)
@@ -119,6 +122,31 @@ class EconicerSettings(ExternalSettings):
     group = Path(r"config\grouping.json")
     # database = Path(r"config\database.json")
     plotDir = Path("plots")
+    # categorical text columns and 64 bit uids in memory
+    compactSchema = False
+    # storage format of new accounts: csv, feather (needs pyarrow) or sqlite
+    storageFormat = "csv"
+    # compression of new CSV databases: gzip, bz2, xz or zstd (needs
+    # zstandard), empty for plain files
+    compression = ""
+    # aggregations stream the database in batches of this many rows, 0 loads
+    # the whole history at once
+    chunkRows = 0
+    # processes rendering the plots, 0 uses one per CPU
+    plotWorkers = 0
+    # file formats, resolution and default size in inches of the plots
+    renderProfiles = {
+        "draft": {"formats": ["png"], "dpi": 100, "width": 3.14, "height": 2.355},
+        "screen": {"formats": ["png"], "dpi": 200, "width": 6.28, "height": 4.71},
+        "print": {
+            "formats": ["pdf", "png"],
+            "dpi": 600,
+            "width": 3.14,
+            "height": 2.355,
+        },
+    }
+    # profile of the plots, the report only renders the pdf files it includes
+    renderProfile = "print"
 
     def changeAccount(self, accountName, accountFile):
         if accountName == self.currentAccount:
@@ -157,6 +185,11 @@ class GroupSettings(ExternalSettings):
     groups = {}
     groupTypes = {}
 
+    def fingerprint(self):
+        """hash of all rules which affect the grouping result"""
+        rules = json.dumps([self.dbIdentifier, list(self.groups.items())])
+        return hashlib.sha1(rules.encode("utf-8")).hexdigest()
+
 
 class BankFileSettings(ExternalSettings):
     """Define read parameters for transaction file from some Bank"""
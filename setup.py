@@ -29,6 +29,10 @@ setup(
         "PyLaTeX>=1.4.1",
         "pandas>=1.2.3",
     ],
+    extras_require={
+        "arrow": ["pyarrow>=5.0.0"],
+        "zstd": ["zstandard>=0.15"],
+    },
     include_package_data=True,
     entry_points={
         "console_scripts": ["econicer = econicer.cli:main"],
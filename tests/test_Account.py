@@ -1,3 +1,5 @@
+import base64
+import hashlib
 import unittest
 from datetime import datetime
 from datetime import timedelta
@@ -5,6 +7,8 @@ from datetime import timedelta
 import numpy as np
 import pandas as pd
 from econicer.account import BankAccount
+from econicer.account import UidEngine
+from econicer.account import addIdentifier
 from econicer.settings import GroupSettings
 
 
@@ -109,6 +113,26 @@ class TestGrouping(unittest.TestCase):
         timeDeltas = [d - firstDate for d in dates]
         self.assertTrue(all([d <= timedelta() for d in timeDeltas]))
 
+    def test_UpdateOlderAndKnownData(self):
+        acc = defineTestAccount()
+        newerDF = defineTestDataframe(getTransactionInfoUpdate())
+        olderDF = acc.transactions.copy()
+
+        acc = BankAccount("Test", 123456789, "econicer", newerDF, acc.groupSettings)
+        result = acc.update(olderDF)
+
+        self.assertEqual(result.added, len(olderDF))
+        self.assertEqual(result.duplicates, 0)
+        self.assertEqual(len(result.gaps), 1)
+        self.assertEqual(acc.transactions["customer"].iloc[0], "myCompany")
+        self.assertEqual(acc.transactions["customer"].iloc[-1], "Book Store")
+        self.assertTrue(acc.transactions["date"].is_monotonic_decreasing)
+
+        result = acc.update(olderDF.iloc[::-1].copy())
+        self.assertEqual(result.added, 0)
+        self.assertEqual(result.duplicates, len(olderDF))
+        self.assertEqual(len(acc.transactions), len(olderDF) + len(newerDF))
+
     def test_Grouping(self):
         acc = defineTestAccount()
         acc.groupTransactions()
@@ -127,5 +151,85 @@ class TestGrouping(unittest.TestCase):
         self.assertEqual(group3.count(True), 1)
 
 
+def legacyIdentifier(transactions):
+    idComponents = ["date", "customer", "usage", "type", "saldo", "value"]
+
+    idColumns = pd.concat([transactions[col] for col in idComponents], axis=1)
+    idColumns["date"] = idColumns["date"].dt.strftime("%Y-%m-%d")
+
+    tuples = idColumns.apply(lambda row: tuple(row), axis=1)
+    tuples = tuples.astype(str).str.encode("UTF-8")
+
+    return tuples.apply(
+        lambda x: base64.b64encode(hashlib.sha1(x).digest()).decode()
+    ).to_list()
+
+
+class TestIdentifier(unittest.TestCase):
+
+    def test_LegacyCompatibility(self):
+        transactions = defineTestDataframe(getTransactionInfo())
+        transactions.loc[1, "usage"] = np.nan
+        transactions.loc[2, "usage"] = None
+        transactions.loc[3, "customer"] = "Joe's \"Diner\""
+        transactions.loc[4, "date"] = pd.NaT
+
+        addIdentifier(transactions)
+        self.assertEqual(
+            transactions["uid"].to_list(), legacyIdentifier(transactions)
+        )
+
+    def test_SkipKnownRows(self):
+        engine = UidEngine()
+        transactions = defineTestDataframe(getTransactionInfo())
+        engine(transactions)
+        uids = transactions["uid"].to_list()
+
+        updateDF = defineTestDataframe(getTransactionInfoUpdate())
+        merged = pd.concat([updateDF, transactions]).reset_index(drop=True)
+        merged.loc[len(updateDF), "usage"] = "changed"
+        engine(merged)
+
+        self.assertEqual(merged["uid"].to_list(), legacyIdentifier(merged))
+        self.assertEqual(merged["uid"].iloc[len(updateDF) + 1:].to_list(), uids[1:])
+        self.assertEqual(len(engine._uids), len(merged) + 1)
+
+
+class TestSaldoTrace(unittest.TestCase):
+
+    def test_Segments(self):
+        acc = defineTestAccount()
+        self.assertEqual(acc.checkSaldoTrace(), [])
+
+        acc.transactions.loc[2:3, "saldo"] += 100
+        segments = acc.checkSaldoTrace()
+        self.assertEqual(len(segments), 2)
+        self.assertEqual((segments[0].first, segments[0].last), (1, 1))
+        self.assertEqual(segments[0].difference, -100)
+        self.assertEqual((segments[1].first, segments[1].last), (3, 3))
+        self.assertEqual(segments[1].difference, 100)
+        self.assertEqual(len(acc.checkSaldoTrace(rows=[0, 1])), 1)
+
+    def test_IncrementalVerification(self):
+        acc = defineTestAccount()
+        segments, checkpoint = acc.verifyTrace()
+        self.assertEqual(segments, [])
+        self.assertEqual(checkpoint.rows, len(acc.transactions))
+
+        # the update data starts with a saldo of zero
+        result = acc.update(defineTestDataframe(getTransactionInfoUpdate()))
+        incremental, incrementalCheckpoint = acc.verifyTrace(checkpoint, result.rows)
+        full, fullCheckpoint = acc.verifyTrace()
+
+        self.assertEqual(len(incremental), 1)
+        self.assertEqual(incremental, full)
+        self.assertEqual(incrementalCheckpoint, fullCheckpoint)
+
+        # known inconsistencies are kept without checking them again
+        acc.transactions.loc[0, "saldo"] += 1
+        kept, _ = acc.verifyTrace(incrementalCheckpoint, np.array([], dtype=int))
+        self.assertEqual(kept, full)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,181 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from econicer.account import BankAccount
+from econicer.accountManager import AccountManager
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+TUTORIAL = Path(__file__).parents[1] / "tutorial"
+
+
+class TestAccountManager(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpDir = tempfile.TemporaryDirectory()
+        self.db = Path(self.tmpDir.name) / ".db"
+        self.db.mkdir()
+
+        bankSettings = json.loads((TUTORIAL / "config" / "bank.json").read_text())
+        table = bankSettings["table"]
+        table["valuta"] = table.pop("valtua")
+        bankPath = Path(self.tmpDir.name) / "bank.json"
+        bankPath.write_text(json.dumps(bankSettings))
+
+        self.groupingPath = Path(self.tmpDir.name) / "grouping.json"
+        shutil.copy(TUTORIAL / "config" / "grouping.json", self.groupingPath)
+
+        self.settings = {
+            "inputType": str(bankPath),
+            "group": str(self.groupingPath),
+            "plotDir": str(Path(self.tmpDir.name) / "plots"),
+            "accountList": ["Test"],
+        }
+
+    def tearDown(self):
+        self.tmpDir.cleanup()
+
+    def accountManager(self, **settings):
+        settingsPath = self.db / "settings.json"
+        if not settingsPath.is_file():
+            settingsPath.write_text(json.dumps({**self.settings, **settings}))
+        return AccountManager(self.db, settingsPath)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_InitFeather(self):
+        accMan = self.accountManager(storageFormat="feather", compactSchema=False)
+        self.assertTrue(accMan.initDB("Test"))
+        self.assertEqual(Path(accMan.fileIO.filepath).suffix, ".feather")
+
+        accMan = self.accountManager()
+        self.assertEqual(len(accMan.account.transactions), 0)
+
+        accMan.update([str(TUTORIAL / "files" / "firstFile.csv")])
+        accMan = self.accountManager()
+        transactions = accMan.account.transactions
+        self.assertEqual(len(transactions), 23)
+        self.assertEqual(transactions["uid"].dtype, object)
+        self.assertFalse(transactions["groupID"].isna().any())
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_ConvertRoundTrip(self):
+        accMan = self.accountManager(storageFormat="feather", compactSchema=False)
+        accMan.initDB("Test")
+        accMan = self.accountManager()
+        accMan.update([str(TUTORIAL / "files" / "firstFile.csv")])
+        transactions = self.accountManager().account.transactions
+
+        for storageFormat in ["csv", "sqlite", "feather"]:
+            accMan = self.accountManager()
+            accMan.convertDB(storageFormat)
+            accMan = self.accountManager()
+            suffix = Path(accMan.settings.currentAccountFile).suffix
+            self.assertEqual(suffix, f".{storageFormat}")
+            converted = accMan.account.transactions
+            self.assertCountEqual(converted.columns, transactions.columns)
+            converted = converted.reindex(columns=transactions.columns)
+            self.assertTrue(converted.equals(transactions))
+
+    def test_ConvertDeltas(self):
+        accMan = self.accountManager(storageFormat="csv")
+        accMan.initDB("Test")
+        for name in ["firstFile.csv", "secondFile.csv"]:
+            accMan = self.accountManager()
+            accMan.update([str(TUTORIAL / "files" / name)])
+        accMan = self.accountManager()
+        self.assertTrue(accMan.fileIO.deltaSegments())
+        transactions = accMan.account.transactions
+
+        # the delta segments are merged into the SQLite database
+        accMan.convertDB("sqlite")
+        accMan = self.accountManager()
+        self.assertEqual(Path(accMan.settings.currentAccountFile).suffix, ".sqlite")
+        converted = accMan.account.transactions.reindex(columns=transactions.columns)
+        self.assertTrue(converted.equals(transactions))
+
+    def test_UpdateGrouping(self):
+        accMan = self.accountManager()
+        accMan.initDB("Test")
+
+        groupedRows = []
+        groupTransactions = BankAccount.groupTransactions
+
+        def recordRows(account, rows=None):
+            groupedRows.append(rows)
+            return groupTransactions(account, rows)
+
+        with mock.patch.object(BankAccount, "groupTransactions", recordRows):
+            # unchanged grouping rules only group the imported rows
+            accMan = self.accountManager()
+            accMan.update([str(TUTORIAL / "files" / "firstFile.csv")])
+            self.assertEqual(len(groupedRows), 1)
+            self.assertEqual(groupedRows[0].sum(), 23)
+
+            # changed grouping rules regroup the whole history
+            shutil.copy(
+                TUTORIAL / "config" / "grouping_afterEditing.json", self.groupingPath
+            )
+            accMan = self.accountManager()
+            accMan.update([str(TUTORIAL / "files" / "secondFile.csv")])
+            self.assertEqual(len(groupedRows), 2)
+            self.assertIsNone(groupedRows[1])
+
+        accMan = self.accountManager()
+        transactions = accMan.account.transactions
+        self.assertEqual(len(transactions), 60)
+        self.assertIn("hobby", set(transactions["groupID"]))
+
+    def test_RegroupUnchanged(self):
+        accMan = self.accountManager()
+        accMan.initDB("Test")
+        accMan = self.accountManager()
+        accMan.update([str(TUTORIAL / "files" / "firstFile.csv")])
+        entries = [entry.action for entry in accMan.journal().entries()]
+
+        # unchanged rules leave the journal and the grouping state alone
+        statePath = accMan.fileIO.sidecarPath("grouping.json")
+        modified = statePath.stat().st_mtime_ns
+        accMan = self.accountManager()
+        accMan.regroup()
+        self.assertEqual([e.action for e in accMan.journal().entries()], entries)
+        self.assertEqual(statePath.stat().st_mtime_ns, modified)
+
+        shutil.copy(
+            TUTORIAL / "config" / "grouping_afterEditing.json", self.groupingPath
+        )
+        accMan = self.accountManager()
+        accMan.regroup()
+        self.assertEqual(accMan.journal().entries()[-1].action, "regroup")
+
+    def test_EmptyAccount(self):
+        storageFormats = ["csv", "sqlite"] + (["feather"] if pyarrow else [])
+        for storageFormat in storageFormats:
+            with self.subTest(storageFormat=storageFormat):
+                (self.db / "settings.json").unlink(missing_ok=True)
+                accMan = self.accountManager(
+                    storageFormat=storageFormat, accountList=[storageFormat]
+                )
+                self.assertTrue(accMan.initDB(storageFormat))
+
+                # the projected queries of a new account find nothing
+                accMan = self.accountManager()
+                accMan.search("rent", None)
+                accMan.search("rent", ["customer"], since="2020-01-01")
+                accMan = self.accountManager()
+                accMan.listNoGroups()
+                accMan.listNoGroups("living")
+                accMan = self.accountManager()
+                self.assertEqual(accMan.verify(), [])
+                accMan = self.accountManager()
+                self.assertEqual(len(accMan.summary()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from econicer.aggregate import AGGREGATE_COLUMNS
+from econicer.aggregate import AggregateCube
+from econicer.fileIO import FileIO
+from econicer.settings import DatabaseSettings
+
+from test_Account import defineTestAccount
+from test_Account import defineTestDataframe
+from test_Account import getTransactionInfoUpdate
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def calcPosNegSums(df):
+    """monthly income and expenses with pivot tables, as the plots computed
+    them before the aggregate cube"""
+    posSum = pd.pivot_table(
+        df,
+        index=df["date"].dt.month,
+        columns=df["date"].dt.year,
+        values="value",
+        aggfunc=lambda x: x[x > 0].sum(),
+    )
+    negSum = pd.pivot_table(
+        df,
+        index=df["date"].dt.month,
+        columns=df["date"].dt.year,
+        values="value",
+        aggfunc=lambda x: x[x < 0].sum(),
+    )
+    posSum = posSum.rename_axis("month")
+    posSum = posSum.rename_axis("year", axis="columns")
+    negSum = negSum.rename_axis("month")
+    negSum = negSum.rename_axis("year", axis="columns")
+    negSum = negSum.apply(np.abs)
+    return posSum, negSum
+
+
+def groupedAccount():
+    account = defineTestAccount()
+    account.transactions = account.transactions.rename(columns={"valtua": "valuta"})
+    account.groupTransactions()
+    return account
+
+
+class TestAggregateCube(unittest.TestCase):
+
+    def assertSameCube(self, cube, other):
+        pd.testing.assert_frame_equal(cube.sums, other.sums)
+        pd.testing.assert_series_equal(cube.daily, other.daily)
+        pd.testing.assert_series_equal(cube.saldo, other.saldo)
+
+    def test_Sums(self):
+        transactions = groupedAccount().transactions
+        cube = AggregateCube.fromTransactions(transactions)
+
+        df = transactions.copy()
+        df["value"] = df["value"] / 100
+        for expected, result in zip(calcPosNegSums(df), cube.posNegSums()):
+            pd.testing.assert_frame_equal(
+                result, expected, check_names=False, check_index_type=False
+            )
+
+        yearly = pd.pivot_table(
+            df,
+            index=df["date"].dt.year,
+            columns="groupID",
+            values="value",
+            aggfunc="sum",
+        )
+        pd.testing.assert_frame_equal(
+            cube.yearlyGroupSums(), yearly, check_names=False, check_index_type=False
+        )
+
+        monthly = pd.pivot_table(
+            df,
+            index=df["date"].dt.strftime("%Y-%m"),
+            columns="groupID",
+            values="value",
+            aggfunc="sum",
+            fill_value=0,
+        )
+        monthly.index = pd.to_datetime(monthly.index)
+        pd.testing.assert_frame_equal(
+            cube.monthlyGroupSums(fillValue=0), monthly, check_names=False
+        )
+
+        incoming = df[df["value"] > 0].groupby("groupID")["value"].sum()
+        pd.testing.assert_series_equal(
+            cube.groupSums(sign=1), incoming, check_names=False
+        )
+
+        for groupID in cube.groups():
+            flow = df[df["groupID"] == groupID].iloc[::-1]
+            flow = flow.groupby("date")["value"].sum().cumsum()
+            self.assertTrue(np.allclose(cube.groupFlow(groupID), flow))
+
+        # the newest transaction of a day has the saldo at the end of the day
+        timeline = df.groupby("date", sort=False)["saldo"].first().sort_index()
+        self.assertTrue(np.allclose(cube.timeline(), timeline / 100))
+
+    def test_Chunks(self):
+        transactions = groupedAccount().transactions
+        cube = AggregateCube.fromTransactions(transactions)
+
+        chunks = [transactions.iloc[i : i + 2] for i in range(0, len(transactions), 2)]
+        self.assertSameCube(AggregateCube.fromChunks(chunks), cube)
+        self.assertEqual(len(AggregateCube.fromChunks([]).sums), 0)
+
+    def test_DatabaseChunks(self):
+        suffixes = [".csv", ".sqlite"] + ([".feather"] if pyarrow is not None else [])
+
+        for suffix in suffixes:
+            account = groupedAccount()
+
+            with tempfile.TemporaryDirectory() as tmp:
+                dataIO = FileIO(Path(tmp) / f"history{suffix}", DatabaseSettings())
+                dataIO.writeDB(account)
+
+                updateDF = defineTestDataframe(getTransactionInfoUpdate())
+                result = account.update(updateDF.rename(columns={"valtua": "valuta"}))
+                oldest = len(account.transactions) - 1
+                account.transactions.loc[oldest, "groupID"] = "moved"
+                dataIO.writeChanges(account, result.rows, [oldest])
+
+                chunks = dataIO.iterTransactions(AGGREGATE_COLUMNS, 3)
+                self.assertSameCube(
+                    AggregateCube.fromChunks(chunks),
+                    AggregateCube.fromTransactions(account.transactions),
+                )
+
+    def test_SegmentSaldo(self):
+        suffixes = [".csv", ".sqlite"] + ([".feather"] if pyarrow is not None else [])
+        # a newer file and an older file, both with days known by the database
+        newer = [
+            ["Store", datetime(2021, 3, 1), "Your friendly store nearby", -20],
+            ["Bakery", datetime(2021, 2, 25), "Bread", -5],
+        ]
+        older = [
+            ["Kiosk", datetime(2020, 12, 31), "Newspaper", -3],
+            ["Bank", datetime(2020, 12, 30), "Fees", -7],
+        ]
+
+        for suffix in suffixes:
+            account = groupedAccount()
+
+            with tempfile.TemporaryDirectory() as tmp:
+                dataIO = FileIO(Path(tmp) / f"history{suffix}", DatabaseSettings())
+                dataIO.writeDB(account)
+
+                for info in [newer, older]:
+                    updateDF = defineTestDataframe(info)
+                    updateDF = updateDF.rename(columns={"valtua": "valuta"})
+                    result = account.update(updateDF)
+                    dataIO.writeChanges(account, result.rows)
+
+                cube = AggregateCube.fromTransactions(account.transactions)
+                for chunksize in [3, 100]:
+                    chunks = dataIO.iterTransactions(AGGREGATE_COLUMNS, chunksize)
+                    chunked = AggregateCube.fromChunks(chunks)
+                    self.assertSameCube(chunked, cube)
+                    pd.testing.assert_series_equal(chunked.timeline(), cube.timeline())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,8 @@
 import unittest
 import datetime
+
+import numpy as np
+import pandas as pd
 import econicer.auxiliary as aux
 
 
@@ -15,6 +18,48 @@ class TestGrouping(unittest.TestCase):
         with self.assertRaises(ValueError):
             aux.str2num("asd")
 
+    def test_Str2NumColumn(self):
+        amounts = [
+            "1.234,56",
+            "-1.234,56",
+            "1,5",
+            "0,05",
+            "-0,5",
+            "12",
+            "-12",
+            "1,234",
+            "1.000.000,00",
+            "12-",
+            " 3,40",
+            "+7",
+            "1_000",
+            "007,07",
+            "٣,١",
+        ]
+        expected = [aux.str2num(a) for a in amounts]
+        parsed = aux.str2numColumn(pd.Series(amounts, name="value"))
+        self.assertEqual(parsed.tolist(), expected)
+        self.assertEqual(parsed.dtype, np.int64)
+
+        for column in [pd.Series([5, -3]), pd.Series([1.0, 0.29, -2.5])]:
+            self.assertEqual(
+                aux.str2numColumn(column).tolist(), column.apply(aux.str2num).tolist()
+            )
+
+        mixed = pd.Series(["1,00", 250, 1.5], dtype=object)
+        self.assertEqual(aux.str2numColumn(mixed).tolist(), [100, 250, 150])
+
+    def test_Str2NumColumnErrors(self):
+        amounts = pd.Series(["1,00", "asd", "5.0", "1,2,3", "-", float("nan")])
+        cents, invalid = aux.parseAmounts(amounts)
+        self.assertEqual(invalid.index.tolist(), [1, 2, 3, 4, 5])
+        self.assertEqual(cents[0], 100)
+
+        with self.assertRaises(aux.AmountError) as context:
+            aux.str2numColumn(amounts.rename("value"))
+        self.assertIn("5 malformed amounts in column value", str(context.exception))
+        self.assertIn("'1,2,3'", str(context.exception))
+
     def test_NextMonth(self):
         ts = datetime.datetime(2000, 1, 5)
         _, nm = aux.nextMonth(ts)
@@ -0,0 +1,138 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+from econicer.aggregate import AggregateCube
+from econicer.ecoplot import EcoPlot
+from econicer.ecoplot import PlotOptions
+from econicer.ecoplot import PlotRef
+from econicer.ecoplot import PlotType
+from econicer.ecoplot import drawMonthBars
+from econicer.ecoplot import plotDigest
+
+
+class TestEcoPlot(unittest.TestCase):
+
+    def test_Render(self):
+        transactions = pd.DataFrame(
+            {
+                "date": pd.to_datetime(["2021-03-01", "2021-02-01", "2021-01-01"]),
+                "saldo": [3000, 2000, 1000],
+                "value": [1000, 1000, 1000],
+                "groupID": ["b", "a", "b"],
+            }
+        )
+        cube = AggregateCube.fromTransactions(transactions)
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            ep = EcoPlot(Path(tmpDir))
+            ep.plotTimeline(cube)
+            brokenRef = PlotRef(Path(tmpDir), PlotType.BAR, "broken")
+            ep.addJob(brokenRef, drawMonthBars, [("in", pd.Series([1.0]))], [], 1.0)
+            ep.plotCategoriesFlow(cube)
+
+            failed = ep.render(workers=2)
+            self.assertEqual([ref for ref, _ in failed], [brokenRef])
+            self.assertIn("ValueError", failed[0][1])
+            self.assertEqual((ep.rendered, ep.skipped), (3, 0))
+
+            names = [ref.name for ref in ep.reg]
+            self.assertEqual(
+                names,
+                ["TIMELINE_OVERALL.pdf", "CATEGORY_FLOW_a.pdf", "CATEGORY_FLOW_b.pdf"],
+            )
+            for ref in ep.reg:
+                self.assertTrue(Path(f"{ref.path}.png").is_file())
+            self.assertEqual(ep.jobs, [])
+
+    def test_Cache(self):
+        transactions = pd.DataFrame(
+            {
+                "date": pd.to_datetime(["2021-02-01", "2021-01-01", "2020-12-01"]),
+                "saldo": [3000, 2000, 1000],
+                "value": [1000, 1000, 1000],
+                "groupID": ["b", "a", "b"],
+            }
+        )
+
+        def plotCategories(data, force=False):
+            ep = EcoPlot(Path(tmpDir), force=force)
+            ep.plotCategoriesYearly(AggregateCube.fromTransactions(data))
+            self.assertEqual(ep.render(), [])
+            return ep
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            self.assertEqual(plotCategories(transactions).skipped, 0)
+            self.assertEqual(plotCategories(transactions).skipped, 2)
+            self.assertEqual(plotCategories(transactions, force=True).skipped, 0)
+
+            # only the year with a new transaction is drawn again
+            newer = pd.DataFrame(
+                {
+                    "date": pd.to_datetime(["2021-03-01"]),
+                    "saldo": [4000],
+                    "value": [1000],
+                    "groupID": ["a"],
+                }
+            )
+            transactions = pd.concat([newer, transactions], ignore_index=True)
+            ep = plotCategories(transactions)
+            self.assertEqual(ep.skipped, 1)
+
+            # a deleted output is drawn again
+            Path(f"{ep.reg[0].path}.png").unlink()
+            self.assertEqual(plotCategories(transactions).skipped, 1)
+
+    def test_Formats(self):
+        transactions = pd.DataFrame(
+            {
+                "date": pd.to_datetime(["2021-02-01", "2021-01-01"]),
+                "saldo": [2000, 1000],
+                "value": [1000, 1000],
+                "groupID": ["b", "a"],
+            }
+        )
+        cube = AggregateCube.fromTransactions(transactions)
+
+        def plotTimeline(formats, dpi=600):
+            ep = EcoPlot(Path(tmpDir), PlotOptions(3.14, 2.355, formats, dpi))
+            ep.plotTimeline(cube)
+            self.assertEqual(ep.render(), [])
+            return ep
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            plotTimeline(["pdf"])
+            self.assertEqual(
+                sorted(p.name for p in Path(tmpDir).glob("*.pdf.*")),
+                ["TIMELINE_OVERALL.pdf.pdf"],
+            )
+
+            # a missing format is rendered, the cached files are kept
+            self.assertEqual(plotTimeline(["pdf", "png"]).skipped, 0)
+            self.assertEqual(plotTimeline(["pdf"]).skipped, 1)
+            self.assertEqual(plotTimeline(["png"], dpi=100).skipped, 0)
+
+    def test_DigestConstants(self):
+        def drawRed(data):
+            return data.plot(color="red", label="in")
+
+        def drawBlue(data):
+            return data.plot(color="blue", label="in")
+
+        def drawBars(data):
+            return data.bar(color="red", label="in")
+
+        data = (pd.Series([1.0, 2.0]),)
+        digests = set()
+        for draw in [drawRed, drawBlue, drawBars]:
+            # only a constant or a called name differs, not the bytecode
+            draw.__qualname__ = "draw"
+            self.assertEqual(draw.__code__.co_code, drawRed.__code__.co_code)
+            digests.add(plotDigest(draw, data, ()))
+        self.assertEqual(len(digests), 3)
+        self.assertIn(plotDigest(drawRed, data, ()), digests)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+import re
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from econicer.grouping import GroupMatcher
+from econicer.grouping import GroupingDiff
+from econicer.grouping import groupMoves
+from econicer.settings import GroupSettings
+
+from test_Account import defineTestDataframe
+from test_Account import getTransactionInfo
+
+
+def legacyGrouping(transactions, groups, columns):
+    groupIDs = pd.Series("None", index=transactions.index, dtype=object)
+    for key in columns:
+        for grpName, grpList in groups.items():
+            searchPat = r"(" + r"|".join(grpList) + ")"
+            matches = transactions[key].str.extractall(searchPat, re.IGNORECASE)
+            if matches.empty:
+                continue
+            ids = list(matches.index.droplevel(1).values)
+            ids = [i for i in ids if groupIDs[i] == "None"]
+            groupIDs[ids] = grpName
+    return groupIDs.to_list()
+
+
+class TestGroupMatcher(unittest.TestCase):
+
+    def test_Priority(self):
+        groups = {
+            "living": ["store", "rent"],
+            "hobby": ["book store", "guitar"],
+            "travel": [r"hotel\s+\d+", "train"],
+        }
+        matcher = GroupMatcher(groups)
+        texts = pd.Series(
+            ["Book Store", "GUITAR rent", "Hotel 12", "hotel", np.nan, "train store"]
+        )
+        names = matcher.groupNamesOf(matcher.match(texts))
+        self.assertEqual(
+            names.tolist(), ["living", "living", "travel", "None", "None", "living"]
+        )
+
+    def test_FirstColumnWins(self):
+        groups = {"income": ["paycheck"], "living": ["store"]}
+        transactions = pd.DataFrame(
+            {"customer": ["Store", "myCompany"], "usage": ["paycheck", "Paycheck"]}
+        )
+        matcher = GroupMatcher(groups)
+        priorities = matcher.classify(transactions, ["customer", "usage"])
+        self.assertEqual(
+            matcher.groupNamesOf(priorities).tolist(), ["living", "income"]
+        )
+
+    def test_GroupedKeywords(self):
+        groups = {
+            "double": [r"(?P<x>a)\1", "zz"],
+            "named": [r"(?P<x>b)(?P=x)"],
+            "plain": ["a", r"c.d"],
+            "numbered": [r"(e)\1"],
+        }
+        matcher = GroupMatcher(groups)
+        texts = pd.Series(["xAAx", "ab", "bb", "cxd", "ee", "e", "bba"])
+        names = matcher.groupNamesOf(matcher.match(texts))
+        self.assertEqual(
+            names.tolist(),
+            ["double", "plain", "named", "plain", "numbered", "None", "named"],
+        )
+
+    def test_LegacyCompatibility(self):
+        groupSettings = GroupSettings(
+            Path(__file__).parent / "testfiles" / "grouping.json", verbose=False
+        )
+        transactions = defineTestDataframe(getTransactionInfo())
+
+        matcher = GroupMatcher.fromSettings(groupSettings)
+        priorities = matcher.classify(transactions, groupSettings.dbIdentifier)
+        self.assertEqual(
+            matcher.groupNamesOf(priorities).tolist(),
+            legacyGrouping(
+                transactions, groupSettings.groups, groupSettings.dbIdentifier
+            ),
+        )
+
+    def test_RandomizedLegacyCompatibility(self):
+        rng = np.random.default_rng(1)
+        words = ["ab", "abc", "bca", "cab", "c", "xyz", "zz", "Ab C", "y"]
+        groups = {
+            f"group{i}": list(rng.choice(words, size=rng.integers(1, 3)))
+            for i in range(8)
+        }
+        groups["regex"] = [r"a.c", r"x+y"]
+        groups["empty"] = []
+
+        texts = [
+            "".join(rng.choice(list("abcxyz "), size=rng.integers(0, 12)))
+            for _ in range(300)
+        ]
+        transactions = pd.DataFrame({"usage": texts, "customer": texts[::-1]})
+        transactions.loc[::17, "usage"] = np.nan
+
+        for cols in (["usage"], ["customer", "usage"]):
+            matcher = GroupMatcher(groups)
+            priorities = matcher.classify(transactions, cols)
+            self.assertEqual(
+                matcher.groupNamesOf(priorities).tolist(),
+                legacyGrouping(transactions, groups, cols),
+            )
+
+
+class TestGroupingFingerprint(unittest.TestCase):
+
+    def test_Fingerprint(self):
+        groupSettings = GroupSettings(
+            Path(__file__).parent / "testfiles" / "grouping.json", verbose=False
+        )
+        fingerprint = groupSettings.fingerprint()
+        self.assertEqual(fingerprint, groupSettings.fingerprint())
+
+        groupSettings.groups = dict(reversed(list(groupSettings.groups.items())))
+        self.assertNotEqual(fingerprint, groupSettings.fingerprint())
+
+        groupSettings.groups = {}
+        groupSettings.dbIdentifier = ["usage"]
+        self.assertNotEqual(fingerprint, groupSettings.fingerprint())
+
+
+def randomGroups(rng, words):
+    groups = {
+        f"group{i}": list(rng.choice(words, size=rng.integers(0, 3)))
+        for i in rng.permutation(8)[: rng.integers(3, 8)]
+    }
+    return groups
+
+
+class TestGroupingDiff(unittest.TestCase):
+
+    def test_Describe(self):
+        oldGroups = {"income": ["company"], "living": ["rent"], "cash": ["atm"]}
+        newGroups = {"living": ["rent", "store"], "income": ["company"], "car": []}
+        diff = GroupingDiff.fromRules(oldGroups, ["usage"], newGroups, ["usage"])
+
+        self.assertEqual(diff.added, ["car"])
+        self.assertEqual(diff.removed, ["cash"])
+        self.assertEqual(len(diff.moved), 1)
+        self.assertEqual(diff.addedKeywords, {"living": ["store"]})
+        self.assertFalse(diff.empty)
+
+        diff = GroupingDiff.fromRules(oldGroups, ["usage"], oldGroups, ["usage"])
+        self.assertTrue(diff.empty)
+
+    def test_RegroupEqualsFullRegroup(self):
+        rng = np.random.default_rng(2)
+        words = ["ab", "abc", "bca", "cab", "c", "xyz", "zz", r"x.z", "y"]
+        texts = [
+            "".join(rng.choice(list("abcxyz "), size=rng.integers(0, 10)))
+            for _ in range(200)
+        ]
+        transactions = pd.DataFrame({"customer": texts[::-1], "usage": texts})
+        columns = ["customer", "usage"]
+
+        for _ in range(30):
+            oldGroups = randomGroups(rng, words)
+            newGroups = randomGroups(rng, words)
+
+            oldMatcher = GroupMatcher(oldGroups)
+            transactions["groupID"] = oldMatcher.groupNamesOf(
+                oldMatcher.classify(transactions, columns)
+            )
+            oldGroupIDs = transactions["groupID"].copy()
+
+            diff = GroupingDiff.fromRules(oldGroups, columns, newGroups, columns)
+            affected = diff.affectedRows(transactions, columns)
+
+            newMatcher = GroupMatcher(newGroups)
+            priorities = newMatcher.classify(transactions, columns)
+            expected = newMatcher.groupNamesOf(priorities)
+
+            regrouped = transactions["groupID"].to_numpy(copy=True)
+            regrouped[affected] = newMatcher.groupNamesOf(
+                newMatcher.classify(transactions[affected], columns)
+            )
+            self.assertEqual(regrouped.tolist(), expected.tolist())
+
+            moves = groupMoves(oldGroupIDs, regrouped)
+            self.assertEqual(moves.sum(), np.count_nonzero(oldGroupIDs != regrouped))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+from econicer.importRegistry import ImportRecord
+from econicer.importRegistry import ImportRegistry
+from econicer.importRegistry import fileDigest
+
+
+class TestImportRegistry(unittest.TestCase):
+
+    def test_Digest(self):
+        with tempfile.TemporaryDirectory() as tmpDir:
+            first = Path(tmpDir) / "first.csv"
+            second = Path(tmpDir) / "second.csv"
+            first.write_text("date;value\n01.01.2020;1,00\n")
+            second.write_text("date;value\n01.01.2020;1,00\n")
+            self.assertEqual(fileDigest(first), fileDigest(second))
+
+            second.write_text("date;value\n01.01.2020;2,00\n")
+            self.assertNotEqual(fileDigest(first), fileDigest(second))
+
+    def test_KnownRows(self):
+        imported = pd.DataFrame({"uid": ["c", "d", "e"]})
+        with tempfile.TemporaryDirectory() as tmpDir:
+            registryPath = Path(tmpDir) / "history.imports.json"
+            registry = ImportRegistry(registryPath)
+            registry.add(ImportRecord.fromTransactions("abc", "old.csv", imported))
+            registry.add(
+                ImportRecord.fromTransactions("def", "empty.csv", imported[:0])
+            )
+            registry.write()
+
+            registry = ImportRegistry(registryPath)
+            self.assertIn("abc", registry)
+            self.assertEqual(registry.records["abc"].rows, 3)
+
+            known = registry.knownRows(["a", "b", "c", "d", "e", "f"])
+            self.assertEqual(known.tolist(), [False, False, True, True, True, False])
+
+            # a partial range of the imported file is left to the history merge
+            known = registry.knownRows(["a", "c", "d", "x"])
+            self.assertFalse(known.any())
+            self.assertFalse(registry.knownRows([]).any())
+
+
+if __name__ == "__main__":
+    unittest.main()
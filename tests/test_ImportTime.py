@@ -0,0 +1,30 @@
+import subprocess
+import sys
+import unittest
+
+# seconds, generous to leave room for slow machines
+CLI_IMPORT_BUDGET = 3.0
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_CliImport(self):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import econicer.cli"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        lines = [ln for ln in result.stderr.splitlines() if ln.startswith("import")]
+        modules = [ln.split("|")[-1].strip() for ln in lines]
+
+        # plotting and the report load their libraries on demand
+        for heavy in ["matplotlib", "plotly", "pylatex"]:
+            self.assertNotIn(heavy, modules)
+
+        cumulative = int(lines[modules.index("econicer.cli")].split("|")[1])
+        self.assertLess(cumulative / 1e6, CLI_IMPORT_BUDGET)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from econicer.journal import Journal
+from econicer.journal import JournalEntry
+from econicer.schema import compactTransactions
+
+from test_Account import defineTestAccount
+from test_Account import defineTestDataframe
+from test_Account import getTransactionInfoUpdate
+
+
+class TestJournal(unittest.TestCase):
+
+    def test_AppendPop(self):
+        with tempfile.TemporaryDirectory() as tmpDir:
+            journal = Journal(Path(tmpDir) / "history.journal.jsonl", maxEntries=3)
+            for number in range(5):
+                journal.append(JournalEntry("update", f"file{number}.csv"))
+
+            entries = journal.entries()
+            self.assertEqual(len(entries), 3)
+            self.assertEqual(entries[0].description, "file2.csv")
+
+            popped = journal.pop(2)
+            self.assertEqual(
+                [e.description for e in popped], ["file4.csv", "file3.csv"]
+            )
+            self.assertEqual(len(journal.entries()), 1)
+            self.assertEqual(journal.pop(5)[0].description, "file2.csv")
+            self.assertEqual(journal.pop(), [])
+
+    def test_Revert(self):
+        account = defineTestAccount()
+        account.groupTransactions()
+        before = account.transactions.copy()
+
+        result = account.update(defineTestDataframe(getTransactionInfoUpdate()))
+        transactions = account.transactions
+        oldest = len(transactions) - 1
+        entry = JournalEntry(
+            "update",
+            added=transactions["uid"].to_numpy()[result.rows].tolist(),
+            moved=[[transactions["uid"].iloc[oldest], before["groupID"].iloc[-1]]],
+            header=["DE00", "Bank"],
+        )
+        transactions.loc[oldest, "groupID"] = "moved"
+
+        # the text uids of the journal also match a compact account
+        compactAccount = defineTestAccount()
+        compactAccount.transactions = compactTransactions(transactions)
+
+        for acc in [account, compactAccount]:
+            entry.revert(acc)
+            self.assertEqual(acc.transactions["date"].tolist(), before["date"].tolist())
+            self.assertEqual(
+                acc.transactions["groupID"].astype(object).tolist(),
+                before["groupID"].tolist(),
+            )
+            self.assertEqual(acc.accountNumber, "DE00")
+
+
+if __name__ == "__main__":
+    unittest.main()
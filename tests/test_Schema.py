@@ -0,0 +1,77 @@
+import base64
+import hashlib
+import unittest
+
+import pandas as pd
+from econicer.account import BankAccount
+from econicer.schema import compactTransactions
+from econicer.schema import expandTransactions
+from econicer.schema import memoryReport
+from econicer.schema import uidToInt64
+
+from test_Account import defineTestAccount
+from test_Account import defineTestDataframe
+from test_Account import getTransactionInfoUpdate
+
+
+class TestCompactSchema(unittest.TestCase):
+
+    def test_UidToInt64(self):
+        digests = [hashlib.sha1(str(i).encode()).digest() for i in range(100)]
+        uids = [base64.b64encode(d).decode() for d in digests]
+
+        expected = [int.from_bytes(d[:8], "big", signed=True) for d in digests]
+        self.assertEqual(uidToInt64(uids).tolist(), expected)
+        self.assertEqual(len(uidToInt64([])), 0)
+
+    def test_CompactTransactions(self):
+        acc = defineTestAccount()
+        acc.groupTransactions()
+        compact = compactTransactions(acc.transactions)
+
+        self.assertIsInstance(compact["type"].dtype, pd.CategoricalDtype)
+        self.assertIsInstance(compact["groupID"].dtype, pd.CategoricalDtype)
+        self.assertEqual(compact["uid"].dtype, "int64")
+        self.assertEqual(compact["value"].dtype, "int64")
+
+        expanded = expandTransactions(compact).drop(columns="uid")
+        pd.testing.assert_frame_equal(
+            expanded, acc.transactions.drop(columns="uid"), check_dtype=False
+        )
+
+        report = memoryReport(acc.transactions, compact)
+        self.assertLess(report.loc["total", "after"], report.loc["total", "before"])
+
+    def test_CompactAccount(self):
+        acc = defineTestAccount()
+        compactAcc = BankAccount(
+            acc.owner,
+            acc.accountNumber,
+            acc.bank,
+            acc.transactions.copy(),
+            acc.groupSettings,
+            compact=True,
+        )
+
+        for account in [acc, compactAcc]:
+            account.groupTransactions()
+            result = account.update(defineTestDataframe(getTransactionInfoUpdate()))
+            self.assertEqual(result.added, len(getTransactionInfoUpdate()))
+
+        self.assertEqual(compactAcc.transactions["uid"].dtype, "int64")
+        self.assertEqual(
+            compactAcc.transactions["uid"].to_list(),
+            uidToInt64(acc.transactions["uid"]).tolist(),
+        )
+        self.assertEqual(
+            compactAcc.transactions["groupID"].astype(object).to_list(),
+            acc.transactions["groupID"].to_list(),
+        )
+
+        segments, checkpoint = compactAcc.verifyTrace()
+        self.assertEqual(len(segments), 1)
+        self.assertIsInstance(checkpoint.newestUid, int)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from econicer.searchIndex import SearchIndex
+
+from test_Account import defineTestAccount
+
+
+class TestSearchIndex(unittest.TestCase):
+
+    def assertSameResult(self, account, index, search, categories):
+        indexed = account.search(search, categories, index)
+        scanned = account.search(search, categories)
+        if scanned is None:
+            self.assertIsNone(indexed)
+        else:
+            self.assertEqual(indexed["uid"].to_list(), scanned["uid"].to_list())
+
+    def test_Search(self):
+        account = defineTestAccount()
+        index = SearchIndex.build(account.transactions)
+
+        for search in ["store", "STORE", "you", "a", "thank you", r"book\s+\w+", "xyz"]:
+            for categories in [["usage"], ["customer", "usage"], ["type"]]:
+                self.assertSameResult(account, index, search, categories)
+
+        result = account.search("store", ["customer"], index)
+        self.assertEqual(result["customer"].to_list(), ["Store", "Book Store"])
+
+    def test_Sync(self):
+        account = defineTestAccount()
+        index = SearchIndex.build(account.transactions.iloc[3:])
+        noTexts = len(index.textIndex["usage"].texts)
+
+        self.assertTrue(index.sync(account.transactions))
+        self.assertFalse(index.sync(account.transactions))
+        self.assertEqual(len(index.uids), len(account.transactions))
+        self.assertEqual(len(index.textIndex["usage"].texts), noTexts + 2)
+
+        self.assertSameResult(account, index, "money", ["usage"])
+
+    def test_SaveLoad(self):
+        account = defineTestAccount()
+        index = SearchIndex.build(account.transactions)
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            indexPath = Path(tmpDir) / "history.search.npz"
+            index.save(indexPath)
+            loaded = SearchIndex.load(indexPath)
+
+        self.assertTrue(np.array_equal(loaded.uids, index.uids))
+        self.assertFalse(loaded.sync(account.transactions))
+        self.assertSameResult(account, loaded, "store", ["customer", "usage"])
+
+
+if __name__ == "__main__":
+    unittest.main()
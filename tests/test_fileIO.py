@@ -1,11 +1,30 @@
+import tempfile
 import unittest
 from pathlib import Path
 
+import pandas as pd
+
+from econicer.account import BankAccount
 from econicer.fileIO import FileIO
+from econicer.fileIO import detectCompression
+from econicer.schema import expandTransactions
+from econicer.fileIO import expandFilePatterns
 from econicer.settings import DatabaseSettings
 from econicer.settings import GroupSettings
 
 from test_Account import defineTestAccount
+from test_Account import defineTestDataframe
+from test_Account import getTransactionInfoUpdate
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 
 class TestFileIO(unittest.TestCase):
@@ -27,6 +46,247 @@ class TestFileIO(unittest.TestCase):
 
         testFile.unlink()
 
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_binaryDB(self):
+        settingsPath = Path(__file__).parent / "testfiles" / "grouping.json"
+        groupSettings = GroupSettings(settingsPath)
+        account = defineTestAccount()
+        account.groupTransactions()
+        account.transactions.loc[2, "usage"] = float("nan")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            dataIO = FileIO(Path(tmp) / "history.feather", DatabaseSettings())
+            dataIO.writeDB(account)
+
+            accFromFile = dataIO.readDB(groupSettings)
+            self.assertEqual(accFromFile.owner, account.owner)
+            self.assertEqual(accFromFile.accountNumber, account.accountNumber)
+            self.assertTrue(accFromFile.transactions.equals(account.transactions))
+
+            projected = dataIO.readDB(groupSettings, columns=["date", "groupID"])
+            self.assertEqual(
+                projected.transactions.columns.tolist(), ["date", "groupID", "uid"]
+            )
+
+            compactAcc = dataIO.readDB(groupSettings, compact=True)
+            dataIO.writeDB(compactAcc)
+            accFromFile = dataIO.readDB(groupSettings, compact=True)
+            self.assertTrue(
+                expandTransactions(accFromFile.transactions).equals(
+                    expandTransactions(compactAcc.transactions)
+                )
+            )
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_mappedBinaryDB(self):
+        settingsPath = Path(__file__).parent / "testfiles" / "grouping.json"
+        groupSettings = GroupSettings(settingsPath)
+        account = defineTestAccount()
+        account.groupTransactions()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            dataIO = FileIO(Path(tmp) / "history.feather", DatabaseSettings())
+            dataIO.writeDB(account)
+
+            columns = ["date", "value", "groupID", "usage"]
+            mapped = dataIO.mapBinary(columns)
+            self.assertEqual(mapped.columns.tolist(), columns)
+            self.assertTrue(
+                expandTransactions(mapped).equals(account.transactions[columns])
+            )
+
+            # the mapped columns are read only views of the file
+            self.assertFalse(mapped["value"].to_numpy().flags.writeable)
+            self.assertFalse(mapped["groupID"].cat.codes.to_numpy().flags.writeable)
+
+            oldest = len(account.transactions) - 1
+            account.transactions.loc[oldest, "groupID"] = "moved"
+            dataIO.writeChanges(account, movedRows=[oldest])
+            self.assertIsNone(dataIO.mapBinary(columns))
+
+            # the delta segments are read with the database instead
+            accFromFile = dataIO.readDB(groupSettings, columns=columns)
+            self.assertEqual(accFromFile.transactions.loc[oldest, "groupID"], "moved")
+
+        csvIO = FileIO(Path(tmp) / "history.csv", DatabaseSettings())
+        self.assertIsNone(csvIO.mapBinary())
+
+    def test_compressedDB(self):
+        settingsPath = Path(__file__).parent / "testfiles" / "grouping.json"
+        groupSettings = GroupSettings(settingsPath)
+        account = defineTestAccount()
+        account.transactions = account.transactions.rename(columns={"valtua": "valuta"})
+        account.groupTransactions()
+
+        compressions = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+        if zstandard is not None:
+            compressions[".zst"] = "zstd"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for suffix, compression in compressions.items():
+                dataIO = FileIO(Path(tmp) / f"history.csv{suffix}", DatabaseSettings())
+                dataIO.writeDB(account)
+                self.assertEqual(detectCompression(dataIO.filepath), compression)
+
+                accFromFile = dataIO.readDB(groupSettings)
+                self.assertEqual(accFromFile.owner, account.owner)
+                self.assertTrue(accFromFile.transactions.equals(account.transactions))
+
+                # the compression is detected from the content of the file
+                renamed = Path(dataIO.filepath).rename(Path(tmp) / "renamed.csv")
+                accFromFile = FileIO(renamed, DatabaseSettings()).readDB(groupSettings)
+                self.assertTrue(accFromFile.transactions.equals(account.transactions))
+
+            plainIO = FileIO(Path(tmp) / "history.csv", DatabaseSettings())
+            plainIO.writeDB(account)
+            self.assertIsNone(detectCompression(plainIO.filepath))
+
+    def test_sqliteDB(self):
+        account = defineTestAccount()
+        oldDF = account.transactions.rename(columns={"valtua": "valuta"})
+        updateDF = defineTestDataframe(getTransactionInfoUpdate())
+        updateDF = updateDF.rename(columns={"valtua": "valuta"})
+
+        # the older transactions are inserted in front of the known ones
+        settingsPath = Path(__file__).parent / "testfiles" / "grouping.json"
+        groupSettings = GroupSettings(settingsPath)
+        newerAcc = BankAccount("Test", 123456789, "econicer", updateDF, groupSettings)
+        newerAcc.groupTransactions()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            dataIO = FileIO(Path(tmp) / "history.sqlite", DatabaseSettings())
+            dataIO.writeDB(newerAcc)
+
+            result = newerAcc.update(oldDF, fullGrouping=False)
+            dataIO.writeChanges(newerAcc, result.rows)
+
+            accFromFile = dataIO.readDB(groupSettings)
+            self.assertEqual(accFromFile.accountNumber, 123456789)
+            self.assertTrue(accFromFile.transactions.equals(newerAcc.transactions))
+
+            income = dataIO.readTransactions(
+                ["date", "value"], groupID="income", since="2021-02-01"
+            )
+            self.assertEqual(income["date"].dt.month.tolist(), [3, 2])
+            self.assertEqual(income.columns.tolist(), ["date", "value"])
+
+    def test_sqliteUnknownColumns(self):
+        account = defineTestAccount()
+        account.transactions = account.transactions.rename(columns={"valtua": "valuta"})
+        account.transactions["note"] = "extra"
+
+        # a column without a column in the table is not dropped silently
+        with tempfile.TemporaryDirectory() as tmp:
+            dataIO = FileIO(Path(tmp) / "history.sqlite", DatabaseSettings())
+            with self.assertRaisesRegex(ValueError, "note"):
+                dataIO.writeDB(account)
+            self.assertFalse(Path(dataIO.filepath).exists())
+
+    def test_deltaSegments(self):
+        settingsPath = Path(__file__).parent / "testfiles" / "grouping.json"
+        groupSettings = GroupSettings(settingsPath)
+        suffixes = [".csv", ".csv.gz"] + ([".feather"] if pyarrow is not None else [])
+
+        for suffix in suffixes:
+            account = defineTestAccount()
+            account.transactions = account.transactions.rename(
+                columns={"valtua": "valuta"}
+            )
+            account.groupTransactions()
+
+            with tempfile.TemporaryDirectory() as tmp:
+                dataIO = FileIO(Path(tmp) / f"history{suffix}", DatabaseSettings())
+                dataIO.writeDB(account)
+                dbModified = Path(dataIO.filepath).stat().st_mtime_ns
+
+                updateDF = defineTestDataframe(getTransactionInfoUpdate())
+                result = account.update(updateDF.rename(columns={"valtua": "valuta"}))
+                oldest = len(account.transactions) - 1
+                account.transactions.loc[oldest, "groupID"] = "moved"
+                dataIO.writeChanges(account, result.rows, [oldest])
+
+                self.assertEqual(len(dataIO.deltaSegments()), 2)
+                self.assertEqual(Path(dataIO.filepath).stat().st_mtime_ns, dbModified)
+
+                accFromFile = dataIO.readDB(groupSettings)
+                self.assertTrue(accFromFile.transactions.equals(account.transactions))
+                moved = dataIO.readTransactions(["value"], groupID="moved")
+                self.assertEqual(len(moved), 1)
+
+                # a full write merges the segments into the database file
+                dataIO.writeDB(accFromFile)
+                self.assertEqual(dataIO.deltaSegments(), [])
+                accFromFile = dataIO.readDB(groupSettings)
+                self.assertTrue(accFromFile.transactions.equals(account.transactions))
+
+    def test_emptyProjection(self):
+        settingsPath = Path(__file__).parent / "testfiles" / "grouping.json"
+        groupSettings = GroupSettings(settingsPath)
+        emptyDF = pd.DataFrame(columns=BankAccount.dataframeCols)
+        emptyAccount = BankAccount("Test", None, None, emptyDF, groupSettings)
+        suffixes = [".csv", ".sqlite"] + ([".feather"] if pyarrow is not None else [])
+
+        # the database of a new account has no uid and group columns
+        columns = ["date", "value", "groupID"]
+        for suffix in suffixes:
+            with tempfile.TemporaryDirectory() as tmp:
+                dataIO = FileIO(Path(tmp) / f"history{suffix}", DatabaseSettings())
+                dataIO.writeDB(emptyAccount)
+
+                projected = dataIO.readDB(groupSettings, columns=columns)
+                self.assertEqual(len(projected.transactions), 0)
+                self.assertIn("uid", projected.transactions.columns)
+
+                selected = dataIO.readTransactions(columns, groupID="income")
+                self.assertEqual(selected.columns.tolist(), columns)
+                self.assertEqual(len(selected), 0)
+
+                for chunk in dataIO.iterTransactions(columns):
+                    self.assertEqual(len(chunk), 0)
+                    self.assertIn("groupID", chunk.columns)
+
+                if suffix == ".feather":
+                    mapped = dataIO.mapBinary(columns)
+                    self.assertEqual(mapped.columns.tolist(), columns)
+
+    def test_streamingParser(self):
+        settingsPath = Path(__file__).parent / "testfiles" / "grouping.json"
+        groupSettings = GroupSettings(settingsPath)
+        account = defineTestAccount()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            dataIO = FileIO(Path(tmp) / "history.csv", DatabaseSettings())
+            dataIO.writeDB(account)
+
+            header, transactions = dataIO.readFile()
+            self.assertEqual(header, dataIO.readHeader())
+            self.assertEqual(header[0], account.owner)
+
+            chunks = list(dataIO.iterBody(chunksize=2))
+            self.assertEqual(len(chunks), (len(transactions) + 1) // 2)
+            self.assertTrue(pd.concat(chunks).equals(transactions))
+
+            # an empty database has less lines than the searched preamble
+            emptyAccount = BankAccount(
+                "Test", None, None, account.transactions.iloc[:0], groupSettings
+            )
+            dataIO.writeDB(emptyAccount)
+            self.assertEqual(len(dataIO.readDB(groupSettings).transactions), 0)
+
+    def test_expandFilePatterns(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            for name in ["2021-02.csv", "2021-01.csv", "notes.txt"]:
+                (tmp / name).touch()
+
+            files = [tmp / "2021-01.csv", tmp / "2021-02.csv"]
+            self.assertEqual(expandFilePatterns([tmp]), files)
+            self.assertEqual(expandFilePatterns([str(tmp / "2021-*.csv")]), files)
+            self.assertEqual(
+                expandFilePatterns([tmp / "2021-02.csv", tmp]), files[::-1]
+            )
+            self.assertEqual(expandFilePatterns([str(tmp / "missing.csv")]), [])
+
 
 if __name__ == "__main__":
     unittest.main()